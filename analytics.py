@@ -0,0 +1,165 @@
+# BingRewardSearch/analytics.py
+# Points analytics over the whole history (archive + active store), as numpy arrays.
+#
+#   python analytics.py [--since YYYY-MM-DD] [--email EMAIL ...] [--output PATH]
+
+import argparse
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from history_archive import HistoryArchive, HistoryFrame, MISSING, query_history
+from history_store import open_history_store
+from logger import logger
+import config
+
+RECENT_DAYS = 7 # Window for the "recent credit" figure
+
+
+def bracket_counts(points: Sequence[int], brackets: Dict[str, Tuple[float, float]]) -> Dict[str, int]:
+    """How many of these point totals fall in each [lower, upper) bracket."""
+    values = np.asarray(points, dtype=np.float64)
+    return {key: int(np.count_nonzero((values >= lower) & (values < upper))) for key, (lower, upper) in brackets.items()}
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Length of the run of True ending at each cell, along each row."""
+    counts = np.cumsum(mask, axis=1)
+    return counts - np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+
+
+def _slopes(values: np.ndarray) -> np.ndarray:
+    """Least-squares slope per row against the column index, ignoring NaNs (NaN with fewer than two points)."""
+    known = ~np.isnan(values); x = np.broadcast_to(np.arange(values.shape[1], dtype=np.float64), values.shape)
+    n = known.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(known, x, 0).sum(axis=1) / n; y_mean = np.where(known, values, 0).sum(axis=1) / n
+        dx = np.where(known, x - x_mean[:, None], 0); dy = np.where(known, values - y_mean[:, None], 0)
+        spread = (dx * dx).sum(axis=1)
+        return np.where((n >= 2) & (spread > 0), (dx * dy).sum(axis=1) / spread, np.nan)
+
+
+@dataclass
+class PointsAnalytics:
+    """
+    Per-profile analytics over a (profiles x days) grid spanning the first day of history to today.
+    Grid cells are NaN where the profile has no snapshot that day. Rates and trends are measured up to
+    each profile's latest snapshot, so a profile left alone for a while still shows its last pace.
+    """
+    emails: np.ndarray             # (P,) str
+    names: np.ndarray              # (P,) str, the latest name seen
+    days: np.ndarray               # (D,) datetime64[D]
+    points: np.ndarray             # (P, D) available points at the day's last snapshot
+    daily_earnings: np.ndarray     # (P, D) points gained since the previous snapshot (NaN on a drop: a redemption)
+    credit_rate: np.ndarray        # (P, D) share of the day's PC search points credited (earned / max)
+    current_points: np.ndarray     # (P,) last known available points
+    earning_rate: np.ndarray       # (P,) points per day over the ANALYTICS_RATE_DAYS up to the latest snapshot
+    redemptions: np.ndarray        # (P,) days the balance dropped
+    missed_streak: np.ndarray      # (P,) days up to yesterday in a row without completed PC searches
+    longest_missed_streak: np.ndarray # (P,)
+    recent_credit: np.ndarray      # (P,) mean credit rate over the RECENT_DAYS up to the latest row
+    credit_trend: np.ndarray       # (P,) change in credit rate per week over the ANALYTICS_TREND_DAYS up to the latest row
+    thresholds: np.ndarray         # (T,) REDEMPTION_THRESHOLDS
+    days_to_threshold: np.ndarray  # (P, T) projected days until each threshold: 0 if reached, inf if not earning
+
+    def __len__(self) -> int:
+        return len(self.emails)
+
+    @classmethod
+    def compute(cls, frame: HistoryFrame, today: Optional[date] = None, thresholds: Optional[Sequence[int]] = None,
+                rate_days: int = config.ANALYTICS_RATE_DAYS, trend_days: int = config.ANALYTICS_TREND_DAYS) -> "PointsAnalytics":
+        """frame: one row per profile per day, as query_history returns it."""
+        today = np.datetime64(today or date.today(), "D"); thresholds = np.asarray(config.REDEMPTION_THRESHOLDS if thresholds is None else thresholds, dtype=np.float64)
+        emails = np.array(sorted(set(frame.email.tolist())), dtype=frame.email.dtype); profile = np.searchsorted(emails, frame.email) # Twice as fast as np.unique on strings
+        first_day = frame.day.min() if len(frame) else today
+        days = np.arange(first_day, max(today, frame.day.max() if len(frame) else today) + 1)
+        shape = (len(emails), len(days)); cell = (profile, (frame.day - first_day).astype(np.int64))
+
+        def grid(column: np.ndarray) -> np.ndarray:
+            values = np.full(shape, np.nan); values[cell] = np.where(column == MISSING, np.nan, column); return values
+        points, earned, max_points = grid(frame.points), grid(frame.earned), grid(frame.max_points)
+        names = np.empty(len(emails), dtype=frame.name.dtype); names[profile] = frame.name # Later rows overwrite: the latest name
+
+        # Points gained since the previous snapshot, whatever the gap
+        known = ~np.isnan(points); column = np.arange(len(days))
+        last_known = np.maximum.accumulate(np.where(known, column, -1), axis=1) # Column of the latest snapshot so far, -1 before the first
+        previous = np.concatenate([np.full((len(emails), 1), -1), last_known[:, :-1]], axis=1)
+        previous_points = np.where(previous >= 0, np.take_along_axis(points, np.maximum(previous, 0), axis=1), np.nan)
+        delta = points - previous_points
+        daily_earnings = np.where(delta >= 0, delta, np.nan); redemptions = np.count_nonzero(delta < 0, axis=1)
+        current_points = np.where(last_known[:, -1] >= 0, np.take_along_axis(points, np.maximum(last_known[:, -1:], 0), axis=1)[:, 0], np.nan)
+
+        # Rate over the rate_days up to the profile's latest snapshot, measured from the last snapshot before them
+        end = last_known[:, -1]; window_start = np.maximum(0, end - rate_days)[:, None]
+        first_known = np.where(known.any(axis=1), known.argmax(axis=1), len(days))
+        start = np.take_along_axis(last_known, window_start, axis=1)[:, 0]; start = np.where(start >= 0, start, first_known)
+        in_window = (column > start[:, None]) & (column <= end[:, None]) & ~np.isnan(daily_earnings)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            earning_rate = np.where(end > start, np.where(in_window, daily_earnings, 0).sum(axis=1) / (end - start), np.nan)
+            credit_rate = np.where(max_points > 0, earned / max_points, np.nan)
+
+        # Missed days: from the profile's first row up to yesterday, no snapshot showing the PC searches done
+        before_today = days < today
+        first_row = np.full(len(emails), len(days)); np.minimum.at(first_row, profile, cell[1])
+        missed = (~(credit_rate >= 1.0)) & (column >= first_row[:, None]) & before_today
+        runs = _runs(missed)
+        yesterday = np.flatnonzero(before_today)
+        missed_streak = runs[:, yesterday[-1]] if len(yesterday) else np.zeros(len(emails), dtype=np.int64)
+        longest_missed_streak = runs.max(axis=1) if len(days) else np.zeros(len(emails), dtype=np.int64)
+
+        # Credit over the days up to the profile's latest row
+        last_row = np.full(len(emails), -1); np.maximum.at(last_row, profile, cell[1]); age = last_row[:, None] - column
+        recent = np.where((age >= 0) & (age < RECENT_DAYS), credit_rate, np.nan)
+        with np.errstate(invalid="ignore"):
+            recent_credit = np.where(np.isnan(recent).all(axis=1), np.nan, np.nansum(recent, axis=1) / np.maximum(1, (~np.isnan(recent)).sum(axis=1)))
+            credit_trend = _slopes(np.where((age >= 0) & (age < trend_days), credit_rate, np.nan)) * 7
+
+            remaining = thresholds[None, :] - current_points[:, None]
+            days_to_threshold = np.where(remaining <= 0, 0.0, np.where(earning_rate[:, None] > 0, np.ceil(remaining / earning_rate[:, None]), np.inf))
+        days_to_threshold[np.isnan(current_points)] = np.nan
+        return cls(emails=emails, names=names, days=days, points=points, daily_earnings=daily_earnings, credit_rate=credit_rate, current_points=current_points,
+                   earning_rate=earning_rate, redemptions=redemptions, missed_streak=missed_streak, longest_missed_streak=longest_missed_streak,
+                   recent_credit=recent_credit, credit_trend=credit_trend, thresholds=thresholds, days_to_threshold=days_to_threshold)
+
+    def summary(self) -> str:
+        if not len(self): return "Analytics: no history yet."
+        return (f"Analytics: {len(self)} profiles, {np.nansum(self.current_points):,.0f} pts, earning {np.nansum(self.earning_rate):,.0f} pts/day; "
+                f"{np.count_nonzero(self.missed_streak > 0)} missed yesterday, {np.count_nonzero(self.missed_streak >= 3)} on a 3+ day streak.")
+
+    def report(self) -> str:
+        """A plain-text table, one line per profile, lowest earning rate first."""
+        if not len(self): return "No history yet."
+        lines = [f"Points analytics for {len(self)} profiles, {self.days[0]} to {self.days[-1]} ({len(self.days)} days)", self.summary(), ""]
+        def number(value, spec): return "-" if np.isnan(value) else format(value, spec)
+        def eta(value): return "-" if np.isnan(value) or np.isinf(value) else ("done" if value == 0 else f"{value:.0f}d")
+        header = f"{'Profile':<40} {'Points':>8} {'Pts/day':>8} {'Credit':>7} {'Trend/wk':>9} {'Missed':>7} {'Longest':>8} {'Redeemed':>9}"
+        lines += [header + "".join(f" {threshold:>7,.0f}" for threshold in self.thresholds), "-" * (len(header) + 8 * len(self.thresholds))]
+        for i in np.argsort(np.nan_to_num(self.earning_rate, nan=-1.0), kind="stable"):
+            profile = f"{self.names[i]} <{self.emails[i]}>"[:40]
+            lines.append(f"{profile:<40} {number(self.current_points[i], ',.0f'):>8} {number(self.earning_rate[i], '.1f'):>8} {number(self.recent_credit[i], '.0%'):>7} "
+                         f"{number(self.credit_trend[i], '+.1%'):>9} {self.missed_streak[i]:>7} {self.longest_missed_streak[i]:>8} {self.redemptions[i]:>9}"
+                         + "".join(f" {eta(value):>7}" for value in self.days_to_threshold[i]))
+        return "\n".join(lines)
+
+
+def points_analytics(store, archive: Optional[HistoryArchive] = None, since: Optional[str] = None, emails: Optional[List[str]] = None) -> PointsAnalytics:
+    return PointsAnalytics.compute(query_history(store, archive, since=since, emails=emails))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Points analytics report over progress history and its archive.")
+    parser.add_argument("--since", help="first day to include (YYYY-MM-DD); default: all history")
+    parser.add_argument("--email", nargs="*", help="only these profiles")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+    analytics = points_analytics(open_history_store(), since=args.since, emails=args.email)
+    report = analytics.report(); print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(report + "\n")
+        logger.log(f"Points analytics report written to {args.output}.", "INFO")
+
+
+if __name__ == "__main__":
+    main()
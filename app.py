@@ -3,17 +3,19 @@
 import customtkinter
 from PIL import Image
 import threading
-import math
 import sys
 import json
 import time
 import schedule
 import re
 from typing import List, Set, Dict, Callable
-from datetime import date
+from datetime import date, datetime
 
 from edge_profile import EdgeProfile
 from automation_service import AutomationService
+from automation_runner import AutomationRunner, RunnerCallbacks, is_progress_complete, set_profile_points
+from timing import SessionLedger
+from analytics import bracket_counts
 # --- MODIFIED: Import POINTS_COLORS and DEFAULT_COLORS ---
 from ui_components import ProfileRow, LabeledSlider, POINTS_COLORS, DEFAULT_COLORS
 from cmd_colors import colors
@@ -60,6 +62,7 @@ class BingAutomatorApp(customtkinter.CTk):
         self._load_and_display_initial_progress()
 
         self._start_scheduler_thread()
+        if config.HISTORY_AUTO_COMPACT or config.ANALYTICS_AT_STARTUP: threading.Thread(target=self._startup_history_worker, name="HistoryStartup", daemon=True).start()
 
     def _load_settings(self) -> dict:
         try:
@@ -76,6 +79,7 @@ class BingAutomatorApp(customtkinter.CTk):
                     "key_press_delay_min": config.KEY_PRESS_DELAY[0],
                     "key_press_delay_max": config.KEY_PRESS_DELAY[1],
                     "smart_search_mode": True,
+                    "fetch_workers": config.FETCH_MAX_WORKERS,
                 }
                 settings = json.load(f)
                 updated = False
@@ -107,6 +111,7 @@ class BingAutomatorApp(customtkinter.CTk):
                 "key_press_delay_min": config.KEY_PRESS_DELAY[0],
                 "key_press_delay_max": config.KEY_PRESS_DELAY[1],
                 "smart_search_mode": True,
+                "fetch_workers": config.FETCH_MAX_WORKERS,
             }
 
     def _save_settings(self):
@@ -120,6 +125,7 @@ class BingAutomatorApp(customtkinter.CTk):
         self.settings["key_press_delay_min"] = self.key_press_slider.get_min()
         self.settings["key_press_delay_max"] = self.key_press_slider.get_max()
         self.settings["smart_search_mode"] = self.search_mode_switch_var.get() == "on"
+        self.settings["fetch_workers"] = self.fetch_workers_slider.get()
 
         try:
             with open(config.SETTINGS_JSON_PATH, 'w') as f:
@@ -365,6 +371,8 @@ class BingAutomatorApp(customtkinter.CTk):
         self.pc_slider.pack(fill="x", padx=10, pady=10, anchor="n")
         self.fetch_progress_button = customtkinter.CTkButton(self.controls_content_frame, text="Fetch All Points", command=self._start_fetch_progress_thread, fg_color="teal")
         self.fetch_progress_button.pack(fill="x", padx=10, pady=(0, 10))
+        self.fetch_workers_slider = LabeledSlider(self.controls_content_frame, "Parallel Fetches:", 1, 8, 1, self.settings["fetch_workers"], command=lambda value: self._save_settings())
+        self.fetch_workers_slider.pack(fill="x", padx=10, pady=(0, 10), anchor="n")
         behavior_frame = customtkinter.CTkFrame(self.controls_content_frame)
         behavior_frame.pack(fill="x", padx=10, pady=10)
         behavior_title = customtkinter.CTkLabel(behavior_frame, text="Human Behavior Delays", font=customtkinter.CTkFont(weight="bold"))
@@ -462,11 +470,7 @@ class BingAutomatorApp(customtkinter.CTk):
                      logger.log(f"Error scrolling to profile (both methods failed): {e_fallback}", "WARN")
 
     def _update_points_category_display(self):
-        counts = {key: 0 for key in self.point_brackets}; total_points = 0; profile_count = 0
-        for profile in self.profiles:
-            points = profile.available_points; total_points += points; profile_count += 1
-            for key, (lower, upper) in self.point_brackets.items():
-                if lower <= points < upper: counts[key] += 1; break
+        counts = bracket_counts([profile.available_points for profile in self.profiles], self.point_brackets)
         for key, label in self.cat_labels.items():
             if label:
                 label.configure(text=f"{key}: {counts.get(key, 0)}")
@@ -501,127 +505,29 @@ class BingAutomatorApp(customtkinter.CTk):
     def _automation_worker(self, profiles_to_run: List[EdgeProfile], stop_event: threading.Event):
         try:
             self.selenium_lock.acquire()
-            todays_progress_history = self.automation_service.load_todays_progress_from_history()
-            batch_size = self.batch_slider.get(); pc_searches_target = self.pc_slider.get() // 3; num_profiles = len(profiles_to_run)
-            total_possible_searches = num_profiles * pc_searches_target
-            if pc_searches_target == 0: self._update_status("PC searches set to 0. Skipping search task.");
-            elif total_possible_searches == 0 and num_profiles > 0: self._update_status("Effective searches is 0 (check profile count).")
-            elif num_profiles == 0: self._update_status("No profiles selected.")
-            else:
-                self.overall_progress_label.configure(text=f"0 / {total_possible_searches * 3} Points"); self.overall_progress_bar.set(0)
-                self._update_status("Search Automation started..."); searches_completed_so_far = 0
-                post_search_delay = (self.settings["post_search_delay_min"], self.settings["post_search_delay_max"])
-                scroll_delay = (self.settings["scroll_delay_min"], self.settings["scroll_delay_max"])
-                mouse_move_duration = (self.settings["mouse_move_duration_min"], self.settings["mouse_move_duration_max"])
-                key_press_delay = (self.settings["key_press_delay_min"], self.settings["key_press_delay_max"])
-                is_smart_mode = self.settings.get("smart_search_mode", True)
-
-                for i in range(0, num_profiles, batch_size):
-                    if stop_event.is_set(): break
-                    batch = profiles_to_run[i:i + batch_size]; batch_num = (i // batch_size) + 1
-                    self._update_status(f"Processing Batch {batch_num}...")
-                    def create_progress_updater(searches_done_before_this_run, total_searches_in_run):
-                        def update_progress_bars(searches_done_this_run, total_searches_this_run_param):
-                            progress_val = (searches_done_this_run / total_searches_this_run_param) if total_searches_this_run_param > 0 else 0; self.batch_progress_bar.set(progress_val)
-                            self.batch_progress_label.configure(text=f"{searches_done_this_run * 3} / {total_searches_this_run_param * 3} Points")
-                            current_overall_searches = searches_done_before_this_run + searches_done_this_run
-                            overall_progress_val = (current_overall_searches / total_possible_searches) if total_possible_searches > 0 else 0; self.overall_progress_bar.set(overall_progress_val)
-                            self.overall_progress_label.configure(text=f"{current_overall_searches * 3} / {total_possible_searches * 3} Points")
-                        return update_progress_bars
-
-                    initial_searches_in_batch = pc_searches_target * len(batch) if pc_searches_target > 0 else 0
-                    if initial_searches_in_batch > 0:
-                        self.automation_service.run_search_session(profiles=batch, pc_searches=pc_searches_target, stop_event=stop_event, progress_callback=self._update_status, on_search_progress=create_progress_updater(searches_completed_so_far, initial_searches_in_batch), post_search_delay=post_search_delay, scroll_delay=scroll_delay, mouse_move_duration=mouse_move_duration, key_press_delay=key_press_delay)
-                        searches_completed_so_far += initial_searches_in_batch
-
-                    if is_smart_mode and not stop_event.is_set() and pc_searches_target > 0:
-                        MAX_RETRIES = 5; profiles_to_verify = batch[:]
-                        for retry_count in range(MAX_RETRIES):
-                            if stop_event.is_set(): break
-                            self._update_status(f"Batch {batch_num}: Verifying progress (Attempt {retry_count + 1})...")
-                            profiles_to_retry = []; points_needed = []; batch_progress_data = {}
-                            for profile in profiles_to_verify:
-                                if stop_event.is_set(): break
-                                self.after(0, self._scroll_to_profile, profile)
-                                widget = self.profile_widget_map.get(profile); points_data = None; cached_data = todays_progress_history.get(profile.email)
-                                if cached_data and cached_data.get("daily_progress"):
-                                    try:
-                                        progress_str = cached_data["daily_progress"]
-                                        if "N/A" not in progress_str and "Error" not in progress_str:
-                                            earned, max_pts = map(int, re.findall(r'\d+', progress_str))
-                                            if earned >= max_pts:
-                                                self._update_status(f"Skipping fetch for {profile.name}: Already completed.")
-                                                points_data = cached_data
-                                                if widget: self.after(0, widget.update_points_display, points_data)
-                                    except (ValueError, IndexError):
-                                        pass
-                                if points_data is None:
-                                    if widget: self.after(0, widget.update_points_display, {"daily_progress": "Fetching..."})
-                                    points_data = self.automation_service.fetch_points_details(profile, stop_event, headless=True)
-                                    if points_data:
-                                         todays_progress_history[profile.email] = points_data
-                                         try:
-                                             cleaned_pts = points_data.get("available_points", "0").replace(",", "");
-                                             if cleaned_pts.isdigit():
-                                                 profile.available_points = int(cleaned_pts)
-                                             else:
-                                                 profile.available_points = 0
-                                         except (ValueError, AttributeError):
-                                             profile.available_points = 0
-                                    if widget: self.after(0, widget.update_points_display, points_data)
-                                batch_progress_data[profile] = points_data
-                                progress_str = points_data.get("daily_progress") if points_data else None
-                                if progress_str and "N/A" not in progress_str and "Error" not in progress_str:
-                                    try:
-                                        earned, max_pts = map(int, re.findall(r'\d+', progress_str))
-                                        if earned < max_pts:
-                                            profiles_to_retry.append(profile)
-                                            points_needed.append(max_pts - earned)
-                                    except (ValueError, IndexError):
-                                        logger.log(f"Could not parse progress string: '{progress_str}'", "WARN")
-                            if not profiles_to_retry:
-                                self._update_status(f"Batch {batch_num}: All points collected.")
-                                break
-                            profiles_to_verify = profiles_to_retry[:]
-                            max_points_needed = max(points_needed) if points_needed else 0
-                            searches_for_next_cycle = math.ceil(max_points_needed / 3)
-                            use_slower_delay = len(profiles_to_retry) <= 2
-                            self._update_status(f"Batch {batch_num}: {len(profiles_to_retry)} profiles need more points. Retrying with {searches_for_next_cycle} searches...")
-                            total_retry_searches = searches_for_next_cycle * len(profiles_to_retry)
-                            if total_retry_searches > 0 :
-                                 self.automation_service.run_search_session(
-                                     profiles=profiles_to_retry, pc_searches=searches_for_next_cycle, stop_event=stop_event, use_retry_delay=use_slower_delay,
-                                     progress_callback=self._update_status, on_search_progress=create_progress_updater(searches_completed_so_far, total_retry_searches),
-                                     post_search_delay=post_search_delay, scroll_delay=scroll_delay, mouse_move_duration=mouse_move_duration, key_press_delay=key_press_delay
-                                 )
-                                 searches_completed_so_far += total_retry_searches
-                            else:
-                                self._update_status(f"Batch {batch_num}: No points needed for retry, skipping.")
-                        else:
-                            self._update_status(f"Batch {batch_num}: Max retries reached.")
-                        
-                        if not stop_event.is_set():
-                            self._update_status(f"Batch {batch_num}: Saving final progress to history...")
-                            if batch_progress_data:
-                                for profile, points_data in batch_progress_data.items():
-                                     if points_data and "Error" not in points_data.get("daily_progress", ""):
-                                         self.automation_service.save_progress_to_history(profile, points_data)
-                                         todays_progress_history[profile.email] = points_data
-                                self.after(0, self._update_points_category_display)
-
-                    elif not is_smart_mode:
-                        self._update_status(f"Batch {batch_num}: Smart Search disabled, skipping point verification.")
-
-                if not stop_event.is_set() and i + batch_size >= num_profiles:
-                     if num_profiles > 0 and pc_searches_target > 0:
-                          self._update_status(f"Search Automation Complete!")
-                elif stop_event.is_set():
-                     self._update_status("Search Automation Stopped by User.")
+            batch_size = self.batch_slider.get(); pc_searches_target = self.pc_slider.get() // 3
+
+            def on_overall_started(total_searches):
+                self.overall_progress_label.configure(text=f"0 / {total_searches * 3} Points"); self.overall_progress_bar.set(0)
+            def on_search_progress(batch_done, batch_total, overall_done, overall_total):
+                self.batch_progress_bar.set((batch_done / batch_total) if batch_total > 0 else 0)
+                self.batch_progress_label.configure(text=f"{batch_done * 3} / {batch_total * 3} Points")
+                self.overall_progress_bar.set((overall_done / overall_total) if overall_total > 0 else 0)
+                self.overall_progress_label.configure(text=f"{overall_done * 3} / {overall_total * 3} Points")
+            def on_profile_points(profile, points_data):
+                widget = self.profile_widget_map.get(profile)
+                if widget: self.after(0, widget.update_points_display, points_data)
+
+            callbacks = RunnerCallbacks(status=self._update_status, overall_started=on_overall_started, search_progress=on_search_progress, profile_points=on_profile_points,
+                                        profile_focus=lambda profile: self.after(0, self._scroll_to_profile, profile),
+                                        progress_saved=lambda: self.after(0, self._update_points_category_display))
+            AutomationRunner(self.automation_service, self.settings, callbacks).run(profiles_to_run, stop_event, batch_size, pc_searches_target)
 
         except Exception as e:
             logger.log(f"Error in automation worker: {e}", "ERROR")
             self._update_status(f"Error occurred: {e}")
         finally:
+            self.automation_service.driver_pool.close_all(); self.automation_service.driver_pool.log_stats()
             self.after(0, self._save_all_profiles_to_json) # Save profile points
             self.start_button.configure(text="Start Searches", command=self._start_automation_thread, state="normal", fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"], hover_color=customtkinter.ThemeManager.theme["CTkButton"]["hover_color"])
             self.fetch_progress_button.configure(state="normal")
@@ -643,48 +549,42 @@ class BingAutomatorApp(customtkinter.CTk):
             total_profiles = len(profiles_to_run)
             if total_profiles == 0: self._update_status("No profiles selected to fetch."); return
             self.selenium_lock.acquire()
+            timer = self.automation_service.timer; timer.reset(); started = datetime.now(); start = timer.clock()
             self._update_status("Fetching all points...")
             self.overall_progress_label.configure(text=f"0 / {total_profiles} Profiles"); self.overall_progress_bar.set(0)
             self.batch_progress_label.configure(text="N/A"); self.batch_progress_bar.set(0)
             todays_progress_history = self.automation_service.load_todays_progress_from_history()
             self.automation_service.close_all_edge_windows(); time.sleep(1)
-            for i, profile in enumerate(profiles_to_run):
+            profiles_to_fetch = []; done_count = 0
+            def mark_profile_done():
+                nonlocal done_count
+                done_count += 1
+                self.overall_progress_bar.set(done_count / total_profiles); self.overall_progress_label.configure(text=f"{done_count} / {total_profiles} Profiles")
+            for profile in profiles_to_run:
                 if stop_event.is_set(): break
-                self.after(0, self._scroll_to_profile, profile); widget = self.profile_widget_map.get(profile)
-                cached_data = todays_progress_history.get(profile.email); is_complete = False
-                if cached_data and cached_data.get("daily_progress"):
-                    try:
-                        progress_str = cached_data["daily_progress"]
-                        if "N/A" not in progress_str and "Error" not in progress_str:
-                            earned, max_pts = map(int, re.findall(r'\d+', progress_str))
-                            if earned >= max_pts: is_complete = True
-                    except (ValueError, IndexError): pass
-                if is_complete:
+                widget = self.profile_widget_map.get(profile); cached_data = todays_progress_history.get(profile.email)
+                if cached_data and is_progress_complete(cached_data.get("daily_progress")):
                     self._update_status(f"Skipping fetch for {profile.name}: Already completed (from history).")
-                    if widget and cached_data:
-                         widget.update_points_display(cached_data)
-                         try:
-                             cleaned_pts = cached_data.get("available_points", "0").replace(",", "")
-                             if cleaned_pts.isdigit(): profile.available_points = int(cleaned_pts)
-                             else: profile.available_points = 0
-                         except (ValueError, AttributeError): profile.available_points = 0
+                    if widget: widget.update_points_display(cached_data)
+                    set_profile_points(profile, cached_data)
+                    mark_profile_done()
                 else:
+                    profiles_to_fetch.append(profile)
                     if widget: widget.update_points_display({"available_points": "Fetching...", "daily_progress": "Fetching..."})
-                    points_data = self.automation_service.fetch_points_details(profile, stop_event, headless=True)
-                    if points_data and widget:
-                        widget.update_points_display(points_data)
-                        try:
-                            cleaned_pts = points_data.get("available_points", "0").replace(",", "")
-                            if cleaned_pts.isdigit(): profile.available_points = int(cleaned_pts)
-                            elif "Error" in cleaned_pts: profile.available_points = 0
-                            else: profile.available_points = 0
-                        except (ValueError, AttributeError): profile.available_points = 0
-                        if "Error" not in points_data.get("daily_progress", ""): self.automation_service.save_progress_to_history(profile, points_data)
-                self.overall_progress_bar.set((i + 1) / total_profiles); self.overall_progress_label.configure(text=f"{i + 1} / {total_profiles} Profiles")
+            def on_points_fetched(profile, points_data):
+                self.after(0, self._scroll_to_profile, profile); widget = self.profile_widget_map.get(profile)
+                if points_data and widget:
+                    widget.update_points_display(points_data)
+                    set_profile_points(profile, points_data)
+                    if "Error" not in (points_data.get("daily_progress") or "Error"): self.automation_service.save_progress_to_history(profile, points_data)
+                mark_profile_done()
+            with timer.span("verify"): self.automation_service.fetch_points_for_profiles(profiles_to_fetch, stop_event, headless=True, max_workers=self.settings["fetch_workers"], on_result=on_points_fetched)
+            timer.log_breakdown("Points fetch"); SessionLedger().append("fetch", started, timer.clock() - start, total_profiles, 0, None, timer, stopped=stop_event.is_set())
             if stop_event.is_set(): self._update_status("Points fetching stopped by user.")
             else: self._update_status("Points fetching complete.")
         except Exception as e: logger.log(f"Error in fetch progress worker: {e}", "ERROR"); self._update_status(f"Error occurred during fetch: {e}")
         finally:
+            self.automation_service.driver_pool.close_all(); self.automation_service.driver_pool.log_stats()
             self.after(0, self._update_points_category_display) # Update categories after fetching
             self.after(0, self._save_all_profiles_to_json) # Save fetched points
             self.start_button.configure(state="normal"); self.fetch_progress_button.configure(text="Fetch All Points", command=self._start_fetch_progress_thread, state="normal", fg_color="teal")
@@ -700,9 +600,35 @@ class BingAutomatorApp(customtkinter.CTk):
     def _start_scheduler_thread(self):
         scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True); scheduler_thread.start()
 
+    def _compact_history_worker(self):
+        duplicates, archived = self.automation_service.compact_history()
+        if duplicates or archived: self.after(0, self._update_status, f"History compacted: {duplicates} duplicate rows dropped, {archived} rows archived.")
+
+    def _start_history_compaction(self):
+        threading.Thread(target=self._compact_history_worker, name="HistoryCompaction", daemon=True).start()
+
+    def _points_report_worker(self):
+        if not self.automation_service.open_points_report(): self.after(0, self._update_status, "Could not build the points report. See log for details.")
+
+    def _startup_history_worker(self):
+        """Compaction, then the analytics summary, off the UI thread (compaction first, so analytics reads the compacted history)."""
+        if config.HISTORY_AUTO_COMPACT: self._compact_history_worker()
+        if config.ANALYTICS_AT_STARTUP:
+            analytics = self.automation_service.points_analytics()
+            if analytics is not None and len(analytics): logger.log(analytics.summary(), "INFO"); self.after(0, self._update_status, analytics.summary())
+
     def _on_closing(self):
+        """Ending the app's Edge processes can take PROCESS_GRACEFUL_TIMEOUT, so it runs off the Tk thread and the window stays responsive until it's done."""
         if self.stop_event: self.stop_event.set()
-        self._save_settings(); self._save_all_profiles_to_json(); self.destroy()
+        self.protocol("WM_DELETE_WINDOW", lambda: None) # A second click on X waits for the first
+        self._save_settings(); self._save_all_profiles_to_json()
+        self._update_status("Closing... ending the Edge windows and drivers this app started.")
+        threading.Thread(target=self._shutdown_worker, name="Shutdown", daemon=True).start()
+
+    def _shutdown_worker(self):
+        try: self.automation_service.shutdown()
+        except Exception as e: logger.log(f"Shutdown did not finish cleanly: {e}", "ERROR")
+        finally: self.after(0, self.destroy)
 
     def _toggle_schedule(self):
         self.settings["schedule_enabled"] = self.schedule_switch_var.get() == "on"; self._save_settings()
@@ -769,7 +695,7 @@ class BingAutomatorApp(customtkinter.CTk):
         num_profiles = len(self.profiles)
         batch_options = [f"{i + 1}-{min(i + batch_size, num_profiles)}" for i in range(0, num_profiles, batch_size)]
         points_range_options = [ f"Select {k} Pts" for k in self.point_brackets.keys() ] # Use keys from dict
-        standard_options = [ "Options", "Inverse Selection", "Selected Info", "Custom Range...", "--- Select Batches ---", *batch_options, "--- Select by Points ---", *points_range_options, "--- Utilities ---", "Auto-detect Profiles", "Open Log File", "Clear Log File", "View History", "Clear History File" ]
+        standard_options = [ "Options", "Inverse Selection", "Selected Info", "Custom Range...", "--- Select Batches ---", *batch_options, "--- Select by Points ---", *points_range_options, "--- Utilities ---", "Auto-detect Profiles", "Open Log File", "Clear Log File", "View History", "Points Analytics", "Compact History", "Clear History File" ]
         self.optionmenu.configure(values=standard_options)
 
     def _optionmenu_callback(self, choice: str):
@@ -829,6 +755,10 @@ class BingAutomatorApp(customtkinter.CTk):
                 self._update_status("Opening history file...")
             else:
                 self._update_status("Could not open history file. Fetch some progress first.")
+        elif choice == "Points Analytics":
+            self._update_status("Building points report..."); threading.Thread(target=self._points_report_worker, name="PointsReport", daemon=True).start()
+        elif choice == "Compact History":
+            self._update_status("Compacting history in the background..."); self._start_history_compaction()
         elif choice == "Clear History File":
             if self.automation_service.clear_history_file():
                 self._update_status("History file has been cleared.")
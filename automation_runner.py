@@ -0,0 +1,330 @@
+# BingRewardSearch/automation_runner.py
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from edge_profile import EdgeProfile
+from automation_service import AutomationService, SearchSession
+from planner import ProfilePlan, SearchPlanner
+from history_store import parse_daily_progress
+from credit_model import CreditModel
+from timing import SessionLedger
+from logger import logger
+import config
+
+MAX_RETRIES = 5
+
+
+def _noop(*args): pass
+
+
+def is_progress_complete(progress_str: Optional[str]) -> bool:
+    parsed = parse_daily_progress(progress_str)
+    return parsed is not None and parsed[0] >= parsed[1]
+
+
+def set_profile_points(profile: EdgeProfile, points_data: Dict[str, str]):
+    try:
+        cleaned_pts = (points_data.get("available_points") or "0").replace(",", "")
+        profile.available_points = int(cleaned_pts) if cleaned_pts.isdigit() else 0
+    except (ValueError, AttributeError): profile.available_points = 0
+
+
+@dataclass
+class RunnerCallbacks:
+    """Hooks the UI (or a benchmark) uses to follow a run. All are optional."""
+    status: Callable[[str], None] = lambda message: logger.log(message)
+    overall_started: Callable[[int], None] = _noop                    # total searches planned
+    search_progress: Callable[[int, int, int, int], None] = _noop     # batch done/total, overall done/total
+    profile_points: Callable[[EdgeProfile, Dict[str, str]], None] = _noop
+    profile_focus: Callable[[EdgeProfile], None] = _noop
+    progress_saved: Callable[[], None] = _noop
+
+
+@dataclass
+class RunStats:
+    batches: int = 0
+    searches_requested: int = 0
+    searches_issued: int = 0
+    planned_searches: int = 0  # First-pass searches from the plan (the credit model's prediction)
+    profiles_retried: int = 0  # Profiles the first pass left short
+    verification_rounds: int = 0
+    retry_cycles: int = 0
+    window_launches: int = 0 # Launches inside kept-open sessions
+    points_fetches: int = 0
+    points_gained: Optional[int] = None # Only known when smart mode verified the batch
+    duration: float = 0.0
+    pipelined: bool = False
+    verify_seconds: float = 0.0   # Time spent verifying...
+    stall_seconds: float = 0.0    # ...and the part of it the input sat waiting (all of it unless pipelined)
+    searches_by_profile: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class BatchState:
+    """One batch on its way through searching, verification and retries."""
+    num: int
+    profiles: List[EdgeProfile]
+    session: Optional[SearchSession] = None
+    to_verify: List[EdgeProfile] = field(default_factory=list)
+    progress_data: Dict[EdgeProfile, Dict[str, str]] = field(default_factory=dict)
+    rounds: int = 0 # Verification rounds so far
+
+    def __post_init__(self):
+        if not self.to_verify: self.to_verify = self.profiles[:]
+
+
+class AutomationRunner:
+    """
+    The 'Start Searches' loop: batched searches, then (in smart mode) verify-and-retry
+    cycles until every profile in the batch reports its daily PC points.
+
+    Independent of the UI so it can be driven headless by benchmark.py.
+    """
+    def __init__(self, service: AutomationService, settings: dict, callbacks: Optional[RunnerCallbacks] = None, ledger: Optional[SessionLedger] = None):
+        self.service = service
+        self.settings = settings
+        self.callbacks = callbacks or RunnerCallbacks()
+        self.ledger = ledger or SessionLedger()
+        self.model = CreditModel() if config.CREDIT_MODEL_ENABLED else None
+        self.planner = SearchPlanner(service, self.model)
+        self.stats = RunStats()
+        self._earned_at_start: Dict[str, int] = {}
+        self._earned_now: Dict[str, int] = {}
+        self._earned_at_verify: Dict[EdgeProfile, int] = {}       # For the credit log: earned at the last check...
+        self._searched_since_verify: Dict[EdgeProfile, int] = {}  # ...and searches typed since
+        self._retried = set()
+        self._lock = threading.Lock() # The state above, todays_progress_history and the credit log: pipelined verifications run on their own threads
+        self._searches_done = 0; self._total_searches = 0 # For the overall progress bar
+
+    def _delays(self) -> Dict[str, Tuple[float, float]]:
+        s = self.settings
+        return {
+            "post_search_delay": (s["post_search_delay_min"], s["post_search_delay_max"]),
+            "scroll_delay": (s["scroll_delay_min"], s["scroll_delay_max"]),
+            "mouse_move_duration": (s["mouse_move_duration_min"], s["mouse_move_duration_max"]),
+            "key_press_delay": (s["key_press_delay_min"], s["key_press_delay_max"]),
+        }
+
+    def _search(self, quotas: Dict[EdgeProfile, int], stop_event: threading.Event, on_search_progress, use_retry_delay: bool = False, session: Optional[SearchSession] = None):
+        issued = self.service.run_search_session(profiles=list(quotas), pc_searches=0, quotas=quotas, stop_event=stop_event, use_retry_delay=use_retry_delay,
+                                                 progress_callback=self.callbacks.status, on_search_progress=on_search_progress, session=session, **self._delays())
+        with self._lock:
+            self.stats.searches_issued += sum(issued.values())
+            self.stats.searches_requested += sum(quotas.values())
+            for profile, searches in issued.items(): # Typed, not planned: a search that never happened must not count as uncredited
+                self._searched_since_verify[profile] = self._searched_since_verify.get(profile, 0) + searches
+                self.stats.searches_by_profile[profile.email] = self.stats.searches_by_profile.get(profile.email, 0) + searches
+
+    def run(self, profiles_to_run: List[EdgeProfile], stop_event: threading.Event, batch_size: int, pc_searches_target: int) -> RunStats:
+        """Runs every batch, then logs the per-phase breakdown and appends the run to the session ledger."""
+        timer = self.service.timer; timer.reset(); self.service.launch_latency.reset()
+        started = datetime.now(); start = timer.clock()
+        try: return self._run(profiles_to_run, stop_event, batch_size, pc_searches_target)
+        finally:
+            self.stats.duration = timer.clock() - start; timer.batch = None
+            if self._earned_now: self.stats.points_gained = sum(earned - self._earned_at_start.get(email, 0) for email, earned in self._earned_now.items())
+            self.stats.profiles_retried = len(self._retried)
+            self.stats.verify_seconds = timer.seconds("verify"); self.stats.stall_seconds = timer.seconds("stall") if self.stats.pipelined else self.stats.verify_seconds
+            if self.stats.searches_requested:
+                timer.log_breakdown("Search run"); self.service.launch_latency.log_stats()
+                if self.model: logger.log(f"Credit model: predicted {self.stats.planned_searches} searches, issued {self.stats.searches_requested} in total; "
+                                          f"{self.stats.profiles_retried} profiles needed retries, {self.stats.verification_rounds} verification rounds.", "INFO")
+                if self.stats.pipelined: logger.log(f"Pipeline: verification took {self.stats.verify_seconds:.0f}s, {self.stats.verify_seconds - self.stats.stall_seconds:.0f}s of it "
+                                                    f"overlapped with searching; the input waited {self.stats.stall_seconds:.0f}s.", "INFO")
+                self.ledger.append("search", started, self.stats.duration, len(profiles_to_run), self.stats.searches_issued, self.stats.points_gained, timer, stopped=stop_event.is_set())
+
+    def _run(self, profiles_to_run: List[EdgeProfile], stop_event: threading.Event, batch_size: int, pc_searches_target: int) -> RunStats:
+        status = self.callbacks.status
+        todays_progress_history = self.service.load_todays_progress_from_history()
+        num_profiles = len(profiles_to_run)
+        if pc_searches_target == 0: status("PC searches set to 0. Skipping search task."); return self.stats
+        elif num_profiles == 0: status("No profiles selected."); return self.stats
+
+        # Pre-flight: only the searches each profile still needs today, complete profiles dropped.
+        status("Planning searches from today's progress...")
+        if self.model: self.model.load()
+        plans = self.planner.plan(profiles_to_run, pc_searches_target, todays_progress_history, stop_event, max_workers=self.settings["fetch_workers"])
+        for plan in plans:
+            if plan.earned is not None: self._earned_at_start[plan.profile.email] = self._earned_at_verify[plan.profile] = plan.earned # Left unset when there is no row today: points_gained then counts from 0
+            if plan.complete:
+                status(f"Skipping {plan.profile.name}: today's points already collected.")
+                self.callbacks.profile_points(plan.profile, todays_progress_history[plan.profile.email])
+        batches = self.planner.pack(plans, batch_size)
+        total_possible_searches = self.stats.planned_searches = sum(plan.searches for plan in plans)
+        if total_possible_searches == 0: status("All selected profiles already have today's search points."); return self.stats
+
+        self.callbacks.overall_started(total_possible_searches)
+        status("Search Automation started..."); self._total_searches = total_possible_searches
+        is_smart_mode = self.settings.get("smart_search_mode", True)
+        keep_windows = is_smart_mode and config.KEEP_WINDOWS_BETWEEN_RETRIES and config.FETCH_ISOLATED_PROFILES
+        if keep_windows and config.PIPELINE_BATCHES and len(batches) > 1:
+            self.stats.pipelined = True; self._run_pipelined(batches, stop_event, todays_progress_history)
+        else:
+            for batch_num, batch_plans in enumerate(batches, start=1):
+                if stop_event.is_set(): break
+                batch = self._new_batch(batch_num, batch_plans, keep_windows)
+                try:
+                    self._initial_search(batch, batch_plans, len(batches), stop_event)
+                    if is_smart_mode and not stop_event.is_set(): self._verify_and_retry(batch, stop_event, todays_progress_history)
+                    elif not is_smart_mode: status(f"Batch {batch_num}: Smart Search disabled, skipping point verification.")
+                finally: self._end_batch(batch)
+
+        if stop_event.is_set(): status("Search Automation Stopped by User.")
+        else: status("Search Automation Complete!")
+        return self.stats
+
+    def _progress_updater(self):
+        searches_done_before_this_run = self._searches_done
+        def update_progress_bars(searches_done_this_run, total_searches_this_run):
+            self.callbacks.search_progress(searches_done_this_run, total_searches_this_run, searches_done_before_this_run + searches_done_this_run, self._total_searches)
+        return update_progress_bars
+
+    def _new_batch(self, batch_num: int, batch_plans: List[ProfilePlan], keep_windows: bool) -> "BatchState":
+        # Launch once per batch: windows live through verification and retries (see KEEP_WINDOWS_BETWEEN_RETRIES).
+        profiles = [plan.profile for plan in batch_plans]
+        return BatchState(batch_num, profiles, self.service.open_search_session(profiles) if keep_windows else None)
+
+    def _initial_search(self, batch: "BatchState", batch_plans: List[ProfilePlan], num_batches: int, stop_event: threading.Event):
+        self.callbacks.status(f"Processing Batch {batch.num}/{num_batches}..."); self.stats.batches += 1; self.service.timer.batch = batch.num
+        initial_searches_in_batch = sum(plan.searches for plan in batch_plans)
+        if initial_searches_in_batch > 0:
+            self._search({plan.profile: plan.searches for plan in batch_plans}, stop_event, self._progress_updater(), session=batch.session)
+            self._searches_done += initial_searches_in_batch
+
+    def _end_batch(self, batch: "BatchState", close_all: bool = True):
+        if batch.session:
+            self.stats.window_launches += batch.session.launches; self.service.end_search_session(batch.session, close_all=close_all)
+
+    def _verify_and_retry(self, batch: "BatchState", stop_event: threading.Event, todays_progress_history: Dict[str, Dict[str, str]]):
+        for _ in range(MAX_RETRIES):
+            if stop_event.is_set(): break
+            retry_quotas = self._verify(batch, stop_event, todays_progress_history)
+            self._close_finished(batch, retry_quotas)
+            if not retry_quotas: break
+            self._retry(batch, retry_quotas, stop_event)
+        else:
+            self.callbacks.status(f"Batch {batch.num}: Max retries reached.")
+        self._save_batch_progress(batch, stop_event, todays_progress_history)
+
+    def _run_pipelined(self, batches: List[List[ProfilePlan]], stop_event: threading.Event, todays_progress_history: Dict[str, Dict[str, str]]):
+        """
+        Smart mode with the batches overlapped: once a batch's first searches are typed its verification
+        runs on a background thread while the input moves on to the next batch. A finished verification's
+        retries are typed as soon as the input is free, ahead of starting another batch. At most
+        PIPELINE_DEPTH batches have windows open; each closes only its own windows when it's done.
+        """
+        status = self.callbacks.status; timer = self.service.timer; input_backend = self.service.input
+        pending = list(enumerate(batches, start=1)); in_flight: List[Tuple[BatchState, Future]] = []
+        verifier = ThreadPoolExecutor(max_workers=config.PIPELINE_DEPTH, thread_name_prefix="Verify") # One verification per batch in flight, never queued
+        def verify(batch): return verifier.submit(input_backend.background(self._verify), batch, stop_event, todays_progress_history)
+        try:
+            while True:
+                ready = next((item for item in in_flight if item[1].done()), None)
+                if ready:
+                    in_flight.remove(ready); batch, future = ready; retry_quotas = future.result()
+                    self._close_finished(batch, retry_quotas)
+                    if retry_quotas and not stop_event.is_set():
+                        self._retry(batch, retry_quotas, stop_event)
+                        if batch.rounds < MAX_RETRIES: in_flight.append((batch, verify(batch))); continue
+                        status(f"Batch {batch.num}: Max retries reached.")
+                    self._save_batch_progress(batch, stop_event, todays_progress_history); self._end_batch(batch, close_all=False)
+                elif pending and not stop_event.is_set() and len(in_flight) < config.PIPELINE_DEPTH:
+                    batch_num, batch_plans = pending.pop(0); batch = self._new_batch(batch_num, batch_plans, keep_windows=True)
+                    if batch_num > 1:
+                        with timer.span("batch_delay"): self.service._pyautogui_human_like_pause(*config.BATCH_DELAY)
+                    in_flight.append((batch, None)) # Owns its windows from here on, even if the searches fail
+                    self._initial_search(batch, batch_plans, len(batches), stop_event)
+                    in_flight[-1] = (batch, verify(batch))
+                elif in_flight:
+                    with timer.span("stall"): input_backend.idle_until(lambda: any(future.done() for _, future in in_flight))
+                else: break
+        finally:
+            input_backend.idle_until(lambda: all(future is None or future.done() for _, future in in_flight)); verifier.shutdown(wait=True)
+            for batch, _ in in_flight: self._end_batch(batch, close_all=False)
+            with timer.span("close"): self.service.close_all_edge_windows()
+
+    def _verify(self, batch: "BatchState", stop_event: threading.Event, todays_progress_history: Dict[str, Dict[str, str]]) -> Dict[EdgeProfile, int]:
+        """One verification round for the batch. Returns the retry searches each short profile needs (empty when done)."""
+        status = self.callbacks.status
+        if stop_event.is_set(): return {}
+        status(f"Batch {batch.num}: Verifying progress (Attempt {batch.rounds + 1})...")
+        batch.rounds += 1
+        with self._lock: self.stats.verification_rounds += 1
+        profiles_to_retry = []; points_needed = []; profiles_to_fetch = []
+        for profile in batch.to_verify:
+            if stop_event.is_set(): break
+            with self._lock: cached_data = todays_progress_history.get(profile.email)
+            if cached_data and is_progress_complete(cached_data.get("daily_progress")):
+                status(f"Skipping fetch for {profile.name}: Already completed.")
+                batch.progress_data[profile] = cached_data
+                self.callbacks.profile_points(profile, cached_data)
+            else:
+                profiles_to_fetch.append(profile)
+                self.callbacks.profile_points(profile, {"daily_progress": "Fetching..."})
+
+        if batch.session: self.service.close_windows_blocking_fetch(batch.session, profiles_to_fetch)
+
+        def on_points_fetched(profile, points_data):
+            self.callbacks.profile_focus(profile)
+            if points_data:
+                with self._lock: todays_progress_history[profile.email] = points_data
+                set_profile_points(profile, points_data)
+            self.callbacks.profile_points(profile, points_data)
+        with self._lock: self.stats.points_fetches += len(profiles_to_fetch)
+        with self.service.timer.span("verify", batch=batch.num):
+            batch.progress_data.update(self.service.fetch_points_for_profiles(profiles_to_fetch, stop_event, headless=True, max_workers=self.settings["fetch_workers"], on_result=on_points_fetched, batch=batch.num))
+
+        observations = []; unverified = []
+        with self._lock:
+            for profile in batch.to_verify:
+                points_data = batch.progress_data.get(profile)
+                progress_str = points_data.get("daily_progress") if points_data else None
+                parsed = parse_daily_progress(progress_str)
+                if parsed is None: # Failed or timed out: unknown, not done
+                    if progress_str and "N/A" not in progress_str and "Error" not in progress_str: logger.log(f"Could not parse progress string: '{progress_str}'", "WARN")
+                    if not stop_event.is_set(): unverified.append(profile); profiles_to_retry.append(profile); points_needed.append(0)
+                    continue
+                earned, max_pts = parsed
+                self._earned_now[profile.email] = earned
+                searched = self._searched_since_verify.pop(profile, 0); earned_before = self._earned_at_verify.get(profile)
+                if searched and earned_before is not None: observations.append((profile.email, searched, earned - earned_before, earned, max_pts))
+                self._earned_at_verify[profile] = earned
+                if earned < max_pts:
+                    profiles_to_retry.append(profile); self._retried.add(profile)
+                    points_needed.append(max_pts - earned)
+            if self.model: self.model.record(observations) # One writer at a time, so credit-log rows never interleave
+        if not profiles_to_retry:
+            status(f"Batch {batch.num}: All points collected.")
+            return {}
+        if unverified: status(f"Batch {batch.num}: Could not read the progress of {len(unverified)} profile(s); fetching again next round.")
+        batch.to_verify = profiles_to_retry[:]
+        # Each profile gets just the searches its own shortfall needs (3 points per search, or its learned rate); unverified ones only a refetch.
+        with self._lock: return {profile: self.planner.searches_for(profile, needed) if needed else 0 for profile, needed in zip(profiles_to_retry, points_needed)}
+
+    def _close_finished(self, batch: "BatchState", retry_quotas: Dict[EdgeProfile, int]):
+        if batch.session: self.service.close_session_windows(batch.session, [p for p in list(batch.session.windows) if p not in retry_quotas])
+
+    def _retry(self, batch: "BatchState", retry_quotas: Dict[EdgeProfile, int], stop_event: threading.Event):
+        status = self.callbacks.status
+        retry_quotas = {profile: searches for profile, searches in retry_quotas.items() if searches > 0} # Unverified profiles are only refetched: no window relaunched for them
+        if not retry_quotas: status(f"Batch {batch.num}: No points needed for retry, skipping."); return
+        use_slower_delay = len(retry_quotas) <= 2
+        total_retry_searches = sum(retry_quotas.values())
+        status(f"Batch {batch.num}: {len(retry_quotas)} profiles need more points. Retrying with {min(retry_quotas.values())}-{max(retry_quotas.values())} searches each ({total_retry_searches} total)...")
+        self.stats.retry_cycles += 1; self.service.timer.batch = batch.num
+        self._search(retry_quotas, stop_event, self._progress_updater(), use_retry_delay=use_slower_delay, session=batch.session)
+        self._searches_done += total_retry_searches
+
+    def _save_batch_progress(self, batch: "BatchState", stop_event: threading.Event, todays_progress_history: Dict[str, Dict[str, str]]):
+        if stop_event.is_set(): return
+        self.callbacks.status(f"Batch {batch.num}: Saving final progress to history...")
+        if batch.progress_data:
+            for profile, points_data in batch.progress_data.items():
+                if points_data and "Error" not in (points_data.get("daily_progress") or "Error"):
+                    self.service.save_progress_to_history(profile, points_data)
+                    with self._lock: todays_progress_history[profile.email] = points_data
+            self.callbacks.progress_saved()
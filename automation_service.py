@@ -1,224 +1,419 @@
 # BingRewardSearch/automation_service.py
 
-import subprocess
 import time
 from typing import List, Callable, Optional, Dict, Tuple
 import json
 import os
-import re
 import random
 import threading
-import csv
-from datetime import date
-
-# PyAutoGUI Imports
-import pyautogui
-import pygetwindow as gw
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Selenium Imports
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
-from wonderwords import RandomWord
-import wikipediaapi
-
 from edge_profile import EdgeProfile
+from input_backend import InputBackend, BrowserLauncher, PyAutoGUIBackend, EdgeLauncher, Window
+from query_generator import SearchQueryGenerator, QueryPool
+from driver_pool import WebDriverPool
+from points_scraper import scrape_points, apply_lean_options, enable_request_blocking
+from points_client import PointsClient
+from isolated_profiles import edge_user_data_dir, has_isolated_copy, prepare_isolated_user_data_dir
+from timing import PhaseTimer, LatencyStats
+from process_registry import process_registry
+from history_store import open_history_store
+from history_archive import HistoryArchive, HistoryFrame, compact_history, export_history, query_history
+from analytics import PointsAnalytics
+from progress_cache import ProgressCache
+from search_scheduler import SearchScheduler
 from logger import logger
 import config
 
-# --- Human-like Search Query Generator (Unchanged) ---
-class SearchQueryGenerator:
-    def __init__(self):
-        self.random_word_gen = RandomWord()
-        self.wiki_api = wikipediaapi.Wikipedia('BingRewardSearchBot (merci-k@example.com)', 'en')
-        self.common_phrases = ["what is", "how to", "why is", "where is", "when did", "best way to", "recipe for", "news about", "weather in", "top 10", "reviews for", "compare", "deals for", "meaning of", "history of", "facts about"]
-        logger.log("SearchQueryGenerator initialized.", "SYSTEM")
-    def _get_simple_word(self) -> str: return self.random_word_gen.word()
-    def _get_search_phrase(self) -> str: prefix = random.choice(self.common_phrases); suffix = self.random_word_gen.word(include_parts_of_speech=["nouns", "adjectives"]); return f"{prefix} {suffix}"
-    def _get_wikipedia_topic(self) -> str:
-        try:
-            random_page = self.wiki_api.page(title=None, pageid=None, params={'generator': 'random', 'grnnamespace': 0, 'grnlimit': 1})
-            if random_page and random_page.exists(): title = random_page.title;
-            if len(title) > 8 and len(title) < 75 and ":" not in title: return title
-        except Exception as e: logger.log(f"Error fetching Wikipedia title: {e}", "WARN")
-        return self._get_simple_word()
-    def get_search_term(self) -> str:
-        search_type = random.choices(['phrase', 'simple_word', 'wikipedia_topic'], weights=[0.5, 0.3, 0.2], k=1)[0]
-        if search_type == 'phrase': return self._get_search_phrase()
-        elif search_type == 'wikipedia_topic': return self._get_wikipedia_topic()
-        else: return self._get_simple_word()
+class SearchSession:
+    """The Edge windows of one batch, kept open across the initial searches and smart-mode retries."""
+    def __init__(self, profiles: List[EdgeProfile]):
+        self.profiles = list(profiles)
+        self.windows: Dict[EdgeProfile, Window] = {}
+        self.launches = 0
 
 
 class AutomationService:
-    def __init__(self):
+    def __init__(self, input_backend: Optional[InputBackend] = None, launcher: Optional[BrowserLauncher] = None):
+        # Desktop input by default; a SimulatedBackend/SimulatedLauncher pair runs the loop headless.
+        self.input = input_backend or PyAutoGUIBackend()
+        self.launcher = launcher or EdgeLauncher()
         self.query_generator = SearchQueryGenerator()
-        self.active_drivers = []
-        pyautogui.FAILSAFE = False
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.query_pool = QueryPool(self.query_generator); self.query_pool.start()
+        self.points_client = PointsClient()
+        self.driver_pool = WebDriverPool(self._setup_fetch_driver, max_live=config.FETCH_MAX_WORKERS if config.FETCH_ISOLATED_PROFILES else config.DRIVER_POOL_MAX_LIVE)
+        self._unisolated = set() # Profiles whose isolated copy just failed, for fetch_points_details to fetch on the shared user-data-dir
+        self._shared_fetch_lock = threading.Lock() # The shared user-data-dir admits one browser at a time
+        self.screen_width, self.screen_height = self.input.screen_size()
+        self.timer = PhaseTimer(self.input.now) # Per-phase time for the current run (reset by the caller)
+        self.launch_latency = LatencyStats("Edge launch-to-ready")
+        self.history = open_history_store()
+        self.progress = ProgressCache(self.history).hydrate().start() # Today's progress for every worker and the UI
+        self.archive = HistoryArchive() # Closed months, moved out of self.history by compact_history
 
-    def _setup_driver(self, profile: EdgeProfile, headless: bool = False) -> Optional[webdriver.Edge]:
+    def _setup_driver(self, profile: EdgeProfile, headless: bool = False, user_data_dir: Optional[str] = None, lean: bool = False) -> Optional[webdriver.Edge]:
         try:
-            edge_options = EdgeOptions(); user_data_dir = os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Edge\User Data")
+            edge_options = EdgeOptions(); user_data_dir = user_data_dir or edge_user_data_dir()
             edge_options.add_argument(f"user-data-dir={user_data_dir}"); edge_options.add_argument(f"profile-directory={profile.cmd_arg.split('=')[1]}")
             user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0"
             edge_options.add_argument(f'user-agent={user_agent}'); edge_options.add_argument("--disable-blink-features=AutomationControlled")
             edge_options.add_experimental_option("excludeSwitches", ["enable-automation"]); edge_options.add_experimental_option('useAutomationExtension', False)
             edge_options.add_argument("--no-sandbox"); edge_options.add_argument("--disable-dev-shm-usage"); edge_options.add_argument("--disable-gpu")
             if headless: edge_options.add_argument("--headless"); edge_options.add_argument("--window-size=1920,1080"); logger.log("Headless mode enabled for Selenium points fetching.", "DEBUG")
-            service = EdgeService(executable_path="msedgedriver.exe"); driver = webdriver.Edge(service=service, options=edge_options); return driver
+            if lean: apply_lean_options(edge_options)
+            service = EdgeService(executable_path="msedgedriver.exe"); driver = webdriver.Edge(service=service, options=edge_options)
+            process_registry.register(service.process, "msedgedriver", profile.name) # Its tree includes the browser it drives
+            if lean: enable_request_blocking(driver)
+            return driver
         except Exception as e: logger.log(f"Failed to set up Selenium driver for {profile.name}: {e}", "ERROR"); return None
 
-    def run_search_session(self, profiles: List[EdgeProfile], pc_searches: int, stop_event: threading.Event, use_retry_delay: bool = False, progress_callback: Optional[Callable[[str], None]] = None, on_search_progress: Optional[Callable[[int, int], None]] = None, post_search_delay: Tuple[float, float] = config.POST_SEARCH_DELAY, scroll_delay: Tuple[float, float] = config.SCROLL_DELAY, mouse_move_duration: Tuple[float, float] = config.MOUSE_MOVE_DURATION, key_press_delay: Tuple[float, float] = config.KEY_PRESS_DELAY):
-        if pc_searches <= 0:
+    def _setup_fetch_driver(self, profile: EdgeProfile, headless: bool) -> Optional[webdriver.Edge]:
+        # Headless fetches get a private copy of the profile so several can run at once. Without one the pool gets
+        # nothing and fetch_points_details falls back to a one-at-a-time session on the shared user-data-dir.
+        user_data_dir = None
+        if config.FETCH_ISOLATED_PROFILES and headless:
+            user_data_dir = prepare_isolated_user_data_dir(profile.cmd_arg.split('=')[1])
+            if user_data_dir is None: self._unisolated.add(profile); return None
+        return self._setup_driver(profile, headless=headless, user_data_dir=user_data_dir, lean=config.LEAN_FETCH and headless)
+
+    def open_search_session(self, profiles: List[EdgeProfile]) -> "SearchSession":
+        """A session whose windows stay open across run_search_session calls until end_search_session."""
+        return SearchSession(profiles)
+
+    def close_session_windows(self, session: "SearchSession", profiles: List[EdgeProfile]):
+        """Closes just these profiles' windows (e.g. once they've earned their points); the rest keep running."""
+        with self.timer.span("close"):
+            for profile in profiles:
+                window = session.windows.pop(profile, None)
+                if window is None: continue
+                try: window.close()
+                except self.input.window_errors: pass # Already gone
+        if profiles: logger.log(f"Closed {len(profiles)} finished profile window(s); {len(session.windows)} still open.", "DEBUG")
+
+    def close_windows_blocking_fetch(self, session: "SearchSession", profiles: List[EdgeProfile]) -> List[EdgeProfile]:
+        """
+        Closes the session windows of profiles about to get their first isolated fetch: a running window
+        holds the lock on its cookie store, and without an earlier copy there's nothing to fetch with.
+        Profiles the HTTP client can serve are left open. A retry relaunches the window. Returns those closed.
+        """
+        if not config.FETCH_ISOLATED_PROFILES: return []
+        blocking = [p for p in profiles if p in session.windows and not has_isolated_copy(p.cmd_arg.split('=')[1])
+                    and not (config.USE_HTTP_POINTS_CLIENT and self.points_client.has_cookies(p))]
+        if blocking:
+            logger.log(f"Closing {len(blocking)} window(s) before their first isolated fetch (an open window locks its cookies).", "INFO")
+            self.close_session_windows(session, blocking)
+        return blocking
+
+    def end_search_session(self, session: "SearchSession", close_all: bool = True):
+        """
+        Pauses BATCH_DELAY and kills every Edge process. With close_all=False only this session's windows
+        are closed, so another batch's windows (and headless fetches) keep running.
+        """
+        if not close_all: self.close_session_windows(session, list(session.windows)); return
+        with self.timer.span("batch_delay"): self._pyautogui_human_like_pause(*config.BATCH_DELAY)
+        self.close_session_windows(session, list(session.windows)) # Also covers windows handed to a browser we didn't start
+        with self.timer.span("close"): self.close_all_edge_windows()
+
+    def _session_windows(self, session: "SearchSession", profiles: List[EdgeProfile]) -> Dict[EdgeProfile, Window]:
+        """The session's windows for these profiles, (re)launching any that aren't open."""
+        live = {self.input.window_key(win) for win in self.input.get_windows("Edge")}
+        missing = [p for p in profiles if p not in session.windows or self.input.window_key(session.windows[p]) not in live]
+        if missing:
+            with self.timer.span("launch"): session.windows.update(self._pyautogui_get_edge_windows(missing))
+            session.launches += len(missing)
+        return {p: session.windows[p] for p in profiles if p in session.windows}
+
+    def run_search_session(self, profiles: List[EdgeProfile], pc_searches: int, stop_event: threading.Event, use_retry_delay: bool = False, progress_callback: Optional[Callable[[str], None]] = None, on_search_progress: Optional[Callable[[int, int], None]] = None, post_search_delay: Tuple[float, float] = config.POST_SEARCH_DELAY, scroll_delay: Tuple[float, float] = config.SCROLL_DELAY, mouse_move_duration: Tuple[float, float] = config.MOUSE_MOVE_DURATION, key_press_delay: Tuple[float, float] = config.KEY_PRESS_DELAY, session: Optional["SearchSession"] = None, quotas: Optional[Dict[EdgeProfile, int]] = None) -> Dict[EdgeProfile, int]:
+        """
+        Runs pc_searches searches in each profile's window (or quotas[profile] each, when given), round-robin;
+        a window drops out once its quota is met. Returns the searches actually typed, per profile
+        (missing windows, failed searches and a stop all leave a profile short of its quota).
+        Without a session the windows are launched for this call and killed afterwards; with one they're
+        reused (only missing windows are launched) and left open for the next call.
+        """
+        quotas = {p: quotas.get(p, 0) for p in profiles} if quotas is not None else {p: pc_searches for p in profiles}
+        profiles = [p for p in profiles if quotas[p] > 0]
+        if not profiles:
             if progress_callback: progress_callback("PC searches set to 0. Skipping.")
-            return
+            return {}
         if progress_callback: progress_callback(f"Starting PyAutoGUI searches for {len(profiles)} profiles...")
-        if stop_event.is_set(): return
-        self._pyautogui_open_profiles(profiles); edge_windows = self._pyautogui_get_edge_windows()
+        if stop_event.is_set(): return {}
+        own_session = session is None
+        if own_session:
+            if not config.FETCH_ISOLATED_PROFILES: self.driver_pool.close_all() # Pooled sessions share the user-data-dir with the windows we're about to open
+            session = SearchSession(profiles)
+        edge_windows = self._session_windows(session, profiles)
         if not edge_windows:
             if progress_callback: progress_callback("Error: No Edge windows found for PC search.")
-            self.close_all_edge_windows(); return
-        total_searches_in_batch = pc_searches * len(edge_windows); searches_done_in_batch = 0
+            if own_session:
+                with self.timer.span("close"): self.close_all_edge_windows()
+            return {}
+        total_searches_in_batch = sum(quotas[p] for p in edge_windows); searches_done_in_batch = 0; searches_issued = {p: 0 for p in edge_windows}
+        def searched(profile, window, search_term, done):
+            nonlocal searches_done_in_batch
+            if search_term:
+                searches_issued[profile] += 1
+                if progress_callback: progress_callback(f"Search '{search_term}' ({done}/{quotas[profile]}) in window '{window.title}'")
+            searches_done_in_batch += 1
+            if on_search_progress: on_search_progress(searches_done_in_batch, total_searches_in_batch)
         try:
-            for i in range(pc_searches):
-                if stop_event.is_set(): return
-                for window in edge_windows:
-                    if stop_event.is_set(): return
-                    search_term = self._pyautogui_perform_single_search(window, use_retry_delay, post_search_delay, scroll_delay, mouse_move_duration, key_press_delay)
-                    if search_term and progress_callback: progress_callback(f"Search '{search_term}' ({i+1}/{pc_searches}) in window '{window.title}'")
-                    searches_done_in_batch += 1
-                    if on_search_progress: on_search_progress(searches_done_in_batch, total_searches_in_batch)
+            if config.INTERLEAVE_SEARCHES:
+                # The input serves whichever window is due next while the others "read" their results.
+                # A profile's next search is due one post-search delay (the UI setting) after its last, raised to PROFILE_SEARCH_SPACING if set.
+                def spacing(profile): return max(random.uniform(*post_search_delay), random.uniform(*config.PROFILE_SEARCH_SPACING))
+                scheduler = SearchScheduler({p: quotas[p] for p in edge_windows}, spacing, now=self.input.now())
+                while len(scheduler):
+                    if stop_event.is_set(): return searches_issued
+                    profile, ready_at = scheduler.next(); window = edge_windows[profile]
+                    wait = ready_at - self.input.now()
+                    if wait > 0:
+                        with self.timer.span("idle"): self.input.sleep(wait)
+                    search_term = self._pyautogui_perform_single_search(window, use_retry_delay, post_search_delay, scroll_delay, mouse_move_duration, key_press_delay, profile, interleaved=True, read_previous=scheduler.done[profile] > 0)
+                    scheduler.searched(profile, self.input.now()); searched(profile, window, search_term, scheduler.done[profile])
+            else:
+                done = {p: 0 for p in edge_windows}; active = list(edge_windows.items())
+                while active:
+                    for profile, window in active:
+                        if stop_event.is_set(): return searches_issued
+                        search_term = self._pyautogui_perform_single_search(window, use_retry_delay, post_search_delay, scroll_delay, mouse_move_duration, key_press_delay, profile)
+                        done[profile] += 1; searched(profile, window, search_term, done[profile])
+                    active = [(p, w) for p, w in active if done[p] < quotas[p]]
         finally:
-            self._pyautogui_human_like_pause(*config.BATCH_DELAY); self.close_all_edge_windows()
+            self.query_pool.log_stats(); self.query_generator.seen_filter.log_stats(); self.query_generator.seen_filter.save()
+            if own_session: self.end_search_session(session)
+        return searches_issued
 
     def fetch_points_details(self, profile: EdgeProfile, stop_event: threading.Event, headless: bool) -> Dict[str, Optional[str]]:
         if stop_event.is_set(): return {"available_points": None, "daily_progress": None}
-        driver = self._setup_driver(profile, headless=headless)
+        fetch_start = time.perf_counter()
+        if config.USE_HTTP_POINTS_CLIENT and headless:
+            points_data = self.points_client.fetch(profile)
+            if points_data: return points_data
+        driver = self.driver_pool.acquire(profile, headless)
+        if not driver and profile in self._unisolated: return self._fetch_on_shared_dir(profile, fetch_start)
         if not driver: return {"available_points": "Error", "daily_progress": "Error"}
+        driver_healthy = True
+        try: points_data, driver_healthy = self._scrape(driver, profile, headless, fetch_start); return points_data
+        finally:
+            self.driver_pool.release(profile, headless, driver, healthy=driver_healthy)
+            self.driver_pool.record_fetch(time.perf_counter() - fetch_start)
+
+    def _scrape(self, driver: webdriver.Edge, profile: EdgeProfile, headless: bool, fetch_start: float) -> Tuple[Dict[str, Optional[str]], bool]:
+        """Reads the points page with driver. Returns the points data and whether the driver is still usable."""
         points_data = {"available_points": "N/A", "daily_progress": "N/A"}
         try:
-            wait = WebDriverWait(driver, 20); driver.get("https://rewards.bing.com/")
-            available_points_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "mee-rewards-user-status-banner-balance p.pointsValue span")))
-            points_data["available_points"] = available_points_element.text.strip()
-            driver.get("https://rewards.bing.com/pointsbreakdown")
-            progress_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div#bingSearchDailyPoints p.c-caption-1")))
-            wait.until(lambda d: re.search(r'\d+/\d+', progress_element.text))
-            match = re.search(r'(\d+/\d+\s*pts)', progress_element.text.strip())
-            if match: points_data["daily_progress"] = match.group(1)
-            return points_data
-        except TimeoutException: logger.log(f"Timeout fetching points for {profile.name}.", "WARN"); return points_data
-        except (WebDriverException, ValueError) as e: logger.log(f"Error fetching points for {profile.name}: {e}", "ERROR"); return {"available_points": "Error", "daily_progress": "Error"}
-        finally:
-            if driver: driver.quit()
+            scraped = scrape_points(driver)
+            if scraped["available_points"]: points_data["available_points"] = scraped["available_points"]
+            if scraped["daily_progress"]: points_data["daily_progress"] = scraped["daily_progress"]
+            if scraped["available_points"] and scraped["daily_progress"]:
+                if config.USE_HTTP_POINTS_CLIENT: self.points_client.save_cookies(profile, driver.get_cookies()) # Lets the next fetch skip the browser
+            else: logger.log(f"Timeout fetching points for {profile.name} (missing values after {scraped['elapsed_ms']} ms).", "WARN")
+            logger.log(f"Fetched points for {profile.name} in {time.perf_counter() - fetch_start:.2f}s, {(scraped['transfer_bytes'] or 0) / 1024:.0f} KiB transferred{' (lean)' if config.LEAN_FETCH and headless else ''}.", "DEBUG")
+            return points_data, True
+        except TimeoutException: logger.log(f"Timeout fetching points for {profile.name}.", "WARN"); return points_data, True
+        except (WebDriverException, ValueError) as e: logger.log(f"Error fetching points for {profile.name}: {e}", "ERROR"); return {"available_points": "Error", "daily_progress": "Error"}, False
+
+    def _fetch_on_shared_dir(self, profile: EdgeProfile, fetch_start: float) -> Dict[str, Optional[str]]:
+        """
+        Fallback for a profile whose isolated copy couldn't be made: a one-off headless session on the shared
+        user-data-dir. That dir admits a single browser, so these fetches run one at a time and the session is
+        quit, not pooled. With the profile's window still open Edge refuses it, and the runner fetches again later.
+        """
+        self._unisolated.discard(profile)
+        with self._shared_fetch_lock:
+            logger.log(f"No isolated copy of {profile.name}'s profile; fetching on the shared user-data-dir.", "INFO")
+            driver = self._setup_driver(profile, headless=True, lean=config.LEAN_FETCH)
+            if not driver: return {"available_points": "Error", "daily_progress": "Error"}
+            try: return self._scrape(driver, profile, True, fetch_start)[0]
+            finally: WebDriverPool._quit(driver); self.driver_pool.record_fetch(time.perf_counter() - fetch_start)
+
+    def fetch_points_for_profiles(self, profiles: List[EdgeProfile], stop_event: threading.Event, headless: bool = True, max_workers: int = config.FETCH_MAX_WORKERS, on_result: Optional[Callable[[EdgeProfile, Dict[str, Optional[str]]], None]] = None, batch: Optional[int] = None) -> Dict[EdgeProfile, Dict[str, Optional[str]]]:
+        """
+        Fetches points for several profiles at once with at most max_workers sessions.
+        on_result is called in the caller's thread as each profile completes. batch tags the fetch time.
+        """
+        if not profiles: return {}
+        max_workers = max(1, min(max_workers, len(profiles)))
+        if config.FETCH_ISOLATED_PROFILES and headless: self.driver_pool.max_live = max(self.driver_pool.max_live, max_workers)
+        elif not config.USE_HTTP_POINTS_CLIENT: max_workers = 1 # A shared user-data-dir admits one browser; with the HTTP client the pool serialises fallbacks
+        results: Dict[EdgeProfile, Dict[str, Optional[str]]] = {}
+        def timed_fetch(profile):
+            with self.timer.span("fetch", profile.email, batch): return self.fetch_points_details(profile, stop_event, headless)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PointsFetch") as executor:
+            futures = {executor.submit(timed_fetch, profile): profile for profile in profiles}
+            for future in as_completed(futures):
+                profile = futures[future]
+                try: points_data = future.result()
+                except Exception as e: logger.log(f"Points fetch crashed for {profile.name}: {e}", "ERROR"); points_data = {"available_points": "Error", "daily_progress": "Error"}
+                results[profile] = points_data
+                if on_result: on_result(profile, points_data)
+        return results
 
     def open_single_profile_to_breakdown(self, profile: EdgeProfile):
         logger.log(f"Manually opening points breakdown for {profile.name}", "INFO")
         self.close_all_edge_windows(); self._pyautogui_human_like_pause(0.5, 1)
-        base_command = ["start", "msedge"]
         try:
-            subprocess.Popen(base_command + [profile.cmd_arg], shell=True); self._pyautogui_human_like_pause(*config.WAIT_FOR_EDGE_LAUNCH)
-            link = "https://rewards.bing.com/pointsbreakdown"; active_window = gw.getActiveWindow()
+            self.launcher.launch(profile, track=False); self._pyautogui_human_like_pause(*config.WAIT_FOR_EDGE_LAUNCH) # The user's window: left open on exit
+            link = config.REWARDS_POINTS_URL; active_window = self.input.active_window()
             if active_window and "Edge" in active_window.title:
-                 pyautogui.hotkey('ctrl', 'l'); self._pyautogui_human_like_pause(0.3, 0.6)
-                 pyautogui.write(link, interval=random.uniform(*config.KEY_PRESS_DELAY))
-                 self._pyautogui_human_like_pause(0.2, 0.4); pyautogui.press('enter')
+                 self.input.hotkey('ctrl', 'l'); self._pyautogui_human_like_pause(0.3, 0.6)
+                 self.input.write(link, interval=random.uniform(*config.KEY_PRESS_DELAY))
+                 self._pyautogui_human_like_pause(0.2, 0.4); self.input.press('enter')
             else: logger.log(f"Could not activate Edge window for {profile.name} to navigate.", "WARN")
         except Exception as e: logger.log(f"Failed to open/navigate browser for {profile.name}: {e}", "ERROR")
 
-    # --- History Methods (Unchanged) ---
+    # --- History Methods (today's progress is served and saved by self.progress, backed by self.history) ---
     def save_progress_to_history(self, profile: EdgeProfile, points_data: Dict[str, str]):
-        file_exists = os.path.isfile(config.HISTORY_CSV_PATH)
-        try:
-            with open(config.HISTORY_CSV_PATH, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f);
-                if not file_exists: writer.writerow(["Date", "ProfileName", "Email", "AvailablePoints", "DailyProgress"])
-                writer.writerow([date.today().isoformat(), profile.name, profile.email, points_data.get("available_points", "N/A"), points_data.get("daily_progress", "N/A")])
-        except Exception as e: logger.log(f"Failed to write to history file: {e}", "ERROR")
+        self.progress.update(profile, points_data)
     def open_history_file(self) -> bool:
-        if os.path.exists(config.HISTORY_CSV_PATH):
-            try: os.startfile(config.HISTORY_CSV_PATH); return True
+        """Exports the whole history (archive included) to HISTORY_EXPORT_PATH and opens that; the history itself is never touched."""
+        self.progress.flush(); path = export_history(self.history, self.archive)
+        if path:
+            try: os.startfile(path); return True
             except Exception as e: logger.log(f"Failed to open history file: {e}", "ERROR"); return False
-        else: logger.log(f"History file not found at {config.HISTORY_CSV_PATH}", "WARN"); return False
+        else: logger.log("No history to show yet.", "WARN"); return False
     def clear_history_file(self) -> bool:
-        history_path = config.HISTORY_CSV_PATH
-        if os.path.exists(history_path):
-            try: os.remove(history_path); logger.log("History file cleared by user.", level="SYSTEM"); return True
-            except OSError as e: logger.log(f"Failed to clear history file: {e}", level="ERROR"); return False
-        else: logger.log("History file not found, nothing to clear.", level="INFO"); return True
+        self.progress.clear()
+        if self.history.clear():
+            try:
+                self.archive.clear()
+                if os.path.exists(config.HISTORY_EXPORT_PATH): os.remove(config.HISTORY_EXPORT_PATH) # The export would be stale
+            except OSError as e: logger.log(f"Failed to clear the history archive: {e}", level="ERROR"); return False
+            logger.log("History cleared by user.", level="SYSTEM"); return True
+        return False
     def load_todays_progress_from_history(self) -> Dict[str, Dict[str, str]]:
-        todays_progress = {}; today_str = date.today().isoformat()
-        if not os.path.exists(config.HISTORY_CSV_PATH):
-            return todays_progress
-        try:
-            with open(config.HISTORY_CSV_PATH, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("Date") == today_str:
-                        email = row.get("Email")
-                        if email: todays_progress[email] = {"available_points": row.get("AvailablePoints", "N/A"), "daily_progress": row.get("DailyProgress", "N/A")}
-            if len(todays_progress) > 0: logger.log(f"Loaded {len(todays_progress)} progress records from today's history.", "INFO")
-            else: logger.log("No progress records found for today in history.", "INFO")
-        except FileNotFoundError: logger.log("History file not found during load.", "WARN")
-        except Exception as e: logger.log(f"Failed to read or process history file: {e}", "ERROR")
+        todays_progress = self.progress.todays_progress()
+        if len(todays_progress) > 0: logger.log(f"Loaded {len(todays_progress)} progress records from today's history.", "INFO")
+        else: logger.log("No progress records found for today in history.", "INFO")
         return todays_progress
+    def compact_history(self) -> Tuple[int, int]:
+        """One snapshot per profile per day, closed months moved to the archive. Returns (duplicates dropped, rows archived)."""
+        try:
+            with self.progress.held(): return compact_history(self.history, self.archive)
+        except Exception as e: logger.log(f"History compaction failed: {e}", "ERROR"); return 0, 0
+    def query_history(self, since: Optional[str] = None, until: Optional[str] = None, emails: Optional[List[str]] = None) -> HistoryFrame:
+        self.progress.flush()
+        return query_history(self.history, self.archive, since, until, emails)
+    def points_analytics(self) -> Optional[PointsAnalytics]:
+        try: return PointsAnalytics.compute(self.query_history())
+        except Exception as e: logger.log(f"Points analytics failed: {e}", "ERROR"); return None
+    def open_points_report(self) -> bool:
+        """Writes the analytics report to ANALYTICS_REPORT_PATH and opens it."""
+        analytics = self.points_analytics()
+        if analytics is None: return False
+        try:
+            with open(config.ANALYTICS_REPORT_PATH, "w", encoding="utf-8") as f: f.write(analytics.report() + "\n")
+            os.startfile(config.ANALYTICS_REPORT_PATH); return True
+        except Exception as e: logger.log(f"Failed to open points report: {e}", "ERROR"); return False
 
-    # --- PyAutoGUI Helper Methods (Unchanged) ---
+    # --- Input Helper Methods (all input goes through self.input) ---
     def _pyautogui_human_like_pause(self, min_seconds, max_seconds):
         if min_seconds > max_seconds: min_seconds = max_seconds
-        time.sleep(random.uniform(min_seconds, max_seconds))
+        self.input.sleep(random.uniform(min_seconds, max_seconds))
     def _pyautogui_random_mouse_move(self, mouse_move_duration: Tuple[float, float]):
         try:
-            current_x, current_y = pyautogui.position(); offset_x = random.randint(-150, 150); offset_y = random.randint(-150, 150)
+            current_x, current_y = self.input.position(); offset_x = random.randint(-150, 150); offset_y = random.randint(-150, 150)
             new_x = max(0, min(self.screen_width - 1, current_x + offset_x)); new_y = max(0, min(self.screen_height - 1, current_y + offset_y))
             move_duration_value = random.uniform(*mouse_move_duration)
-            pyautogui.moveTo(new_x, new_y, duration=move_duration_value, tween=pyautogui.easeOutQuad)
+            self.input.move_to(new_x, new_y, move_duration_value)
         except Exception as e: logger.log(f"Error during random mouse move: {e}", "WARN")
     def _pyautogui_random_scroll(self, scroll_delay: Tuple[float, float]):
         try:
             scroll_count = random.randint(1, 4)
             for _ in range(scroll_count):
                 scroll_amount_units = random.randint(100, 300)
-                pyautogui.scroll(scroll_amount_units if random.choice([True, False]) else -scroll_amount_units)
+                self.input.scroll(scroll_amount_units if random.choice([True, False]) else -scroll_amount_units)
                 self._pyautogui_human_like_pause(*scroll_delay)
         except Exception as e: logger.log(f"Error during random scroll: {e}", "WARN")
-    def _pyautogui_open_profiles(self, profiles: List[EdgeProfile]):
-        base_command = ["start", "msedge"]
-        for profile in profiles: subprocess.Popen(base_command + [profile.cmd_arg], shell=True); self._pyautogui_human_like_pause(0.1, 0.4)
-    def _pyautogui_get_edge_windows(self) -> List[gw.Win32Window]:
-        self._pyautogui_human_like_pause(*config.WAIT_FOR_EDGE_LAUNCH)
-        return [win for win in gw.getAllWindows() if "Edge" in win.title]
-    def _pyautogui_perform_single_search(self, window: gw.Win32Window, use_retry_delay: bool, post_search_delay: Tuple[float, float], scroll_delay: Tuple[float, float], mouse_move_duration: Tuple[float, float], key_press_delay: Tuple[float, float]):
+    def _pyautogui_open_profiles(self, profiles: List[EdgeProfile]) -> List[float]:
+        launch_times = []
+        for profile in profiles: launch_times.append(self.input.now()); self.launcher.launch(profile); self._pyautogui_human_like_pause(0.1, 0.4)
+        return launch_times
+    def _pyautogui_get_edge_windows(self, profiles: List[EdgeProfile]) -> Dict[EdgeProfile, Window]:
+        """
+        Launches the profiles and polls until a new, responding Edge window exists for each of them
+        (or EDGE_READY_DEADLINE passes), instead of sleeping a fixed WAIT_FOR_EDGE_LAUNCH.
+        Windows are matched to profiles by the profile name Edge puts in the title, else in launch order.
+        """
+        key = self.input.window_key
+        known = {key(win) for win in self.input.get_windows("Edge")}
+        launch_times = dict(zip(profiles, self._pyautogui_open_profiles(profiles)))
+        deadline = (min(launch_times.values()) if launch_times else self.input.now()) + config.EDGE_READY_DEADLINE
+        pending = list(profiles); ready: Dict[EdgeProfile, Window] = {}
+        while pending:
+            now = self.input.now()
+            for win in self.input.get_windows("Edge"):
+                if not pending: break
+                if key(win) in known or not self.input.is_responsive(win): continue
+                known.add(key(win))
+                profile = self._profile_for_window(win, pending); pending.remove(profile); ready[profile] = win
+                self.launch_latency.record(now - launch_times[profile])
+            if not pending: break
+            if now >= deadline:
+                logger.log(f"Only {len(ready)}/{len(profiles)} Edge windows ready after {config.EDGE_READY_DEADLINE:.0f}s; searching those.", "WARN")
+                self.launch_latency.record_timeout(); break
+            self.input.sleep(config.EDGE_READY_POLL_INTERVAL)
+        self._pyautogui_human_like_pause(*config.EDGE_READY_SETTLE)
+        return ready
+    @staticmethod
+    def _profile_for_window(window: Window, pending: List[EdgeProfile]) -> EdgeProfile:
+        title = window.title # e.g. "New tab - Personal 2 - Microsoft Edge"
+        return next((p for p in pending if f" - {p.name} - " in title), pending[0])
+    def _pyautogui_perform_single_search(self, window: Window, use_retry_delay: bool, post_search_delay: Tuple[float, float], scroll_delay: Tuple[float, float], mouse_move_duration: Tuple[float, float], key_press_delay: Tuple[float, float], profile: Optional[EdgeProfile] = None, interleaved: bool = False, read_previous: bool = False):
+        """
+        One search in window. Normally it then waits out post_search_delay and maybe scrolls. When
+        interleaved, it returns right after Enter: the scheduler spaces the profile's searches, and
+        the scrolling through the previous results happens on the next visit (read_previous), before typing.
+        """
         action_delay_range = config.RETRY_ACTION_DELAY if use_retry_delay else config.ACTION_DELAY
+        span = self.timer.span; window_key = profile.email if profile else window.title; profile_keys = [profile.email] if profile else None
         try:
-            if not window.isActive: window.activate(); self._pyautogui_human_like_pause(0.1, 0.3)
-            self._pyautogui_human_like_pause(*action_delay_range)
-            if random.random() < 0.3: self._pyautogui_random_mouse_move(mouse_move_duration)
-            pyautogui.hotkey('ctrl', 'l'); self._pyautogui_human_like_pause(0.3, 0.6)
-            search_term = self.query_generator.get_search_term()
-            type_interval = random.uniform(*key_press_delay); type_interval = max(0.001, type_interval)
-            pyautogui.write(search_term, interval=type_interval)
-            pyautogui.press('enter'); self._pyautogui_human_like_pause(*post_search_delay)
-            if random.random() < 0.5: self._pyautogui_random_scroll(scroll_delay)
-            elif random.random() < 0.2: self._pyautogui_random_mouse_move(mouse_move_duration)
+            if not window.isActive:
+                with span("focus", window_key): window.activate(); self._pyautogui_human_like_pause(0.1, 0.3)
+            if read_previous and random.random() < 0.5:
+                with span("scroll", window_key): self._pyautogui_random_scroll(scroll_delay)
+            with span("action", window_key): self._pyautogui_human_like_pause(*action_delay_range)
+            if random.random() < 0.3:
+                with span("mouse", window_key): self._pyautogui_random_mouse_move(mouse_move_duration)
+            with span("typing", window_key):
+                self.input.hotkey('ctrl', 'l'); self._pyautogui_human_like_pause(0.3, 0.6)
+                search_term = self.query_pool.get_term(profile_keys)
+                type_interval = random.uniform(*key_press_delay); type_interval = max(0.001, type_interval)
+                self.input.write(search_term, interval=type_interval)
+                self.input.press('enter')
+            if interleaved: return search_term
+            with span("post_search", window_key): self._pyautogui_human_like_pause(*post_search_delay)
+            if random.random() < 0.5:
+                with span("scroll", window_key): self._pyautogui_random_scroll(scroll_delay)
+            elif random.random() < 0.2:
+                with span("mouse", window_key): self._pyautogui_random_mouse_move(mouse_move_duration)
             return search_term
-        except gw.PyGetWindowException: logger.log(f"Window '{window.title}' closed during search.", "WARN"); return None
+        except self.input.window_errors: logger.log(f"Window '{window.title}' closed during search.", "WARN"); return None
         except Exception as e: logger.log(f"Error during PyAutoGUI search: {e}", "ERROR"); return None
 
     # --- Shared and Utility Methods ---
     def close_all_edge_windows(self):
-        subprocess.run(['taskkill', '/F', '/IM', 'msedge.exe'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        logger.log("Forcefully closed all Edge processes.", "SYSTEM")
+        """Quits idle fetch sessions and ends the Edge processes this app launched (see ProcessRegistry)."""
+        self.driver_pool.close_all()
+        self.launcher.close_all()
+        logger.log("Closed the Edge processes started by this app.", "SYSTEM")
+
+    def shutdown(self):
+        """On exit: writes out pending progress and ends every process this app spawned, including msedgedrivers whose sessions never quit."""
+        self.progress.close(); self.query_pool.stop(); self.driver_pool.close_all()
+        if hasattr(self.history, "close"): self.history.close()
+        process_registry.terminate()
 
     # --- MODIFIED: Removed merging logic ---
     def get_and_save_edge_profiles(self) -> bool:
         """Detects all Edge profiles and overwrites data.json."""
-        edge_user_data_dir = os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Edge\User Data")
-        local_state_path = os.path.join(edge_user_data_dir, "Local State")
+        local_state_path = os.path.join(edge_user_data_dir(), "Local State")
         
         try:
             with open(local_state_path, "r", encoding="utf-8") as f:
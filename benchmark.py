@@ -0,0 +1,527 @@
+# BingRewardSearch/benchmark.py
+# Micro-benchmarks for the automation hot paths. Nothing here touches Edge or a real account.
+#
+#   python benchmark.py query [--terms N]
+#   python benchmark.py points [--fetches N]      (needs msedgedriver.exe, runs against a local fake server)
+#   python benchmark.py lean [--fetches N]        (same, page with heavy assets; full vs lean page loads)
+#   python benchmark.py http [--profiles N] [--workers N]
+#   python benchmark.py session [--profiles N] [--searches N] [--batch N]   (simulated input, no desktop needed)
+#   python benchmark.py history [--rows N] [--profiles N]
+#   python benchmark.py archive [--rows N] [--profiles N]
+#   python benchmark.py analytics [--profiles N] [--years N]
+#   python benchmark.py harness [--profiles 5 50 500] [--delays settings default slow] [--batch N] [--pc-points N] [--interrupt F] [--days N] [--fetch-latency S] [--locked N] [--relaunch] [--round-robin] [--serial | --compare-serial]
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from wonderwords import RandomWord
+
+
+def _timed(label: str, func, count: int) -> float:
+    start = time.perf_counter(); func(); elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<34} {elapsed * 1000:9.1f} ms  {rate:12,.0f} terms/s")
+    return rate
+
+
+# --- Query generation ---
+def bench_query_generator(terms: int):
+    """Compares the per-call wonderwords generator against the word index and the batch API."""
+    from query_generator import SearchQueryGenerator
+    generator = SearchQueryGenerator()
+    random_word_gen = RandomWord(); phrases = generator.common_phrases
+
+    def legacy_term():
+        # The pre-index generator (Wikipedia branch replaced by a word so no network is involved).
+        search_type = random.choices(['phrase', 'simple_word', 'wikipedia_topic'], weights=[0.5, 0.3, 0.2], k=1)[0]
+        if search_type == 'phrase': return f"{random.choice(phrases)} {random_word_gen.word(include_parts_of_speech=['nouns', 'adjectives'])}"
+        return random_word_gen.word()
+
+    print(f"Query generation ({terms} terms, Wikipedia corpus: {len(generator.wiki_corpus)} titles)")
+    legacy_count = max(1, terms // 50) # The legacy path is slow enough that a sample is representative
+    legacy = _timed("legacy wonderwords per call", lambda: [legacy_term() for _ in range(legacy_count)], legacy_count)
+    indexed = _timed("indexed get_search_term()", lambda: [generator.get_search_term() for _ in range(terms)], terms)
+    batched = _timed("batched get_search_terms(n)", lambda: generator.get_search_terms(terms), terms)
+    print(f"  speedup vs legacy: indexed x{indexed / legacy:.0f}, batched x{batched / legacy:.0f}")
+
+
+# --- Points scraping ---
+def _headless_edge(lean: bool = False):
+    from selenium import webdriver
+    from selenium.webdriver.edge.options import Options as EdgeOptions
+    from selenium.webdriver.edge.service import Service as EdgeService
+    from points_scraper import apply_lean_options, enable_request_blocking
+    options = EdgeOptions(); options.add_argument("--headless"); options.add_argument("--window-size=1920,1080")
+    if lean: apply_lean_options(options)
+    driver = webdriver.Edge(service=EdgeService(executable_path="msedgedriver.exe"), options=options)
+    if lean: enable_request_blocking(driver)
+    return driver
+
+
+def _count_round_trips(driver) -> Counter:
+    """Wraps driver.execute so every WebDriver command is tallied."""
+    counts = Counter(); original = driver.execute
+    def counting_execute(command, params=None):
+        counts[command] += 1
+        return original(command, params)
+    driver.execute = counting_execute
+    return counts
+
+
+def _legacy_fetch(driver, base_url: str) -> dict:
+    # The previous two-navigation path with a Python-side poll on the progress text.
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    wait = WebDriverWait(driver, 20); driver.get(f"{base_url}/")
+    balance = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "mee-rewards-user-status-banner-balance p.pointsValue span")))
+    wait.until(lambda d: re.search(r'\d', balance.text)); points = balance.text.strip()
+    driver.get(f"{base_url}/pointsbreakdown")
+    progress = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div#bingSearchDailyPoints p.c-caption-1")))
+    wait.until(lambda d: re.search(r'\d+/\d+', progress.text))
+    return {"available_points": points, "daily_progress": re.search(r'(\d+/\d+\s*pts)', progress.text.strip()).group(1)}
+
+
+def _report_fetches(label: str, fetch, fetches: int, counts: Counter):
+    counts.clear(); latencies = []; result = None
+    for _ in range(fetches):
+        start = time.perf_counter(); result = fetch(); latencies.append(time.perf_counter() - start)
+    latencies.sort(); trips = sum(counts.values()) / fetches
+    print(f"  {label:<28} p50 {latencies[len(latencies) // 2] * 1000:7.0f} ms  max {latencies[-1] * 1000:7.0f} ms  {trips:6.1f} round trips/fetch  -> {result}")
+
+
+def bench_points_scraping(fetches: int):
+    """Compares the legacy two-page scrape with the single-navigation in-page script."""
+    from fake_rewards_server import FakeRewardsServer
+    from points_scraper import scrape_points
+    import config
+    server = FakeRewardsServer().start(); driver = _headless_edge()
+    try:
+        counts = _count_round_trips(driver)
+        print(f"Points scraping against {server.base_url} ({fetches} fetches each)")
+        _report_fetches("legacy (2 pages, py poll)", lambda: _legacy_fetch(driver, server.base_url), fetches, counts)
+        selectors = dict(config.POINTS_SELECTORS)
+        _report_fetches("single navigation + script", lambda: {k: v for k, v in scrape_points(driver, f"{server.base_url}/pointsbreakdown", selectors).items() if k != "selectors"}, fetches, counts)
+    finally:
+        driver.quit(); server.stop()
+
+
+def bench_lean_fetch(fetches: int):
+    """Full vs lean page loads against a stand-in dashboard with heavy images, fonts, media and analytics."""
+    from fake_rewards_server import FakeRewardsServer
+    from points_scraper import scrape_points
+    server = FakeRewardsServer(heavy_assets=True).start()
+    print(f"Lean fetch against {server.base_url} ({fetches} fetches each)")
+    try:
+        for label, lean in (("full page load", False), ("lean (eager + blocking)", True)):
+            driver = _headless_edge(lean=lean); latencies = []; transferred = []
+            try:
+                for _ in range(fetches):
+                    driver.delete_all_cookies(); driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                    start = time.perf_counter(); scraped = scrape_points(driver, f"{server.base_url}/pointsbreakdown")
+                    latencies.append(time.perf_counter() - start); transferred.append(scraped["transfer_bytes"] or 0)
+            finally: driver.quit()
+            latencies.sort()
+            print(f"  {label:<26} p50 {latencies[len(latencies) // 2] * 1000:7.0f} ms  max {latencies[-1] * 1000:7.0f} ms  "
+                  f"{sum(transferred) / len(transferred) / 1024:8.0f} KiB/fetch  -> {scraped['available_points']}, {scraped['daily_progress']}")
+    finally:
+        server.stop()
+
+
+def bench_http_client(profiles: int, workers: int):
+    """Concurrent browser-free fetches through PointsClient against the local stand-in API."""
+    from concurrent.futures import ThreadPoolExecutor
+    from edge_profile import EdgeProfile
+    from fake_rewards_server import FakeRewardsServer
+    from points_client import PointsClient
+    server = FakeRewardsServer().start()
+    with tempfile.TemporaryDirectory() as cookie_dir:
+        client = PointsClient(base_url=server.base_url, cookie_dir=cookie_dir)
+        edge_profiles = [EdgeProfile(i + 1, f"Bench {i + 1}", f"bench{i + 1}@example.com", f"--profile-directory=Profile {i + 1}") for i in range(profiles)]
+        for i, profile in enumerate(edge_profiles):
+            state = server.profile(f"p{i}"); state.points = 1000 + i; state.earned = i % 91
+            client.save_cookies(profile, [{"name": "fake_profile", "value": f"p{i}", "domain": "127.0.0.1", "path": "/"}])
+        signed_out = EdgeProfile(0, "Signed out", "out@example.com", "--profile-directory=Signed Out")
+
+        def timed_fetch(profile):
+            start = time.perf_counter(); result = client.fetch(profile); return time.perf_counter() - start, result
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor: results = list(executor.map(timed_fetch, edge_profiles))
+            wall = time.perf_counter() - start
+            latencies = sorted(latency for latency, _ in results); ok = sum(1 for _, result in results if result)
+            print(f"HTTP points client: {profiles} profiles, {workers} workers against {server.base_url}")
+            print(f"  wall {wall * 1000:.0f} ms, {ok}/{profiles} parsed, per-profile p50 {latencies[len(latencies) // 2] * 1000:.1f} ms / max {latencies[-1] * 1000:.1f} ms")
+            print(f"  sample: {results[-1][1]}; signed-out profile falls back: {client.fetch(signed_out) is None}")
+        finally:
+            client.close(); server.stop()
+
+
+# --- Search session scheduling ---
+def _simulated_service(work_dir: str, seed: int = 1):
+    """An AutomationService wired to simulated input and windows, with all its state files in work_dir."""
+    import config
+    config.WIKI_CORPUS_AUTO_REFRESH = False # No network from benchmarks
+    # Every state file the service opens or creates lives in work_dir: never the real history, ledgers or cookies
+    config.HISTORY_CSV_PATH = os.path.join(work_dir, "points_history.csv"); config.HISTORY_DB_PATH = os.path.join(work_dir, "points_history.db")
+    config.HISTORY_ARCHIVE_DIR = os.path.join(work_dir, "history_archive"); config.ANALYTICS_REPORT_PATH = os.path.join(work_dir, "points_report.txt")
+    config.SESSION_LEDGER_PATH = os.path.join(work_dir, "session_ledger.csv"); config.CREDIT_LOG_PATH = os.path.join(work_dir, "search_credit_log.csv")
+    from automation_service import AutomationService
+    from input_backend import SimulatedBackend, SimulatedLauncher
+    from points_client import PointsClient
+    from query_dedup import SeenQueryFilter
+    random.seed(seed)
+    backend = SimulatedBackend(seed=seed); launcher = SimulatedLauncher(backend)
+    service = AutomationService(input_backend=backend, launcher=launcher)
+    service.query_generator.seen_filter = SeenQueryFilter(path=os.path.join(work_dir, "query_seen.bloom")) # Their defaults were bound at import
+    service.points_client.close(); service.points_client = PointsClient(cookie_dir=os.path.join(work_dir, "cookies"))
+    return service, backend, launcher
+
+
+def _bench_profiles(count: int):
+    from edge_profile import EdgeProfile
+    return [EdgeProfile(i + 1, f"Bench {i + 1}", f"bench{i + 1}@example.com", f"--profile-directory=Profile {i + 1}") for i in range(count)]
+
+
+def _write_synthetic_history(path: str, rows: int, profiles: int):
+    """rows history rows in date order, profiles per day, ending with today's; points formatted like the real file ("5,969")."""
+    from datetime import date, timedelta
+    days = max(1, rows // profiles); first_day = date.today() - timedelta(days=days - 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f); writer.writerow(["Date", "ProfileName", "Email", "AvailablePoints", "DailyProgress"])
+        for day in range(days):
+            day_str = (first_day + timedelta(days=day)).isoformat()
+            writer.writerows([day_str, f"Bench {i}", f"bench{i}@example.com", f"{1000 + day * 90 + i:,}", f"{(day + i) % 91}/90 pts"] for i in range(profiles))
+    return days
+
+
+def bench_history(rows: int, profiles: int):
+    """Today's rows from a growing progress_history.csv: the old full DictReader scan against the reverse block reader."""
+    from datetime import date
+    from history_store import CsvHistoryStore
+    print(f"History lookup: today's rows of {profiles} profiles, synthetic histories up to {rows:,} rows")
+    print(f"  {'rows':>10} {'size':>9} {'full scan':>10} {'tail read':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sorted({max(profiles, rows // 100), max(profiles, rows // 10), rows}):
+            path = os.path.join(work_dir, f"history_{size}.csv"); _write_synthetic_history(path, size, profiles); store = CsvHistoryStore(path)
+            start = time.perf_counter(); today_str = date.today().isoformat(); full = {}
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if row.get("Date") == today_str: full[row["Email"]] = {"available_points": row["AvailablePoints"], "daily_progress": row["DailyProgress"]}
+            full_scan = time.perf_counter() - start
+            start = time.perf_counter(); tail = store.todays_progress(); tail_read = time.perf_counter() - start
+            assert tail == full, "reverse reader disagrees with the full scan"
+            print(f"  {size:>10,} {os.path.getsize(path) / 1e6:>7.1f}MB {full_scan * 1000:>8.1f}ms {tail_read * 1000:>8.2f}ms {full_scan / tail_read:>7.0f}x")
+
+
+def bench_archive(rows: int, profiles: int):
+    """Compacting a long synthetic history into monthly .npz files, then loading a month and querying everything back."""
+    from history_store import CsvHistoryStore, SqliteHistoryStore
+    from history_archive import HistoryArchive, compact_history, export_history, query_history
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "history.csv"); days = _write_synthetic_history(path, rows, profiles)
+        csv_size = os.path.getsize(path); archive = HistoryArchive(os.path.join(work_dir, "archive"))
+        print(f"History archive: {days * profiles:,} rows ({days} days x {profiles} profiles), CSV {csv_size / 1e6:.1f}MB")
+        start = time.perf_counter(); full_parse = len(CsvHistoryStore(path).records()); parse_time = time.perf_counter() - start
+        store = SqliteHistoryStore(os.path.join(work_dir, "history.db"), csv_path=path); db_path = store.path
+        start = time.perf_counter(); _, archived = compact_history(store, archive, keep_months=1); compact_time = time.perf_counter() - start
+        assert os.path.getsize(path) == csv_size, "compaction touched the source CSV"
+        months = archive.months(); archive_size = sum(os.path.getsize(archive._path(month)) for month in months)
+        start = time.perf_counter(); month_rows = len(archive.load_month(months[len(months) // 2])); month_time = time.perf_counter() - start
+        start = time.perf_counter(); queried = len(query_history(store, archive)); query_time = time.perf_counter() - start
+        assert queried == full_parse, "archive + active history lost or duplicated rows"
+        exported = export_history(store, archive, os.path.join(work_dir, "export.csv"))
+        assert len(CsvHistoryStore(exported).records()) == full_parse, "the export lost archived rows"
+        store.close()
+        print(f"  parse whole CSV           {parse_time * 1000:9.1f} ms  ({full_parse:,} rows)")
+        print(f"  compact + archive         {compact_time * 1000:9.1f} ms  ({archived:,} rows into {len(months)} months, {archive_size / 1e6:.1f}MB; {os.path.getsize(db_path) / 1e3:.0f}KB left active)")
+        print(f"  load one month            {month_time * 1000:9.2f} ms  ({month_rows:,} rows)")
+        print(f"  query_history, all of it  {query_time * 1000:9.1f} ms  ({queried:,} rows, {parse_time / query_time:.0f}x the CSV parse)")
+
+
+def bench_analytics(profiles: int, years: int):
+    """PointsAnalytics over a synthetic history: every profile daily for years, some days missed, a redemption now and then."""
+    import numpy as np
+    from datetime import date
+    from history_archive import HistoryFrame
+    from analytics import PointsAnalytics
+    rng = np.random.default_rng(1); days = years * 365
+    day = np.repeat(np.arange(np.datetime64(date.today(), "D") - days + 1, np.datetime64(date.today(), "D") + 1), profiles)
+    profile = np.tile(np.arange(profiles), days); present = rng.random(len(day)) > 0.1 # One day in ten missed
+    earned = np.where(rng.random(len(day)) < 0.85, 90, rng.binomial(30, 0.8, len(day)) * 3).astype(np.int32) # Most days complete
+    gains = earned.reshape(days, profiles).astype(np.int64) + 50; gains[rng.random(gains.shape) < 0.005] = -5000 # Occasional redemption
+    points = np.maximum(0, 1000 + np.cumsum(gains, axis=0)).reshape(-1)
+    emails = np.array([f"bench{i}@example.com" for i in range(profiles)])
+    frame = HistoryFrame(day=day, email=emails[profile], name=np.char.add("Bench ", profile.astype(str)), points=points, earned=earned, max_points=np.full(len(day), 90, dtype=np.int32)).select(present)
+    print(f"Points analytics: {profiles} profiles x {days} days ({len(frame):,} snapshots)")
+    start = time.perf_counter(); analytics = PointsAnalytics.compute(frame); compute_time = time.perf_counter() - start
+    start = time.perf_counter(); report = analytics.report(); report_time = time.perf_counter() - start
+    print(f"  compute                   {compute_time * 1000:9.1f} ms  (grid {analytics.points.shape[0]} x {analytics.points.shape[1]})")
+    print(f"  report                    {report_time * 1000:9.1f} ms  ({len(report.splitlines())} lines)")
+    print("  " + analytics.summary())
+
+def bench_search_session(profiles: int, searches: int, batch_size: int):
+    """Runs run_search_session on simulated input: real time is scheduling overhead, virtual time is the human-like delays."""
+    import config
+    with tempfile.TemporaryDirectory() as work_dir:
+        service, backend, launcher = _simulated_service(work_dir)
+        edge_profiles = _bench_profiles(profiles); stop_event = threading.Event()
+        start = time.perf_counter()
+        for i in range(0, profiles, batch_size):
+            service.run_search_session(edge_profiles[i:i + batch_size], searches, stop_event)
+        overhead = time.perf_counter() - start
+        service.shutdown()
+    issued = sum(len(terms) for terms in backend.searches.values())
+    print(f"Search session on simulated input: {profiles} profiles x {searches} searches, batches of {batch_size}")
+    print(f"  {issued} searches, {launcher.launches} window launches, {len(backend.actions)} input actions")
+    print(f"  scheduling overhead {overhead * 1000:.0f} ms ({overhead / max(1, issued) * 1e6:.0f} us/search)")
+    print(f"  simulated human-like time {backend.clock / 3600:.2f} h ({backend.clock / max(1, issued):.1f} s/search) "
+          f"with POST_SEARCH_DELAY={config.POST_SEARCH_DELAY}, ACTION_DELAY={config.ACTION_DELAY}")
+    batches = -(-profiles // batch_size); fixed_wait = batches * sum(config.WAIT_FOR_EDGE_LAUNCH) / 2 + launcher.launches * 0.25 # Mean wait plus mean launch stagger
+    p50, p90, p99 = service.launch_latency.percentiles(0.5, 0.9, 0.99)
+    print(f"  launch-to-ready p50 {p50:.2f}s / p90 {p90:.2f}s / p99 {p99:.2f}s (simulated launch delay {launcher.launch_delay}), {service.launch_latency.timeouts} deadline misses")
+    print(f"  launch phase {service.timer.seconds('launch'):.0f}s over {batches} batches vs ~{fixed_wait:.0f}s expected with the fixed WAIT_FOR_EDGE_LAUNCH sleep")
+
+
+# --- End-to-end harness ---
+CREDIT_CURVES = ("steady", "lossy", "late", "complete")
+
+
+def _credit_curve(name: str, rng: random.Random):
+    """Returns on_search(state) for a scripted credit curve: how the fake Rewards account reacts to each search."""
+    def steady(state): state.earned = min(state.max_pts, state.earned + 3)
+    def lossy(state): # Roughly one search in four goes uncredited
+        if rng.random() < 0.75: steady(state)
+    searches = 0
+    def late(state): # Credit lags: nothing for the first few searches of the day
+        nonlocal searches
+        searches += 1
+        if searches > 4: steady(state)
+    return {"steady": steady, "lossy": lossy, "late": late, "complete": lambda state: None}[name]
+
+
+class _FixtureDriver:
+    """A headless Edge on the fixture server as far as scrape_points and the pool can tell: the in-page script is answered from the account's state."""
+    window_handles = ["main"]
+
+    def __init__(self, server, key: str):
+        self.server = server; self.key = key
+
+    def set_script_timeout(self, timeout): pass
+    def get(self, url): self.server._count("/pointsbreakdown")
+    def execute_async_script(self, script, *args):
+        state = self.server.profile(self.key)
+        return {"available_points": {"value": f"{state.points:,}", "selector": "fixture"}, "daily_progress": {"value": f"{state.earned}/{state.max_pts}", "selector": "fixture"},
+                "elapsed_ms": 600, "transfer_bytes": 0}
+    def get_cookies(self): return [{"name": "fake_profile", "value": self.key, "domain": "127.0.0.1", "path": "/"}]
+    def quit(self): pass
+
+
+def _lock_isolated_copies(service, backend, server, profiles) -> Counter:
+    """
+    Emulates Edge's lock on a running profile's cookie store for these profiles, whose fetches go through Selenium:
+    their isolated copy fails while their window is open and no earlier copy exists, and so does a session on the
+    shared user-data-dir. The first attempt fails regardless (a transient lock), so their first fetch comes back
+    "Error". Returns the copy attempts per profile.
+    """
+    import automation_service
+    directories = {profile.cmd_arg.split('=')[1]: profile for profile in profiles}; copies = set(); attempts = Counter()
+    def window_open(profile): return any(not window.closed and window.profile == profile for window in list(backend.windows))
+    def prepare(directory):
+        attempts[directory] += 1
+        if directory in directories and (attempts[directory] == 1 or (window_open(directories[directory]) and directory not in copies)): return None
+        copies.add(directory); return os.path.join("isolated", directory)
+    automation_service.prepare_isolated_user_data_dir = prepare
+    automation_service.has_isolated_copy = lambda directory: directory in copies or directory not in directories
+    def setup_driver(profile, headless=False, user_data_dir=None, lean=False):
+        directory = profile.cmd_arg.split('=')[1]
+        if user_data_dir is None and directory in directories and (attempts[directory] == 1 or window_open(profile)): return None # Shared dir: Edge refuses a second browser
+        return _FixtureDriver(server, profile.email)
+    service._setup_driver = setup_driver
+    return attempts
+
+
+def _delay_settings(profile: str) -> dict:
+    """Runner settings for a delay profile: 'settings' (settings.json), 'default' (config.py) or 'slow' (config x2)."""
+    import config
+    scale = 2.0 if profile == "slow" else 1.0
+    settings = {"smart_search_mode": True, "fetch_workers": config.FETCH_MAX_WORKERS}
+    for key, (low, high) in (("post_search_delay", config.POST_SEARCH_DELAY), ("scroll_delay", config.SCROLL_DELAY),
+                             ("mouse_move_duration", config.MOUSE_MOVE_DURATION), ("key_press_delay", config.KEY_PRESS_DELAY)):
+        settings[f"{key}_min"] = low * scale; settings[f"{key}_max"] = high * scale
+    if profile == "settings" and os.path.exists(config.SETTINGS_JSON_PATH):
+        with open(config.SETTINGS_JSON_PATH, "r") as f: saved = json.load(f)
+        settings.update({key: value for key, value in saved.items() if key.endswith(("_min", "_max")) or key == "fetch_workers"})
+    return settings
+
+
+def _run_harness(profiles: int, delay_profile: str, batch_size: int, pc_points: int, seed: int = 1, interrupt: float = 0.0, days: int = 1, fetch_latency: float = 0.0, locked: int = 0) -> dict:
+    """
+    Headless 'Start Searches' runs against the fake Rewards server; returns the figures for the report.
+    Each points fetch is charged fetch_latency virtual seconds (a headless page load), fetch_workers at a time.
+    With interrupt, the first run is stopped after that fraction of the nominal searches and then started
+    again. With days > 1 the accounts reset and the history is cleared between runs (the credit log is kept),
+    so the credit model's learning shows up day over day; the report covers the last day. locked profiles
+    (none of them already complete) start without cookies and fetch through Selenium against a locked
+    cookie store (see _lock_isolated_copies).
+    """
+    import automation_service
+    import config
+    from automation_runner import AutomationRunner, is_progress_complete
+    from fake_rewards_server import FakeRewardsServer
+    from points_client import PointsClient
+    from logger import logger
+    server = FakeRewardsServer().start(); rng = random.Random(seed); log_file = logger.log_file
+    with tempfile.TemporaryDirectory() as work_dir:
+        logger.log_file = os.path.join(work_dir, "log.txt") # Thousands of search lines
+        config.USE_HTTP_POINTS_CLIENT = True # Every profile has a cookie, so no fetch reaches Selenium
+        service, backend, launcher = _simulated_service(work_dir, seed); backend.record_actions = False
+        service.points_client.close(); service.points_client = PointsClient(base_url=server.base_url, cookie_dir=os.path.join(work_dir, "cookies"))
+        edge_profiles = _bench_profiles(profiles); curves = {}
+        locked_profiles = [profile for i, profile in enumerate(edge_profiles) if CREDIT_CURVES[i % len(CREDIT_CURVES)] != "complete"][:locked]
+        isolation = (automation_service.prepare_isolated_user_data_dir, automation_service.has_isolated_copy)
+        copy_attempts = _lock_isolated_copies(service, backend, server, locked_profiles) if locked_profiles else Counter()
+        fetch = service.fetch_points_for_profiles
+        def fetch_with_latency(profiles_to_fetch, stop_event, headless=True, max_workers=config.FETCH_MAX_WORKERS, on_result=None, batch=None):
+            if profiles_to_fetch and fetch_latency: backend.elapse(fetch_latency * math.ceil(len(profiles_to_fetch) / max(1, max_workers)))
+            return fetch(profiles_to_fetch, stop_event, headless=headless, max_workers=max_workers, on_result=on_result, batch=batch)
+        service.fetch_points_for_profiles = fetch_with_latency
+        for profile in edge_profiles:
+            if profile not in locked_profiles: service.points_client.save_cookies(profile, [{"name": "fake_profile", "value": profile.email, "domain": "127.0.0.1", "path": "/"}])
+
+        def new_day():
+            service.clear_history_file()
+            backend.searches.clear()
+            for i, profile in enumerate(edge_profiles):
+                curve = CREDIT_CURVES[i % len(CREDIT_CURVES)]; state = server.profile(profile.email)
+                state.earned = state.max_pts if curve == "complete" else 0
+                curves[profile.email] = _credit_curve(curve, rng)
+
+        stop_event = threading.Event(); stop_after = int(interrupt * profiles * (pc_points // 3)); issued = [0]
+        def on_search(profile, term):
+            curves[profile.email](server.profile(profile.email)); issued[0] += 1
+            if stop_after and issued[0] >= stop_after: stop_event.set()
+        backend.on_search = on_search
+
+        settings = _delay_settings(delay_profile); interrupted_at = None; per_day = []
+        try:
+            for day in range(days):
+                new_day(); start = time.perf_counter(); clock_start = backend.clock
+                stats = AutomationRunner(service, settings).run(edge_profiles, stop_event, batch_size, pc_points // 3)
+                if stop_after:
+                    interrupted_at = issued[0]; stop_after = 0; stop_event.clear()
+                    stats = AutomationRunner(service, settings).run(edge_profiles, stop_event, batch_size, pc_points // 3)
+                real = time.perf_counter() - start; per_day.append(stats)
+            todays_progress = service.progress.todays_progress()
+            locked_verified = sum(1 for profile in locked_profiles if is_progress_complete((todays_progress.get(profile.email) or {}).get("daily_progress")))
+        finally:
+            service.shutdown(); service.points_client.close(); server.stop(); logger.log_file = log_file
+            automation_service.prepare_isolated_user_data_dir, automation_service.has_isolated_copy = isolation
+        phases = sorted(((phase, seconds) for phase, (_, seconds) in service.timer.totals.items()), key=lambda item: -item[1])
+    searches = sorted(len(backend.searches.get(profile.email, [])) for profile in edge_profiles)
+    complete = sum(1 for profile in edge_profiles if server.profile(profile.email).earned >= server.profile(profile.email).max_pts)
+    return {"real": real, "virtual": backend.clock - clock_start, "searches": searches, "stats": stats, "complete": complete, "per_day": per_day,
+            "launches": launcher.launches, "api_requests": server.requests.get("/api/getuserinfo", 0), "phases": phases, "interrupted_at": interrupted_at,
+            "locked": len(locked_profiles), "locked_verified": locked_verified, "copy_attempts": sum(copy_attempts.values())}
+
+
+def bench_harness(profile_counts, delay_profiles, batch_size: int, pc_points: int, interrupt: float = 0.0, days: int = 1, fetch_latency: float = 0.0, compare_serial: bool = False, locked: int = 0):
+    """The whole search + smart-verification loop on simulated input, a scripted fake Rewards server and a virtual clock."""
+    import config
+    print(f"End-to-end harness: batches of {batch_size}, {pc_points} PC points target, credit curves {'/'.join(CREDIT_CURVES)} round-robin, {fetch_latency:g}s per points fetch")
+    print(f"  {'profiles':>8} {'delays':<9} {'real':>8} {'virtual':>9} {'searches/profile (min/p50/max)':>31} {'rounds':>6} {'retries':>7} {'fetches':>7} {'api':>5} {'launches':>8} {'done':>9}")
+    for profiles in profile_counts:
+        for delay_profile in delay_profiles:
+            r = _run_harness(profiles, delay_profile, batch_size, pc_points, interrupt=interrupt, days=days, fetch_latency=fetch_latency, locked=locked); s = r["searches"]; stats = r["stats"]; done = f"{r['complete']}/{profiles}"
+            print(f"  {profiles:>8} {delay_profile:<9} {r['real']:>7.2f}s {r['virtual'] / 3600:>8.2f}h {f'{s[0]}/{s[len(s) // 2]}/{s[-1]}':>31} "
+                  f"{stats.verification_rounds:>6} {stats.retry_cycles:>7} {stats.points_fetches:>7} {r['api_requests']:>5} {r['launches']:>8} {done:>9}")
+            phase_total = sum(seconds for _, seconds in r["phases"]) or 1.0
+            print(f"  {'':>8} {'':<9} {stats.searches_issued} searches, {stats.points_gained or 0} pts at {(stats.points_gained or 0) / max(stats.duration / 60, 1e-9):.2f} pts/min; "
+                  + ", ".join(f"{phase} {seconds / phase_total:.0%}" for phase, seconds in r["phases"][:6]))
+            if stats.pipelined:
+                print(f"  {'':>8} {'':<9} pipelined: verification {stats.verify_seconds / 60:.1f} min, {(stats.verify_seconds - stats.stall_seconds) / max(stats.verify_seconds, 1e-9):.0%} of it "
+                      f"overlapped with searching; the input waited {stats.stall_seconds / 60:.1f} min")
+                if compare_serial:
+                    config.PIPELINE_BATCHES = False
+                    try: serial = _run_harness(profiles, delay_profile, batch_size, pc_points, interrupt=interrupt, days=days, fetch_latency=fetch_latency)
+                    finally: config.PIPELINE_BATCHES = True
+                    print(f"  {'':>8} {'':<9} serial: {serial['virtual'] / 3600:.2f}h, {serial['stats'].verification_rounds} rounds, {serial['stats'].retry_cycles} retries, "
+                          f"{serial['complete']}/{profiles} done; pipelined end-to-end speedup {serial['virtual'] / max(r['virtual'], 1e-9):.2f}x")
+            if r["locked"]:
+                print(f"  {'':>8} {'':<9} locked cookie stores: {r['locked_verified']}/{r['locked']} profiles verified complete after {r['copy_attempts']} isolated copy attempts")
+                assert r["locked_verified"] == r["locked"], "a profile whose fetch failed was counted as collected instead of refetched"
+            if r["interrupted_at"] is not None:
+                print(f"  {'':>8} {'':<9} stopped after {r['interrupted_at']} searches; the re-run issued {stats.searches_issued} more (rounds, retries, fetches and points above are the re-run's)")
+            if days > 1:
+                for day, day_stats in enumerate(r["per_day"], start=1):
+                    print(f"  {'':>8} {'':<9} day {day}: predicted {day_stats.planned_searches} searches, issued {day_stats.searches_requested}; "
+                          f"{day_stats.profiles_retried} profiles retried, {day_stats.verification_rounds} verification rounds, {day_stats.retry_cycles} retry cycles")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BingRewardSearch micro-benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    query = sub.add_parser("query", help="search term generation throughput")
+    query.add_argument("--terms", type=int, default=20000)
+    points = sub.add_parser("points", help="points scraping latency and WebDriver round trips")
+    points.add_argument("--fetches", type=int, default=10)
+    lean = sub.add_parser("lean", help="full vs lean headless page loads")
+    lean.add_argument("--fetches", type=int, default=10)
+    http = sub.add_parser("http", help="browser-free HTTP points client throughput")
+    http.add_argument("--profiles", type=int, default=50)
+    http.add_argument("--workers", type=int, default=16)
+    session = sub.add_parser("session", help="search loop scheduling overhead on simulated input")
+    session.add_argument("--profiles", type=int, default=100)
+    session.add_argument("--searches", type=int, default=30)
+    session.add_argument("--batch", type=int, default=8)
+    history = sub.add_parser("history", help="today's lookup in a long progress_history.csv: full scan vs reverse tail read")
+    history.add_argument("--rows", type=int, default=1_000_000)
+    history.add_argument("--profiles", type=int, default=300)
+    archive = sub.add_parser("archive", help="history compaction into monthly .npz files, month loads and full queries")
+    archive.add_argument("--rows", type=int, default=1_000_000)
+    archive.add_argument("--profiles", type=int, default=300)
+    analytics = sub.add_parser("analytics", help="vectorised points analytics over years of synthetic history")
+    analytics.add_argument("--profiles", type=int, default=300)
+    analytics.add_argument("--years", type=int, default=3)
+    harness = sub.add_parser("harness", help="end-to-end search + verification runs on simulated input and a fake Rewards server")
+    harness.add_argument("--profiles", type=int, nargs="+", default=[5, 50, 500])
+    harness.add_argument("--delays", nargs="+", choices=["settings", "default", "slow"], default=["settings", "default", "slow"])
+    harness.add_argument("--batch", type=int, default=8)
+    harness.add_argument("--pc-points", type=int, default=90)
+    harness.add_argument("--interrupt", type=float, default=0.0, metavar="FRACTION", help="stop after this fraction of the searches, then run again")
+    harness.add_argument("--days", type=int, default=1, help="consecutive simulated days (the credit model learns across them)")
+    harness.add_argument("--relaunch", action="store_true", help="kill and relaunch windows every retry cycle (KEEP_WINDOWS_BETWEEN_RETRIES off)")
+    harness.add_argument("--fetch-latency", type=float, default=8.0, metavar="SECONDS", help="virtual time per points fetch (a headless page load)")
+    harness.add_argument("--locked", type=int, default=0, metavar="N", help="N profiles fetch through Selenium against a locked cookie store (their first isolated copy fails)")
+    pipeline = harness.add_mutually_exclusive_group()
+    pipeline.add_argument("--serial", action="store_true", help="verify each batch before searching the next (PIPELINE_BATCHES off)")
+    pipeline.add_argument("--compare-serial", action="store_true", help="also run each row serially and report the pipeline's speedup")
+    harness.add_argument("--round-robin", action="store_true", help="search windows in fixed order, waiting out each one's reading time (INTERLEAVE_SEARCHES off)")
+    args = parser.parse_args()
+    if args.bench == "query": bench_query_generator(args.terms)
+    elif args.bench == "points": bench_points_scraping(args.fetches)
+    elif args.bench == "lean": bench_lean_fetch(args.fetches)
+    elif args.bench == "http": bench_http_client(args.profiles, args.workers)
+    elif args.bench == "session": bench_search_session(args.profiles, args.searches, args.batch)
+    elif args.bench == "history": bench_history(args.rows, args.profiles)
+    elif args.bench == "archive": bench_archive(args.rows, args.profiles)
+    elif args.bench == "analytics": bench_analytics(args.profiles, args.years)
+    elif args.bench == "harness":
+        import config
+        if args.relaunch: config.KEEP_WINDOWS_BETWEEN_RETRIES = False
+        if args.round_robin: config.INTERLEAVE_SEARCHES = False
+        if args.serial: config.PIPELINE_BATCHES = False
+        bench_harness(args.profiles, args.delays, args.batch, args.pc_points, args.interrupt, args.days, args.fetch_latency, args.compare_serial, args.locked)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,20 @@ import os
 PROFILES_JSON_PATH = "data.json"
 LOG_FILE_PATH = "log.txt"
 SETTINGS_JSON_PATH = "settings.json"
-HISTORY_CSV_PATH = "progress_history.csv" # Path for the new history file
+HISTORY_CSV_PATH = "progress_history.csv" # Path for the new history file (the CSV backend; the SQLite backend imports it once and never writes it)
+HISTORY_BACKEND = "sqlite" # "sqlite" (imports an existing CSV once) or "csv"
+HISTORY_DB_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "progress_history.db")
+PROGRESS_FLUSH_INTERVAL = 5.0 # Seconds between write-behind flushes of saved progress to the history
+PROGRESS_FLUSH_BATCH = 50     # Flush sooner once this many profiles have unsaved progress
+HISTORY_ARCHIVE_DIR = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "history_archive") # Closed months as .npz files
+HISTORY_ACTIVE_MONTHS = 12    # Months (the current one included) kept in the active history; older ones are archived
+HISTORY_AUTO_COMPACT = False  # Compact and archive the history in the background at startup (SQLite backend only)
+HISTORY_EXPORT_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "progress_history_export.csv") # 'View History': archive + active history
+REDEMPTION_THRESHOLDS = [1000, 2000, 3000, 4000, 5000, 6000, 7000] # Point totals to project each profile reaching (the points legend's bracket edges; set to your rewards' costs)
+ANALYTICS_RATE_DAYS = 30      # Window for each profile's points-per-day rate, which drives the projections
+ANALYTICS_TREND_DAYS = 28     # Window for the credit-rate trend
+ANALYTICS_AT_STARTUP = True   # Summarise the analytics in the status bar at startup
+ANALYTICS_REPORT_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "points_report.txt")
 
 # The original script used a batch file for restarting. We'll define its expected path.
 # It will check OneDrive desktop first, then local desktop.
@@ -29,7 +42,18 @@ APP_GEOMETRY = "800x500"
 
 # --- Automation Settings ---
 # Delays are now ranges (min_seconds, max_seconds) for more human-like behavior.
-WAIT_FOR_EDGE_LAUNCH = (3.5, 5.0)
+WAIT_FOR_EDGE_LAUNCH = (3.5, 5.0) # Fixed wait when opening a single profile by hand
+# Search batches poll for their windows instead: done as soon as every launched window is up and responding.
+EDGE_READY_DEADLINE = 20.0          # Give up waiting (and search the windows that did appear) after this long
+EDGE_READY_POLL_INTERVAL = 0.25     # Seconds between window scans
+EDGE_READY_SETTLE = (0.3, 0.6)      # Short pause once ready, before the first keystroke
+# Smart mode keeps a batch's windows open through verification and retries, closing each profile's
+# window once it's done. Needs FETCH_ISOLATED_PROFILES so headless fetches don't collide with them.
+KEEP_WINDOWS_BETWEEN_RETRIES = True
+# Smart mode also verifies a finished batch in the background while the next batch searches; its retries
+# are typed between the next batch's searches. Each batch then closes only its own windows.
+PIPELINE_BATCHES = True
+PIPELINE_DEPTH = 2 # Batches with windows open at once (searching, being verified or retrying)
 ACTION_DELAY = (0.8, 1.5)
 # **NEW**: A longer delay for small, targeted retry searches to ensure they register.
 RETRY_ACTION_DELAY = (2.0, 3.0) 
@@ -40,4 +64,106 @@ KEY_PRESS_DELAY = (0.05, 0.10)
 # --- NEW: Human-like Behavior Settings ---
 POST_SEARCH_DELAY = (3.0, 6.0)   # How long to "read" results after searching
 SCROLL_DELAY = (0.5, 1.5)      # Delay between scroll actions
-MOUSE_MOVE_DURATION = (0.1, 0.4) # Speed of random mouse movements
\ No newline at end of file
+MOUSE_MOVE_DURATION = (0.1, 0.4) # Speed of random mouse movements
+# Interleaved searching: while one window "reads" its results the input types in the next due window.
+INTERLEAVE_SEARCHES = True
+PROFILE_SEARCH_SPACING = (0.0, 0.0) # Opt-in floor, in seconds, between two searches of one profile; (0, 0) leaves the pace to the post-search delay setting
+
+# --- Search Term Pool ---
+# Terms are prefetched in the background so the search loop never waits on the network.
+QUERY_POOL_SIZE = 64           # Max terms held ready
+QUERY_POOL_LOW_WATERMARK = 16  # Producer refills once depth drops to this level
+
+# --- Offline Wikipedia Title Corpus ---
+WIKI_TITLES_PATH = "wiki_titles.txt"       # Newline-delimited, pre-filtered titles
+WIKI_TITLES_INDEX_PATH = "wiki_titles.idx" # uint64 offsets into WIKI_TITLES_PATH
+WIKI_CORPUS_TARGET_SIZE = 20000            # Titles fetched per bulk import
+WIKI_CORPUS_REFRESH_DAYS = 30              # Rebuild in the background once older than this
+WIKI_CORPUS_AUTO_REFRESH = True            # Set False to stay fully offline
+
+# --- Word Index ---
+WORD_INDEX_CACHE_PATH = "word_index.json"  # Precomputed part-of-speech lists (rebuilt if wonderwords changes)
+
+# --- Query De-duplication ---
+# Bing doesn't credit repeated queries; a per-profile, per-day Bloom filter rejects them before typing.
+QUERY_DEDUP_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "query_seen.bloom") # Beside the history file
+QUERY_DEDUP_CAPACITY = 50000   # Expected (profile, query) inserts per day
+QUERY_DEDUP_FP_RATE = 0.001    # False positives only cost a redraw
+QUERY_DEDUP_WINDOW_DAYS = 2    # Today plus yesterday
+QUERY_DEDUP_MAX_REDRAWS = 10   # Give up and use the last draw after this many duplicates
+
+# --- Spawned Processes ---
+# Only the Edge and msedgedriver processes this app started are ever closed: gracefully, then killed.
+EDGE_EXECUTABLE = None             # Path to msedge.exe; None looks it up under App Paths in the registry
+PROCESS_GRACEFUL_TIMEOUT = 5.0     # Seconds Edge gets to close its windows before its process tree is killed
+PROCESS_KILL_TIMEOUT = 3.0         # Seconds to wait for a killed tree to exit
+
+# --- WebDriver Session Pool ---
+# All profiles share one Edge user-data-dir, which only one browser process can own at a time,
+# so keep a single live session unless fetches run against isolated user-data-dirs (below).
+DRIVER_POOL_MAX_LIVE = 1
+DRIVER_POOL_IDLE_TIMEOUT = 120 # Seconds before an idle session is quit
+
+# --- Parallel Points Fetching ---
+FETCH_MAX_WORKERS = 4              # Default concurrent headless fetches ("fetch_workers" in settings.json)
+FETCH_ISOLATED_PROFILES = True     # Give each headless fetch a private copy of its profile
+ISOLATED_USER_DATA_ROOT = os.path.join(os.path.expandvars(r"%LOCALAPPDATA%"), "BingRewardSearch", "IsolatedProfiles")
+# Profile items mirrored into the private copy: enough to stay signed in, none of the caches.
+ISOLATED_PROFILE_ITEMS = ["Preferences", "Secure Preferences", "Network", "Cookies", "Local Storage", "Session Storage", "Web Data", "Login Data"]
+
+# --- Points Scraping ---
+# The breakdown page renders the balance banner too, so one navigation yields both values.
+REWARDS_BASE_URL = "https://rewards.bing.com"
+REWARDS_POINTS_URL = REWARDS_BASE_URL + "/pointsbreakdown"
+POINTS_FETCH_TIMEOUT = 20 # Seconds to wait for both values to render
+# Selector registry, tried in order until one yields a value.
+POINTS_SELECTORS = {
+    "available_points": [
+        "mee-rewards-user-status-banner-balance p.pointsValue span",
+        "mee-rewards-user-status-banner-balance .pointsValue",
+        "span[aria-label*='points this month'] b",
+    ],
+    "daily_progress": [
+        "div#bingSearchDailyPoints p.c-caption-1",
+        "#bingSearchDailyPoints [class*='caption']",
+    ],
+}
+
+# --- Lean Headless Fetches ---
+LEAN_FETCH = True             # Eager loads, no images, blocked heavy/third-party requests for headless fetches
+LEAN_PAGE_LOAD_TIMEOUT = 15   # Seconds before a page load is abandoned
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",  # Images
+    "*.mp4", "*.webm", "*.mp3",                                       # Media
+    "*.woff", "*.woff2", "*.ttf", "*.otf",                            # Fonts
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*clarity.ms*", "*bat.bing.com*", "*browser.events.data.microsoft.com*", "*c.bing.com/c.gif*",
+]
+
+# --- HTTP Points Client ---
+# Browser-free fetch that reuses cookies captured from the last successful Selenium fetch;
+# falls back to Selenium on auth failure or an unexpected response.
+USE_HTTP_POINTS_CLIENT = True
+POINTS_CLIENT_TIMEOUT = 10 # Seconds per request
+COOKIE_CACHE_DIR = os.path.join(os.path.expandvars(r"%LOCALAPPDATA%"), "BingRewardSearch", "Cookies")
+COOKIE_CACHE_PERSIST = True # Keep cookies between runs, DPAPI-encrypted for the current Windows user; False keeps them in memory only
+
+# --- Session Ledger ---
+# One summary row per run (duration, searches, points gained, seconds per phase).
+SESSION_LEDGER_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "session_ledger.csv")
+
+# --- Pre-flight Planning ---
+# Before searching, profiles without a history row today get a quick browser-free fetch
+# (only those with cached cookies) so completed ones are skipped and the rest searched just enough.
+PLANNER_PREFETCH = True
+
+# --- Searches-to-Credit Model ---
+# Learns each profile's real points per search from past search passes (logged beside the history
+# file) and plans that many searches up front, instead of a nominal 3 pts/search plus retries.
+CREDIT_MODEL_ENABLED = True
+CREDIT_LOG_PATH = os.path.join(os.path.dirname(HISTORY_CSV_PATH), "search_credit_log.csv")
+CREDIT_MODEL_PRIOR_SEARCHES = 30     # Weight of the nominal rate, in searches, before a profile's own data dominates
+CREDIT_MODEL_HALF_LIFE_DAYS = 14     # Older passes count half as much every this many days
+CREDIT_MODEL_MIN_RATE = 1.0          # Points per search clamp
+CREDIT_MODEL_MAX_RATE = 4.5
+CREDIT_MODEL_MARGIN_SEARCHES = 1     # Extra searches for profiles credited below the nominal rate (a spare search beats a retry cycle)
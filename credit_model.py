@@ -0,0 +1,81 @@
+# BingRewardSearch/credit_model.py
+
+import csv
+import math
+import os
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from logger import logger
+import config
+
+
+class CreditModel:
+    """
+    Learns how many points each profile is actually credited per search, so the planner can issue
+    the right number of searches up front instead of a nominal 3 points/search plus retry cycles.
+
+    progress_history.csv records where each profile ended the day but not how many searches got it
+    there, so the model learns from its own log (CREDIT_LOG_PATH). There is one row per profile per
+    search pass: searches issued, points gained and where that left the profile. Rates are
+    age-weighted (CREDIT_MODEL_HALF_LIFE_DAYS) and shrunk towards the nominal rate until a profile
+    has enough searches behind it. A pass that hit the daily cap only proves a lower bound on the
+    rate, so it can raise the estimate but never lower it.
+    """
+    HEADER = ["Date", "Email", "Searches", "Gained", "EarnedAfter", "MaxPoints"]
+
+    def __init__(self, path: Optional[str] = None, prior_rate: float = 3.0, prior_searches: float = config.CREDIT_MODEL_PRIOR_SEARCHES, half_life_days: float = config.CREDIT_MODEL_HALF_LIFE_DAYS):
+        self.path = path or config.CREDIT_LOG_PATH
+        self.prior_rate = prior_rate
+        self.prior_searches = prior_searches
+        self.half_life_days = half_life_days
+        self._observations: Dict[str, List[Tuple[date, int, int, bool]]] = {} # email -> (day, searches, gained, capped)
+        self._rates: Dict[str, float] = {}
+
+    def load(self) -> "CreditModel":
+        self._observations = {}; self._rates = {}
+        if not os.path.exists(self.path): return self
+        try:
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        day = date.fromisoformat(row["Date"]); searches = int(row["Searches"]); gained = int(row["Gained"])
+                        capped = int(row["EarnedAfter"]) >= int(row["MaxPoints"])
+                    except (KeyError, ValueError): continue
+                    if searches > 0: self._observations.setdefault(row["Email"], []).append((day, searches, gained, capped))
+            logger.log(f"Credit model: {sum(len(obs) for obs in self._observations.values())} search passes for {len(self._observations)} profiles.", "INFO")
+        except Exception as e: logger.log(f"Failed to read credit log: {e}", "ERROR")
+        return self
+
+    def rate(self, email: str) -> float:
+        """Expected points per search for this profile."""
+        cached = self._rates.get(email)
+        if cached is not None: return cached
+        today = date.today(); weighted_searches = self.prior_searches; weighted_points = self.prior_searches * self.prior_rate; lower_bound = 0.0
+        for day, searches, gained, capped in self._observations.get(email, []):
+            if capped: lower_bound = max(lower_bound, gained / searches); continue
+            weight = 0.5 ** ((today - day).days / self.half_life_days)
+            weighted_searches += weight * searches; weighted_points += weight * gained
+        rate = max(weighted_points / weighted_searches, lower_bound)
+        rate = min(max(rate, config.CREDIT_MODEL_MIN_RATE), config.CREDIT_MODEL_MAX_RATE)
+        self._rates[email] = rate
+        return rate
+
+    def searches_needed(self, email: str, remaining_points: int) -> int:
+        if remaining_points <= 0: return 0
+        rate = self.rate(email)
+        return math.ceil(remaining_points / rate) + (config.CREDIT_MODEL_MARGIN_SEARCHES if rate < self.prior_rate else 0)
+
+    def record(self, observations: List[Tuple[str, int, int, int, int]]):
+        """Appends (email, searches, gained, earned_after, max_pts) rows and folds them into the model."""
+        if not observations: return
+        today = date.today(); file_exists = os.path.isfile(self.path)
+        try:
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if not file_exists: writer.writerow(self.HEADER)
+                for email, searches, gained, earned_after, max_pts in observations:
+                    writer.writerow([today.isoformat(), email, searches, gained, earned_after, max_pts])
+        except Exception as e: logger.log(f"Failed to write to credit log: {e}", "ERROR")
+        for email, searches, gained, earned_after, max_pts in observations:
+            if searches > 0: self._observations.setdefault(email, []).append((today, searches, gained, earned_after >= max_pts)); self._rates.pop(email, None)
@@ -0,0 +1,145 @@
+# BingRewardSearch/driver_pool.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium import webdriver
+
+from edge_profile import EdgeProfile
+from process_registry import process_registry
+from logger import logger
+import config
+
+PoolKey = Tuple[str, bool] # (profile directory, headless)
+
+
+class WebDriverPool:
+    """
+    Keeps warm Selenium sessions keyed by profile directory.
+
+    Repeated points checks of the same profile within a run reuse the idle
+    session instead of launching a fresh Edge + msedgedriver. Sessions idle for
+    longer than idle_timeout are quit by a sweeper thread (running only while
+    something is idle), the least recently used idle session is evicted when
+    max_live would be exceeded, and every reuse is preceded by a cheap health
+    check so sessions killed behind our back are replaced.
+    """
+    def __init__(self, factory: Callable[[EdgeProfile, bool], Optional[webdriver.Edge]], max_live: int = config.DRIVER_POOL_MAX_LIVE, idle_timeout: float = config.DRIVER_POOL_IDLE_TIMEOUT):
+        self.factory = factory
+        self.max_live = max(1, max_live)
+        self.idle_timeout = idle_timeout
+        self._idle: "OrderedDict[PoolKey, Tuple[webdriver.Edge, float]]" = OrderedDict()
+        self._busy: Dict[PoolKey, webdriver.Edge] = {}
+        self._cond = threading.Condition()
+        self._sweeper: Optional[threading.Thread] = None
+        # Stats
+        self.launches = 0
+        self.reuses = 0
+        self.failed_health_checks = 0
+        self.fetch_latencies: List[float] = []
+
+    @staticmethod
+    def _key(profile: EdgeProfile, headless: bool) -> PoolKey:
+        return (profile.cmd_arg.split('=')[1], headless)
+
+    @staticmethod
+    def _is_healthy(driver: webdriver.Edge) -> bool:
+        try: driver.window_handles; return True
+        except Exception: return False
+
+    @staticmethod
+    def _quit(driver: webdriver.Edge):
+        try: driver.quit()
+        except Exception as e:
+            logger.log(f"Error while quitting pooled driver: {e}", "DEBUG")
+            process_registry.terminate(processes=[getattr(driver.service, "process", None)]) # Don't leak the msedgedriver
+
+    def _evict_expired(self) -> List[webdriver.Edge]:
+        now = time.monotonic()
+        expired = [key for key, (_, last_used) in self._idle.items() if now - last_used > self.idle_timeout]
+        return [self._idle.pop(key)[0] for key in expired]
+
+    def _sweep(self):
+        """Quits idle sessions as they expire; exits once nothing is idle (release starts it again)."""
+        while True:
+            with self._cond:
+                to_quit = self._evict_expired()
+                if not self._idle: self._sweeper = None
+                else: deadline = min(last_used for _, last_used in self._idle.values()) + self.idle_timeout
+                sweeping = self._sweeper is not None
+            for driver in to_quit: self._quit(driver)
+            if to_quit: logger.log(f"Quit {len(to_quit)} WebDriver session(s) idle for over {self.idle_timeout:g}s.", "DEBUG")
+            if not sweeping: return
+            with self._cond: self._cond.wait(max(0.0, deadline - time.monotonic()) + 0.05) # Woken early by release, which re-checks
+
+    def acquire(self, profile: EdgeProfile, headless: bool) -> Optional[webdriver.Edge]:
+        """Returns a warm session for the profile if one is idle and healthy, otherwise launches one."""
+        key = self._key(profile, headless); to_quit = []
+        with self._cond:
+            to_quit += self._evict_expired()
+            while True: # Every wait re-checks from the top: another caller may have taken or returned this key meanwhile
+                if key in self._busy: self._cond.wait(); continue # One session per profile directory
+                cached = self._idle.pop(key, None)
+                if cached is not None or len(self._idle) + len(self._busy) < self.max_live: break
+                if self._idle: to_quit.append(self._idle.popitem(last=False)[1][0])
+                else: self._cond.wait()
+            self._busy[key] = None # Reserve the slot while launching outside the lock
+        for driver in to_quit: self._quit(driver)
+
+        if cached is not None:
+            if self._is_healthy(cached[0]):
+                with self._cond: self._busy[key] = cached[0]; self.reuses += 1
+                return cached[0]
+            with self._cond: self.failed_health_checks += 1
+            self._quit(cached[0])
+            logger.log(f"Pooled driver for {profile.name} failed its health check; relaunching.", "DEBUG")
+
+        driver = self.factory(profile, headless)
+        with self._cond:
+            if driver is None: self._busy.pop(key, None); self._cond.notify_all(); return None
+            self._busy[key] = driver; self.launches += 1
+        return driver
+
+    def release(self, profile: EdgeProfile, headless: bool, driver: webdriver.Edge, healthy: bool = True):
+        """Returns a session to the pool, or quits it if it is known to be broken."""
+        key = self._key(profile, headless)
+        with self._cond:
+            self._busy.pop(key, None)
+            if healthy: self._idle[key] = (driver, time.monotonic())
+            to_quit = self._evict_expired()
+            if self._idle and self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep, name="DriverPoolSweeper", daemon=True); self._sweeper.start()
+            self._cond.notify_all()
+        if not healthy: to_quit.append(driver)
+        for d in to_quit: self._quit(d)
+
+    def record_fetch(self, seconds: float):
+        with self._cond: self.fetch_latencies.append(seconds)
+
+    def close_all(self):
+        """Quits every idle session (busy ones are quit by their holders on release)."""
+        with self._cond:
+            drivers = [driver for driver, _ in self._idle.values()]; self._idle.clear()
+        for driver in drivers: self._quit(driver)
+        if drivers: logger.log(f"Closed {len(drivers)} pooled WebDriver session(s).", "SYSTEM")
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = sorted(self.fetch_latencies)
+            return {
+                "launches": self.launches,
+                "reuses": self.reuses,
+                "failed_health_checks": self.failed_health_checks,
+                "live": len(self._idle) + len(self._busy),
+                "fetches": len(latencies),
+                "avg_fetch_s": (sum(latencies) / len(latencies)) if latencies else 0.0,
+                "p50_fetch_s": latencies[len(latencies) // 2] if latencies else 0.0,
+                "max_fetch_s": latencies[-1] if latencies else 0.0,
+            }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.log(f"WebDriver pool: {s['launches']} launches, {s['reuses']} reuses, {s['failed_health_checks']} failed health checks; "
+                   f"{s['fetches']} fetches, avg {s['avg_fetch_s']:.2f}s / p50 {s['p50_fetch_s']:.2f}s / max {s['max_fetch_s']:.2f}s.", "INFO")
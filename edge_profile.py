@@ -12,7 +12,7 @@ class EdgeProfile:
     # status: str = "active" # <-- REMOVED
 
     # --- NEW: Field to store points numerically ---
-    available_points: int = 0 # Default to 0
+    available_points: int = field(default=0, compare=False) # Default to 0; not part of eq/hash, it changes while profiles are dict keys
 
     @property
     def full_name(self) -> str:
@@ -0,0 +1,121 @@
+# BingRewardSearch/fake_rewards_server.py
+# A local stand-in for rewards.bing.com used by benchmark.py. It serves pages with the same
+# markup the scrapers look for (filled in after a configurable render delay) and the user-info
+# JSON the HTTP points client reads.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Microsoft Rewards</title></head>
+<body>
+<mee-rewards-user-status-banner-balance><p class="pointsValue"><span></span></p></mee-rewards-user-status-banner-balance>
+<div id="bingSearchDailyPoints"><p class="c-caption-1"></p></div>
+{heavy_assets}
+<script>
+setTimeout(function () {{
+    document.querySelector("mee-rewards-user-status-banner-balance p.pointsValue span").textContent = "{points}";
+}}, {balance_delay_ms});
+setTimeout(function () {{
+    document.querySelector("#bingSearchDailyPoints p.c-caption-1").textContent = "PC search: {earned}/{max_pts} pts";
+}}, {progress_delay_ms});
+</script>
+</body></html>
+"""
+
+# Stand-ins for the dashboard's images, fonts, media and third-party scripts. Host names are
+# mirrored into the paths so the lean-fetch block patterns apply to them locally.
+HEAVY_ASSETS_HTML = """<style>@font-face { font-family: "Segoe"; src: url("/assets/segoe.woff2"); } body { font-family: "Segoe"; }</style>
+<img src="/assets/hero.png"><img src="/assets/offer1.jpg"><img src="/assets/offer2.jpg"><img src="/assets/badge.svg">
+<video src="/assets/promo.mp4" autoplay muted></video>
+<script src="/www.googletagmanager.com/gtm.js"></script><script src="/bat.bing.com/bat.js"></script>"""
+HEAVY_ASSET_BYTES = 400 * 1024
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # The default backlog of 5 stalls concurrent clients on SYN retries
+
+
+class ProfileState:
+    def __init__(self, points: int = 5969, earned: int = 0, max_pts: int = 90):
+        self.points = points; self.earned = earned; self.max_pts = max_pts
+
+
+class FakeRewardsServer:
+    """
+    Serves '/', '/pointsbreakdown' and '/api/getuserinfo' on localhost. The profile is chosen by
+    the 'fake_profile' cookie; the API answers 302 (to a login page) without one.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, balance_delay_ms: int = 300, progress_delay_ms: int = 600, heavy_assets: bool = False, asset_latency: float = 0.05):
+        self.profiles: Dict[str, ProfileState] = {"default": ProfileState()}
+        self.balance_delay_ms = balance_delay_ms
+        self.progress_delay_ms = progress_delay_ms
+        self.heavy_assets = heavy_assets
+        self.asset_latency = asset_latency
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def profile(self, key: str) -> ProfileState:
+        with self._lock: return self.profiles.setdefault(key, ProfileState())
+
+    def start(self) -> "FakeRewardsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FakeRewardsServer", daemon=True)
+        self._thread.start(); return self
+
+    def stop(self):
+        self._httpd.shutdown(); self._httpd.server_close()
+
+    def _count(self, path: str):
+        with self._lock: self.requests[path] = self.requests.get(path, 0) + 1
+
+    def render_page(self, state: ProfileState) -> bytes:
+        return PAGE_TEMPLATE.format(points=f"{state.points:,}", earned=state.earned, max_pts=state.max_pts,
+                                    balance_delay_ms=self.balance_delay_ms, progress_delay_ms=self.progress_delay_ms,
+                                    heavy_assets=HEAVY_ASSETS_HTML if self.heavy_assets else "").encode("utf-8")
+
+    def user_info(self, state: ProfileState) -> bytes:
+        counters = {"pcSearch": [{"pointProgress": state.earned, "pointProgressMax": state.max_pts}]}
+        return json.dumps({"dashboard": {"userStatus": {"availablePoints": state.points, "counters": counters}}}).encode("utf-8")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass # Keep benchmark output clean
+
+            def _profile_key(self, default="default"):
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "fake_profile" and value: return value
+                return default
+
+            def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8"):
+                self.send_response(status); self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?")[0]; server._count(path)
+                if path in ("/", "/pointsbreakdown"): self._send(200, server.render_page(server.profile(self._profile_key())))
+                elif path == "/api/getuserinfo":
+                    key = self._profile_key(default=None)
+                    if key is None:
+                        self.send_response(302); self.send_header("Location", "/login"); self.send_header("Content-Length", "0"); self.end_headers()
+                    else: self._send(200, server.user_info(server.profile(key)), "application/json")
+                elif server.heavy_assets and path.count("/") >= 2:
+                    time.sleep(server.asset_latency) # Third-party hosts are slower than a local page
+                    body = b"// filler\n" * (HEAVY_ASSET_BYTES // 10) if path.endswith(".js") else bytes(HEAVY_ASSET_BYTES)
+                    self._send(200, body, "application/javascript" if path.endswith(".js") else "application/octet-stream")
+                else: self._send(404, b"not found", "text/plain")
+
+        return Handler
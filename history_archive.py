@@ -0,0 +1,160 @@
+# BingRewardSearch/history_archive.py
+
+import csv
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from history_store import CSV_HEADER, HistoryRecord, latest_per_day, to_row
+from logger import logger
+import config
+
+MISSING = -1 # Unknown points/progress in the integer columns
+
+
+@dataclass
+class HistoryFrame:
+    """History as columns, one entry per profile per day (its last snapshot). Unknown values are MISSING."""
+    day: np.ndarray        # datetime64[D]
+    email: np.ndarray      # str
+    name: np.ndarray       # str
+    points: np.ndarray     # int64, available points
+    earned: np.ndarray     # int32, today's PC search points...
+    max_points: np.ndarray # int32, ...out of
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @classmethod
+    def from_records(cls, records: List[HistoryRecord]) -> "HistoryFrame":
+        def column(index, dtype): return np.array([MISSING if r[index] is None else r[index] for r in records], dtype=dtype)
+        return cls(day=np.array([r[0] for r in records], dtype="datetime64[D]"), email=np.array([r[2] for r in records], dtype=str), name=np.array([r[1] for r in records], dtype=str),
+                   points=column(3, np.int64), earned=column(4, np.int32), max_points=column(5, np.int32))
+
+    @classmethod
+    def concat(cls, frames: List["HistoryFrame"]) -> "HistoryFrame":
+        frames = [frame for frame in frames if len(frame)] or [cls.from_records([])]
+        return cls(**{name: np.concatenate([getattr(frame, name) for frame in frames]) for name in cls.__dataclass_fields__})
+
+    def select(self, mask: np.ndarray) -> "HistoryFrame":
+        return HistoryFrame(**{name: getattr(self, name)[mask] for name in self.__dataclass_fields__})
+
+    def records(self) -> List[HistoryRecord]:
+        def value(array, i): return None if array[i] == MISSING else int(array[i])
+        return [(str(self.day[i]), str(self.name[i]), str(self.email[i]), value(self.points, i), value(self.earned, i), value(self.max_points, i)) for i in range(len(self))]
+
+
+class HistoryArchive:
+    """
+    Closed months of history, one compressed .npz per month (e.g. 2025-07.npz) in HISTORY_ARCHIVE_DIR.
+    Emails and names are stored once per month and referenced by profile id; dates and points are
+    integer columns. A month loads in milliseconds without parsing any text.
+    """
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or config.HISTORY_ARCHIVE_DIR
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.directory, f"{month}.npz")
+
+    def months(self) -> List[str]:
+        if not os.path.isdir(self.directory): return []
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith(".npz") and len(name) == 11)
+
+    def load_month(self, month: str) -> HistoryFrame:
+        with np.load(self._path(month), allow_pickle=False) as data:
+            emails, names, profile = data["emails"], data["names"], data["profile"]
+            return HistoryFrame(day=data["day"].astype("datetime64[D]"), email=emails[profile], name=names[profile],
+                                points=data["points"], earned=data["earned"].astype(np.int32), max_points=data["max_points"].astype(np.int32))
+
+    def write_month(self, month: str, records: List[HistoryRecord]):
+        """Adds records to the month's file (merged with what's there, last snapshot per day kept); written atomically."""
+        if month in self.months(): records = latest_per_day(self.load_month(month).records() + list(records))
+        frame = HistoryFrame.from_records(records)
+        emails, first_seen, profile = np.unique(frame.email, return_index=True, return_inverse=True)
+        os.makedirs(self.directory, exist_ok=True); temp_path = self._path(month) + ".tmp.npz"
+        np.savez_compressed(temp_path, day=frame.day.astype(np.int32), profile=profile.astype(np.int32), emails=emails, names=frame.name[first_seen],
+                            points=frame.points, earned=frame.earned.astype(np.int16), max_points=frame.max_points.astype(np.int16))
+        os.replace(temp_path, self._path(month))
+
+    def clear(self):
+        for month in self.months(): os.remove(self._path(month))
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None) -> HistoryFrame:
+        months = [m for m in self.months() if (since is None or m >= since[:7]) and (until is None or m <= until[:7])]
+        return _between(HistoryFrame.concat([self.load_month(m) for m in months]), since, until)
+
+
+def _between(frame: HistoryFrame, since: Optional[str], until: Optional[str]) -> HistoryFrame:
+    mask = np.ones(len(frame), dtype=bool)
+    if since: mask &= frame.day >= np.datetime64(since, "D")
+    if until: mask &= frame.day < np.datetime64(until, "D")
+    return frame if mask.all() else frame.select(mask)
+
+
+def query_history(store, archive: Optional[HistoryArchive] = None, since: Optional[str] = None, until: Optional[str] = None, emails: Optional[Iterable[str]] = None) -> HistoryFrame:
+    """
+    History with since <= date < until across the archive and the active store, one row per profile
+    per day, ordered by date. Rows present in both (a compaction cut short) count once, the store's copy winning.
+    """
+    archive = archive or HistoryArchive()
+    archived, active = archive.query(since, until), HistoryFrame.from_records(latest_per_day(store.records(since, until)))
+    if len(archived) and len(active) and archived.day.max() >= active.day.min(): archived = _without_overlap(archived, active)
+    frame = HistoryFrame.concat([archived, active])
+    if emails is not None: frame = frame.select(np.isin(frame.email, list(emails)))
+    return frame.select(np.argsort(frame.day, kind="stable"))
+
+
+def _without_overlap(archived: HistoryFrame, active: HistoryFrame) -> HistoryFrame:
+    """Archived rows whose (day, profile) the active history also has, dropped."""
+    overlap = archived.day >= active.day.min()
+    active_keys = set(zip(active.day.tolist(), active.email.tolist()))
+    overlap[overlap] = [key in active_keys for key in zip(archived.day[overlap].tolist(), archived.email[overlap].tolist())]
+    return archived.select(~overlap)
+
+
+def _month_start(months_back: int) -> str:
+    today = date.today(); month_index = today.year * 12 + today.month - 1 - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1).isoformat()
+
+
+def export_history(store, archive: Optional[HistoryArchive] = None, path: Optional[str] = None) -> Optional[str]:
+    """
+    Writes the whole history (archive + active store, one row per profile per day) to HISTORY_EXPORT_PATH
+    in the progress_history.csv layout and returns that path; None if there's no history yet.
+    """
+    path = path or config.HISTORY_EXPORT_PATH
+    try:
+        records = query_history(store, archive).records()
+        if not records: return None
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f); writer.writerow(CSV_HEADER); writer.writerows(map(to_row, records))
+        os.replace(temp_path, path); return path
+    except Exception as e: logger.log(f"Failed to export history to {path}: {e}", "ERROR"); return None
+
+
+def compact_history(store, archive: Optional[HistoryArchive] = None, keep_months: int = config.HISTORY_ACTIVE_MONTHS) -> Tuple[int, int]:
+    """
+    Drops all but each profile's last snapshot per day, moves months older than the last keep_months
+    into the archive and rewrites the store with what's left. The archive is written first, so an
+    interruption leaves duplicates (which query_history tolerates), never a gap. The CSV backend
+    can't be rewritten (it's the user's own file), so it's left alone.
+    Returns (duplicate rows dropped, rows archived).
+    """
+    if not hasattr(store, "replace_records"): logger.log("History compaction skipped: the CSV history is never rewritten (set HISTORY_BACKEND = 'sqlite').", "INFO"); return 0, 0
+    archive = archive or HistoryArchive()
+    all_records = store.records(); records = latest_per_day(all_records)
+    cutoff = _month_start(max(0, keep_months - 1))
+    by_month: Dict[str, List[HistoryRecord]] = {}
+    for record in records:
+        if record[0] < cutoff: by_month.setdefault(record[0][:7], []).append(record)
+    duplicates = len(all_records) - len(records); archived = sum(len(month_records) for month_records in by_month.values())
+    if not duplicates and not archived: return 0, 0
+    for month, month_records in sorted(by_month.items()): archive.write_month(month, month_records)
+    store.replace_records([record for record in records if record[0] >= cutoff])
+    logger.log(f"History compacted: {duplicates} duplicate rows dropped, {archived} rows archived into {len(by_month)} month(s), "
+               f"{len(records) - archived} rows left in the active history.", "SYSTEM")
+    return duplicates, archived
@@ -0,0 +1,212 @@
+# BingRewardSearch/history_store.py
+
+import csv
+import os
+import re
+import sqlite3
+import threading
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from edge_profile import EdgeProfile
+from logger import logger
+import config
+
+CSV_HEADER = ["Date", "ProfileName", "Email", "AvailablePoints", "DailyProgress"]
+HistoryRow = Tuple[str, str, str, str, str] # Date, ProfileName, Email, AvailablePoints, DailyProgress as shown in the UI
+HistoryRecord = Tuple[str, str, str, Optional[int], Optional[int], Optional[int]] # Date, ProfileName, Email, points, earned, max points (None if unknown)
+
+
+def parse_daily_progress(progress_str: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parses '45/90 pts' into (45, 90); None for missing, 'N/A', 'Error' or unparsable strings."""
+    if not progress_str or "N/A" in progress_str or "Error" in progress_str: return None
+    try:
+        earned, max_pts = map(int, re.findall(r'\d+', progress_str))
+        return earned, max_pts
+    except (ValueError, IndexError): return None
+
+
+def parse_points(points_str: Optional[str]) -> Optional[int]:
+    """Parses '5,969' into 5969; None for 'N/A', 'Error' and the like."""
+    cleaned = (points_str or "").replace(",", "").strip()
+    return int(cleaned) if cleaned.isdigit() else None
+
+
+def to_record(row: HistoryRow) -> HistoryRecord:
+    day, name, email, available_points, daily_progress = row
+    earned, max_pts = parse_daily_progress(daily_progress) or (None, None)
+    return (day, name, email, parse_points(available_points), earned, max_pts)
+
+
+def points_data_from(available_points: Optional[int], earned: Optional[int], max_pts: Optional[int]) -> Dict[str, str]:
+    return {"available_points": "N/A" if available_points is None else f"{available_points:,}",
+            "daily_progress": "N/A" if earned is None or max_pts is None else f"{earned}/{max_pts} pts"}
+
+
+def to_row(record: HistoryRecord) -> HistoryRow:
+    points_data = points_data_from(*record[3:])
+    return (record[0], record[1], record[2], points_data["available_points"], points_data["daily_progress"])
+
+
+def latest_per_day(records: Iterable[HistoryRecord]) -> List[HistoryRecord]:
+    """Keeps each profile's last snapshot of each day, in the order those snapshots were written."""
+    latest: Dict[Tuple[str, str], HistoryRecord] = {}
+    for record in records:
+        key = (record[0], record[2]); latest.pop(key, None); latest[key] = record
+    return list(latest.values())
+
+
+def _history_row(profile: EdgeProfile, points_data: Dict[str, str]) -> HistoryRow:
+    return (date.today().isoformat(), profile.name, profile.email, points_data.get("available_points", "N/A"), points_data.get("daily_progress", "N/A"))
+
+
+class CsvHistoryStore:
+    """progress_history.csv as the history itself: one appended row per saved snapshot. Only ever appended to (compaction skips it)."""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.HISTORY_CSV_PATH
+
+    def save(self, profile: EdgeProfile, points_data: Dict[str, str]):
+        self.append([_history_row(profile, points_data)])
+
+    def append(self, rows: List[HistoryRow]):
+        file_exists = os.path.isfile(self.path)
+        try:
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if not file_exists: writer.writerow(CSV_HEADER)
+                writer.writerows(rows)
+        except Exception as e: logger.log(f"Failed to write to history file: {e}", "ERROR")
+
+    def todays_progress(self) -> Dict[str, Dict[str, str]]:
+        todays_progress = {}; today_str = date.today().isoformat()
+        if not os.path.exists(self.path): return todays_progress
+        try:
+            for row in self.rows_from_end():
+                if len(row) < len(CSV_HEADER) or row[0] == CSV_HEADER[0]: continue
+                if row[0] < today_str: break # Rows are appended in date order: nothing older can be today's
+                if row[0] == today_str and row[2] and row[2] not in todays_progress: # Last snapshot wins
+                    todays_progress[row[2]] = {"available_points": row[3] or "N/A", "daily_progress": row[4] or "N/A"}
+        except FileNotFoundError: logger.log("History file not found during load.", "WARN")
+        except Exception as e: logger.log(f"Failed to read or process history file: {e}", "ERROR")
+        return todays_progress
+
+    def rows_from_end(self, block_size: int = 64 * 1024) -> Iterator[List[str]]:
+        """
+        Yields the file's CSV rows last-first, reading fixed-size blocks backwards from EOF, so finding
+        today's rows costs the same however long the history is. Lines are split on raw newlines (UTF-8
+        never has one inside a character) and each is parsed with csv, which keeps quoted fields like
+        "5,969" whole. The writer never puts a newline inside a field.
+        """
+        with open(self.path, 'rb') as f:
+            position = f.seek(0, os.SEEK_END); partial = b""
+            while position > 0:
+                read_size = min(block_size, position); position -= read_size
+                f.seek(position); lines = (f.read(read_size) + partial).split(b"\n")
+                partial = lines.pop(0) # May continue in the previous block
+                for line in reversed(lines):
+                    if line.strip(): yield next(csv.reader([line.decode('utf-8').rstrip("\r")]))
+            if partial.strip(): yield next(csv.reader([partial.decode('utf-8-sig').rstrip("\r")]))
+
+    def records(self, since: Optional[str] = None, until: Optional[str] = None) -> List[HistoryRecord]:
+        """Typed rows with since <= date < until (ISO dates), oldest first."""
+        if not os.path.exists(self.path): return []
+        with open(self.path, 'r', newline='', encoding='utf-8-sig') as f:
+            return [to_record((row["Date"], row.get("ProfileName") or "", row["Email"], row.get("AvailablePoints"), row.get("DailyProgress"))) for row in csv.DictReader(f)
+                    if row.get("Date") and row.get("Email") and (since is None or row["Date"] >= since) and (until is None or row["Date"] < until)]
+
+    def clear(self) -> bool:
+        if not os.path.exists(self.path): logger.log("History file not found, nothing to clear.", level="INFO"); return True
+        try: os.remove(self.path); return True
+        except OSError as e: logger.log(f"Failed to clear history file: {e}", level="ERROR"); return False
+
+
+class SqliteHistoryStore:
+    """
+    History in SQLite (WAL), with typed integer columns and an index on (date, email), so today's
+    lookup reads only today's rows however many years of history sit behind them. An existing
+    progress_history.csv is imported once, on first open, and left as it is.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            profile_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            available_points INTEGER,
+            earned INTEGER,
+            max_points INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS history_date_email ON history (date, email);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path: Optional[str] = None, csv_path: Optional[str] = None):
+        self.path = path or config.HISTORY_DB_PATH
+        self.csv_path = csv_path or config.HISTORY_CSV_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False) # Shared by the worker threads, serialised by _lock
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        self._import_csv_once()
+
+    def _import_csv_once(self):
+        with self._lock: imported = self._conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+        if imported or not os.path.exists(self.csv_path): return
+        try:
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+                rows = [(row.get("Date") or "", row.get("ProfileName") or "", row.get("Email") or "", row.get("AvailablePoints"), row.get("DailyProgress"))
+                        for row in csv.DictReader(f) if row.get("Date") and row.get("Email")]
+        except Exception as e: logger.log(f"Failed to read {self.csv_path} for import: {e}", "ERROR"); return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO history (date, profile_name, email, available_points, earned, max_points) VALUES (?, ?, ?, ?, ?, ?)", map(to_record, rows))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_imported', ?)", (date.today().isoformat(),))
+        logger.log(f"Imported {len(rows)} history rows from {self.csv_path} into {self.path}.", "SYSTEM")
+
+    def save(self, profile: EdgeProfile, points_data: Dict[str, str]):
+        self.append([_history_row(profile, points_data)])
+
+    def append(self, rows: Iterable[HistoryRow]):
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT INTO history (date, profile_name, email, available_points, earned, max_points) VALUES (?, ?, ?, ?, ?, ?)", map(to_record, rows))
+        except sqlite3.Error as e: logger.log(f"Failed to write to history database: {e}", "ERROR")
+
+    def todays_progress(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with self._lock:
+                records = self._conn.execute("SELECT email, available_points, earned, max_points FROM history WHERE date = ? ORDER BY id", (date.today().isoformat(),)).fetchall()
+        except sqlite3.Error as e: logger.log(f"Failed to read history database: {e}", "ERROR"); return {}
+        return {email: points_data_from(available_points, earned, max_pts) for email, available_points, earned, max_pts in records} # Last snapshot wins
+
+    def records(self, since: Optional[str] = None, until: Optional[str] = None) -> List[HistoryRecord]:
+        """Typed rows with since <= date < until (ISO dates), oldest first."""
+        with self._lock:
+            return self._conn.execute("SELECT date, profile_name, email, available_points, earned, max_points FROM history WHERE date >= ? AND date < ? ORDER BY id",
+                                      (since or "", until or "9999")).fetchall()
+
+    def replace_records(self, records: List[HistoryRecord]):
+        """Replaces the whole table with these rows in one transaction, then shrinks the file."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM history")
+                self._conn.executemany("INSERT INTO history (date, profile_name, email, available_points, earned, max_points) VALUES (?, ?, ?, ?, ?, ?)", records)
+            self._conn.execute("VACUUM")
+
+    def clear(self) -> bool:
+        try:
+            with self._lock, self._conn: self._conn.execute("DELETE FROM history")
+            return True
+        except sqlite3.Error as e: logger.log(f"Failed to clear history: {e}", level="ERROR"); return False
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+
+def open_history_store(backend: Optional[str] = None):
+    """The history backend chosen by HISTORY_BACKEND ("sqlite" or "csv")."""
+    backend = backend or config.HISTORY_BACKEND
+    if backend == "sqlite":
+        try: return SqliteHistoryStore()
+        except sqlite3.Error as e: logger.log(f"Could not open history database ({e}); using the CSV history.", "ERROR")
+    return CsvHistoryStore()
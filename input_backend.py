@@ -0,0 +1,272 @@
+# BingRewardSearch/input_backend.py
+
+import random
+from abc import ABC, abstractmethod
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from edge_profile import EdgeProfile
+from process_registry import ProcessRegistry, process_registry
+from logger import logger
+import config
+
+Window = Any # pygetwindow.Win32Window or SimulatedWindow: both expose .title, .isActive and .activate()
+
+
+class WindowGoneError(Exception):
+    """Raised by simulated windows that were closed while being used."""
+
+
+# --- Interfaces ---
+class InputBackend(ABC):
+    """The foreground input, window enumeration and clock the search loop drives. A backend missing any abstract method fails when it's created, not mid-search."""
+    window_errors: Tuple[type, ...] = (WindowGoneError,) # Raised when a window vanishes mid-action
+
+    @abstractmethod
+    def screen_size(self) -> Tuple[int, int]: ...
+    @abstractmethod
+    def position(self) -> Tuple[int, int]: ...
+    @abstractmethod
+    def move_to(self, x: int, y: int, duration: float): ...
+    @abstractmethod
+    def hotkey(self, *keys: str): ...
+    @abstractmethod
+    def write(self, text: str, interval: float): ...
+    @abstractmethod
+    def press(self, key: str): ...
+    @abstractmethod
+    def scroll(self, amount: int): ...
+    @abstractmethod
+    def get_windows(self, title_fragment: str) -> List[Window]: ...
+    @abstractmethod
+    def active_window(self) -> Optional[Window]: ...
+    def is_responsive(self, window: Window) -> bool: return True # Shown and processing messages
+    def window_key(self, window: Window) -> Any: return id(window) # Stable across get_windows() calls
+    @abstractmethod
+    def sleep(self, seconds: float): ...
+    @abstractmethod
+    def now(self) -> float: ...
+    def idle_until(self, condition: Callable[[], bool], poll: float = 0.05):
+        """Waits without input until condition() holds (e.g. a background verification finished)."""
+        while not condition(): self.sleep(poll)
+    def background(self, fn: Callable) -> Callable:
+        """Wraps fn to run off the input thread, e.g. on an executor (the simulated backend keeps its clock in step with it)."""
+        return fn
+
+
+class BrowserLauncher(ABC):
+    """Starts and stops the interactive Edge windows used for searching."""
+    @abstractmethod
+    def launch(self, profile: EdgeProfile, track: bool = True): ... # track=False: a window handed to the user, never closed by us
+    @abstractmethod
+    def close_all(self): ...
+
+
+# --- Desktop implementations ---
+class PyAutoGUIBackend(InputBackend):
+    def __init__(self):
+        import pyautogui
+        import pygetwindow as gw
+        import ctypes
+        self._pyautogui = pyautogui; self._gw = gw; self._user32 = ctypes.windll.user32
+        pyautogui.FAILSAFE = False
+        self.window_errors = (gw.PyGetWindowException,)
+
+    def screen_size(self): return tuple(self._pyautogui.size())
+    def position(self): return tuple(self._pyautogui.position())
+    def move_to(self, x, y, duration): self._pyautogui.moveTo(x, y, duration=duration, tween=self._pyautogui.easeOutQuad)
+    def hotkey(self, *keys): self._pyautogui.hotkey(*keys)
+    def write(self, text, interval): self._pyautogui.write(text, interval=interval)
+    def press(self, key): self._pyautogui.press(key)
+    def scroll(self, amount): self._pyautogui.scroll(amount)
+    def get_windows(self, title_fragment): return [win for win in self._gw.getAllWindows() if title_fragment in win.title]
+    def active_window(self): return self._gw.getActiveWindow()
+    def is_responsive(self, window):
+        try: return window.visible and window.width > 0 and not self._user32.IsHungAppWindow(window._hWnd)
+        except Exception: return False
+    def window_key(self, window): return window._hWnd # getAllWindows() builds new wrappers every call
+    def sleep(self, seconds): time.sleep(seconds)
+    def now(self): return time.monotonic()
+
+
+def edge_executable() -> Optional[str]:
+    """msedge.exe from EDGE_EXECUTABLE or the App Paths registry key ("start msedge" resolves it the same way)."""
+    if config.EDGE_EXECUTABLE: return config.EDGE_EXECUTABLE
+    try:
+        import winreg
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths\msedge.exe") as key: return winreg.QueryValue(key, None)
+            except OSError: continue
+    except ImportError: pass
+    return None
+
+
+class EdgeLauncher(BrowserLauncher):
+    """
+    Starts msedge.exe directly so its PID goes into the process registry, and close_all() ends only
+    those processes. The first launch becomes the browser process that later launches hand their
+    windows to. If Edge was already running, the windows belong to that browser instead: they are
+    closed one by one (see AutomationService.close_session_windows) and the browser is left alone.
+
+    Limit: Edge routes every new window to the running browser process. An Edge window the user opens
+    while ours is that process (from the taskbar, a link in another app) joins the tracked tree, so
+    close_all() and the exit shutdown close it too. Windows Edge can't tell us apart from ours, so
+    users who browse while the app runs should open their own Edge before starting a batch: ours then
+    join theirs and are closed window by window instead.
+    """
+    def __init__(self, registry: ProcessRegistry = process_registry):
+        self.registry = registry
+        self.executable = edge_executable()
+        if not self.executable: logger.log("msedge.exe not found; launching through 'start msedge', so Edge windows can't be tracked.", "WARN")
+
+    def launch(self, profile: EdgeProfile, track: bool = True):
+        if self.executable and track: self.registry.spawn([self.executable, profile.cmd_arg], "edge", profile.name)
+        elif self.executable: subprocess.Popen([self.executable, profile.cmd_arg], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else: subprocess.Popen(["start", "msedge", profile.cmd_arg], shell=True)
+
+    def close_all(self):
+        self.registry.terminate("edge")
+
+
+# --- Simulated implementations (headless benchmarking) ---
+class SimulatedWindow:
+    def __init__(self, backend: "SimulatedBackend", profile: EdgeProfile, ready_at: float = 0.0):
+        self.backend = backend; self.profile = profile
+        self.title = f"New tab - {profile.name} - Microsoft Edge"
+        self.ready_at = ready_at # Virtual time the window shows up
+        self.closed = False
+
+    @property
+    def isActive(self) -> bool:
+        if self.closed: raise WindowGoneError(self.title)
+        return self.backend.active is self
+
+    def activate(self):
+        if self.closed: raise WindowGoneError(self.title)
+        self.backend._record("activate", self.title); self.backend.active = self
+
+    def close(self):
+        self.closed = True
+        if self.backend.active is self: self.backend.active = None
+
+
+class SimulatedBackend(InputBackend):
+    """
+    Records every action instead of performing it and advances a virtual clock, so
+    the search loop can run on a headless box. Typed text followed by Enter in a
+    window counts as a search for that window's profile (see on_search).
+    """
+    def __init__(self, screen: Tuple[int, int] = (1920, 1080), seed: Optional[int] = None):
+        self.clock = 0.0
+        self.screen = screen
+        self.windows: List[SimulatedWindow] = []
+        self.active: Optional[SimulatedWindow] = None
+        self.actions: List[Tuple[float, str, Any]] = []
+        self.searches: Dict[str, List[str]] = {}
+        self.on_search: Optional[Callable[[EdgeProfile, str], None]] = None
+        self.record_actions = True
+        self._cursor = (screen[0] // 2, screen[1] // 2)
+        self._typed = ""
+        self._lock = threading.Lock()
+        self._clock_moved = threading.Condition(self._lock)
+        self._running = 0                 # Background tasks currently doing (virtually instant) work
+        self._waiters: List[list] = []    # [deadline, woken] of background tasks in elapse()
+        self._input_thread: Optional[int] = None
+        self.random = random.Random(seed)
+
+    def _record(self, action: str, detail: Any = None):
+        if self.record_actions: self.actions.append((self.clock, action, detail))
+
+    def screen_size(self): return self.screen
+    def position(self): return self._cursor
+    def move_to(self, x, y, duration): self._cursor = (x, y); self.sleep(duration); self._record("move", (x, y))
+    def hotkey(self, *keys):
+        if keys == ('ctrl', 'l'): self._typed = ""
+        self._record("hotkey", keys)
+    def write(self, text, interval): self._typed += text; self.sleep(len(text) * interval); self._record("write", text)
+    def press(self, key):
+        self._record("press", key)
+        if key == 'enter' and self.active is not None:
+            profile, term = self.active.profile, self._typed
+            self.searches.setdefault(profile.email, []).append(term)
+            if self.on_search: self.on_search(profile, term)
+        self._typed = ""
+    def scroll(self, amount): self._record("scroll", amount)
+    def get_windows(self, title_fragment):
+        with self._lock: return [win for win in self.windows if not win.closed and win.ready_at <= self.clock and title_fragment in win.title]
+    def active_window(self): return self.active
+    def sleep(self, seconds):
+        with self._lock:
+            self._input_thread = threading.get_ident(); self._settle()
+            self.clock += max(0.0, seconds); self._wake_due(); self._settle()
+    def now(self): return self.clock
+
+    # Background work (see InputBackend.background) runs at a standing clock: the input thread's sleeps wait for
+    # it, and it only spends virtual time through elapse(), so overlapped runs are deterministic.
+    def _settle(self):
+        while self._running: self._clock_moved.wait()
+
+    def _wake_due(self):
+        due = [waiter for waiter in self._waiters if waiter[0] <= self.clock]
+        for waiter in due: self._waiters.remove(waiter); waiter[1] = True; self._running += 1
+        if due: self._clock_moved.notify_all()
+
+    def background(self, fn):
+        with self._lock: self._running += 1 # Counted from submission, so the input can't run ahead of a task that hasn't started yet
+        def run(*args, **kwargs):
+            try: return fn(*args, **kwargs)
+            finally:
+                with self._lock: self._running -= 1; self._clock_moved.notify_all()
+        return run
+
+    def elapse(self, seconds: float):
+        """
+        Spends seconds of virtual time in a background task (e.g. a headless page load): the task waits while
+        the input's sleeps, or its idle_until(), carry the clock past the deadline. On the input thread it's a sleep.
+        """
+        with self._lock:
+            if self._input_thread in (None, threading.get_ident()): self.clock += max(0.0, seconds); self._wake_due(); return
+            waiter = [self.clock + seconds, False]; self._waiters.append(waiter)
+            self._running -= 1; self._clock_moved.notify_all()
+            while not waiter[1]: self._clock_moved.wait()
+
+    def idle_until(self, condition, poll=0.05):
+        # Nothing to type: jump the clock to the next background deadline instead of sleeping in small steps.
+        while not condition():
+            with self._lock:
+                if self._running: self._clock_moved.wait(0.01); continue
+                if self._waiters: self.clock = max(self.clock, min(waiter[0] for waiter in self._waiters)); self._wake_due(); continue
+            time.sleep(0.0005) # The last task is handing its result over
+
+    def open_window(self, profile: EdgeProfile, delay: float = 0.0) -> SimulatedWindow:
+        window = SimulatedWindow(self, profile, ready_at=self.clock + delay)
+        with self._lock: self.windows.append(window)
+        self.active = window
+        return window
+
+    def close_all_windows(self):
+        with self._lock:
+            for window in self.windows: window.close()
+            self.windows = []
+
+
+class SimulatedLauncher(BrowserLauncher):
+    """
+    Opens simulated windows on the backend; launches and closes are counted for reporting.
+    Each window shows up launch_delay (virtual) seconds after its launch.
+    """
+    def __init__(self, backend: SimulatedBackend, launch_delay: Tuple[float, float] = (0.8, 2.5)):
+        self.backend = backend
+        self.launch_delay = launch_delay
+        self.launches = 0
+        self.close_alls = 0
+
+    def launch(self, profile: EdgeProfile, track: bool = True):
+        self.launches += 1; self.backend.open_window(profile, delay=self.backend.random.uniform(*self.launch_delay))
+
+    def close_all(self):
+        self.close_alls += 1; self.backend.close_all_windows()
+        logger.log("Closed all simulated Edge windows.", "DEBUG")
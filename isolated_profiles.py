@@ -0,0 +1,67 @@
+# BingRewardSearch/isolated_profiles.py
+
+import os
+import shutil
+from typing import Optional
+
+from logger import logger
+import config
+
+
+def edge_user_data_dir() -> str:
+    return os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Edge\User Data")
+
+
+def isolated_user_data_dir(profile_directory: str) -> str:
+    return os.path.join(config.ISOLATED_USER_DATA_ROOT, profile_directory.replace(" ", "_"))
+
+
+def has_isolated_copy(profile_directory: str) -> bool:
+    """Whether an earlier sync left a copy of the profile's cookies to fall back on while its window holds the lock."""
+    return os.path.exists(os.path.join(isolated_user_data_dir(profile_directory), profile_directory, "Network", "Cookies"))
+
+
+def _copy_if_changed(src: str, dst: str):
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+        if src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) == int(dst_stat.st_mtime): return
+    except FileNotFoundError: pass
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try: shutil.copy2(src, dst)
+    except PermissionError:
+        if not os.path.exists(dst): raise
+        logger.log(f"'{src}' is locked by a running Edge window; keeping the previous copy.", "INFO") # Cookies as of that window's last close
+
+
+def _sync(src: str, dst: str):
+    if os.path.isdir(src):
+        for root, _, files in os.walk(src):
+            for name in files:
+                src_file = os.path.join(root, name)
+                _copy_if_changed(src_file, os.path.join(dst, os.path.relpath(src_file, src)))
+    elif os.path.isfile(src):
+        _copy_if_changed(src, dst)
+
+
+def prepare_isolated_user_data_dir(profile_directory: str) -> Optional[str]:
+    """
+    Mirrors the session state of one Edge profile into its own user-data-dir.
+
+    Edge allows one browser process per user-data-dir, so headless fetches can
+    only run side by side when each gets a private copy. Only the items needed
+    to stay signed in (config.ISOLATED_PROFILE_ITEMS) are copied, and only when
+    they changed since the last sync. A file locked by the profile's running
+    window keeps its previous copy; with none yet the copy fails (close the
+    window first, see has_isolated_copy). Returns None if the copy failed.
+    """
+    source_root = edge_user_data_dir()
+    target_root = isolated_user_data_dir(profile_directory)
+    try:
+        _sync(os.path.join(source_root, "Local State"), os.path.join(target_root, "Local State")) # Holds the cookie encryption key
+        for item in config.ISOLATED_PROFILE_ITEMS:
+            _sync(os.path.join(source_root, profile_directory, item), os.path.join(target_root, profile_directory, item))
+        return target_root
+    except OSError as e:
+        logger.log(f"Could not prepare isolated user-data-dir for '{profile_directory}': {e}", "WARN")
+        return None
@@ -0,0 +1,91 @@
+# BingRewardSearch/planner.py
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from edge_profile import EdgeProfile
+from automation_service import AutomationService
+from credit_model import CreditModel
+from history_store import parse_daily_progress
+from logger import logger
+import config
+
+POINTS_PER_SEARCH = 3
+
+
+@dataclass
+class ProfilePlan:
+    profile: EdgeProfile
+    searches: int                  # Searches to issue up front
+    earned: Optional[int] = None   # Today's PC search points, when known
+    max_pts: Optional[int] = None
+    source: str = "default"        # Where earned/max came from: "history", "fetch" or "default"
+
+    @property
+    def complete(self) -> bool:
+        return self.searches == 0
+
+
+class SearchPlanner:
+    """
+    Works out, before any window opens, how many searches each profile still needs today.
+
+    Today's history is used first. Profiles with no row today can be checked with a quick fetch
+    (PLANNER_PREFETCH) over the HTTP points client alone. Only profiles with cached cookies are tried,
+    and those whose cookies are refused stay unknown, so planning never launches a browser.
+    Profiles that are already complete are dropped. The rest get enough searches for the points
+    still missing towards the PC slider target: ceil(remaining / 3), or the credit model's figure.
+    """
+    def __init__(self, service: AutomationService, model: Optional[CreditModel] = None):
+        self.service = service
+        self.model = model
+
+    def searches_for(self, profile: EdgeProfile, remaining_points: int) -> int:
+        if self.model: return self.model.searches_needed(profile.email, remaining_points)
+        return math.ceil(max(0, remaining_points) / POINTS_PER_SEARCH)
+
+    @staticmethod
+    def _parse(points_data: Optional[Dict[str, str]]) -> Optional[Tuple[int, int]]:
+        return parse_daily_progress(points_data.get("daily_progress")) if points_data else None
+
+    def _prefetch(self, profiles: List[EdgeProfile], max_workers: int) -> Dict[EdgeProfile, Dict[str, str]]:
+        """HTTP-only fetches. Profiles whose cookies fail are left unknown: the Selenium fallback would launch headless Edge."""
+        client = self.service.points_client
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(profiles))), thread_name_prefix="PlanFetch") as executor:
+            fetched = dict(zip(profiles, executor.map(client.fetch, profiles)))
+        return {profile: points_data for profile, points_data in fetched.items() if points_data}
+
+    def plan(self, profiles: List[EdgeProfile], pc_searches_target: int, todays_progress_history: Dict[str, Dict[str, str]], stop_event: threading.Event, max_workers: int = config.FETCH_MAX_WORKERS, prefetch: Optional[bool] = None) -> List[ProfilePlan]:
+        prefetch = config.PLANNER_PREFETCH if prefetch is None else prefetch
+        known = {p: self._parse(todays_progress_history.get(p.email)) for p in profiles}
+        sources = {p: "history" for p, parsed in known.items() if parsed}
+        unknown = [p for p, parsed in known.items() if not parsed]
+        if prefetch and unknown:
+            cheap = [p for p in unknown if self.service.points_client.has_cookies(p)]
+            if cheap and not stop_event.is_set():
+                fetched = self._prefetch(cheap, max_workers)
+                for profile, points_data in fetched.items():
+                    parsed = self._parse(points_data)
+                    if parsed:
+                        known[profile] = parsed; sources[profile] = "fetch"; todays_progress_history[profile.email] = points_data
+        target_pts = pc_searches_target * POINTS_PER_SEARCH
+        plans = []
+        for profile in profiles:
+            parsed = known[profile]
+            if parsed:
+                earned, max_pts = parsed
+                plans.append(ProfilePlan(profile, self.searches_for(profile, min(target_pts, max_pts) - earned), earned, max_pts, sources[profile]))
+            else: plans.append(ProfilePlan(profile, self.searches_for(profile, target_pts)))
+        skipped = sum(1 for plan in plans if plan.complete)
+        logger.log(f"Plan: {len(plans) - skipped} profiles to search ({sum(plan.searches for plan in plans)} searches), {skipped} already complete; "
+                   f"{len(sources)} known ({sum(1 for s in sources.values() if s == 'fetch')} by pre-flight fetch).", "INFO")
+        return plans
+
+    @staticmethod
+    def pack(plans: List[ProfilePlan], batch_size: int) -> List[List[ProfilePlan]]:
+        """Drops complete profiles and packs the rest into batches of similar remaining work (most work first)."""
+        pending = sorted((plan for plan in plans if not plan.complete), key=lambda plan: (-plan.searches, plan.profile.index))
+        return [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
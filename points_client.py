@@ -0,0 +1,149 @@
+# BingRewardSearch/points_client.py
+
+import ctypes
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from edge_profile import EdgeProfile
+from logger import logger
+import config
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0"
+CRYPTPROTECT_UI_FORBIDDEN = 0x01
+
+
+class _DataBlob(ctypes.Structure):
+    _fields_ = [("cbData", ctypes.c_uint32), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    """CryptProtectData / CryptUnprotectData for the current Windows user: the protection Edge gives its own cookies."""
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = _DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char))); blob_out = _DataBlob()
+    crypt = ctypes.windll.crypt32.CryptProtectData if protect else ctypes.windll.crypt32.CryptUnprotectData
+    if not crypt(ctypes.byref(blob_in), None, None, None, None, CRYPTPROTECT_UI_FORBIDDEN, ctypes.byref(blob_out)): raise ctypes.WinError()
+    try: return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally: ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+
+class PointsClient:
+    """
+    Browser-free points fetch over plain HTTP.
+
+    Reuses the session cookies captured from the profile's last successful Selenium
+    fetch and reads the same user-info JSON the dashboard renders from. Each profile
+    gets its own pooled requests.Session. fetch() returns None on an auth failure
+    or a parse miss so the caller can fall back to the browser path.
+
+    Cookies outlive the run only on Windows, encrypted with DPAPI for the current user
+    (COOKIE_CACHE_PERSIST); elsewhere they are kept in memory for the session.
+    """
+    def __init__(self, base_url: str = config.REWARDS_BASE_URL, cookie_dir: str = config.COOKIE_CACHE_DIR, timeout: float = config.POINTS_CLIENT_TIMEOUT, persist: Optional[bool] = None):
+        self.base_url = base_url.rstrip("/")
+        self.cookie_dir = cookie_dir
+        self.persist = (config.COOKIE_CACHE_PERSIST if persist is None else persist) and sys.platform == "win32"
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _profile_key(profile: EdgeProfile) -> str:
+        return profile.cmd_arg.split('=')[1]
+
+    def _cookie_path(self, profile: EdgeProfile) -> str:
+        return os.path.join(self.cookie_dir, re.sub(r"[^\w.-]", "_", self._profile_key(profile)) + ".dpapi")
+
+    def _remove_plaintext_cache(self, profile: EdgeProfile):
+        """Earlier versions cached cookies as plain JSON; those files are deleted, never read."""
+        try: os.remove(self._cookie_path(profile)[:-len(".dpapi")] + ".json")
+        except OSError: pass
+
+    def _session(self, profile: EdgeProfile) -> requests.Session:
+        key = self._profile_key(profile)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session(); session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2)); session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+                self._load_cookies(profile, session)
+                self._sessions[key] = session
+            return session
+
+    def _load_cookies(self, profile: EdgeProfile, session: requests.Session):
+        self._remove_plaintext_cache(profile)
+        if not self.persist: return
+        try:
+            with open(self._cookie_path(profile), "rb") as f: cookies = json.loads(_dpapi(f.read(), protect=False))
+        except (OSError, ValueError): return
+        for c in cookies: session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    def has_cookies(self, profile: EdgeProfile) -> bool:
+        return len(self._session(profile).cookies) > 0
+
+    def save_cookies(self, profile: EdgeProfile, cookies: List[dict]):
+        """Stores cookies captured from a signed-in WebDriver session (driver.get_cookies())."""
+        if not cookies: return
+        session = self._session(profile)
+        with self._lock:
+            session.cookies.clear()
+            for c in cookies: session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+        if not self.persist: return
+        try:
+            encrypted = _dpapi(json.dumps([{k: c.get(k) for k in ("name", "value", "domain", "path")} for c in cookies]).encode("utf-8"), protect=True)
+            os.makedirs(self.cookie_dir, exist_ok=True)
+            with open(self._cookie_path(profile), "wb") as f: f.write(encrypted)
+        except OSError as e: logger.log(f"Could not cache cookies for {profile.name}: {e}", "WARN")
+
+    def forget(self, profile: EdgeProfile):
+        with self._lock:
+            session = self._sessions.pop(self._profile_key(profile), None)
+        if session: session.close()
+        try: os.remove(self._cookie_path(profile))
+        except OSError: pass
+
+    @staticmethod
+    def parse_user_info(data: dict) -> Optional[Dict[str, str]]:
+        """Maps the user-info JSON onto the {"available_points", "daily_progress"} dict the app uses."""
+        try:
+            status = (data.get("dashboard") or data)["userStatus"]
+            available = int(status["availablePoints"])
+            counters = status["counters"]["pcSearch"]
+            earned = sum(int(c["pointProgress"]) for c in counters); max_pts = sum(int(c["pointProgressMax"]) for c in counters)
+        except (KeyError, TypeError, ValueError): return None
+        if not counters: return None
+        return {"available_points": f"{available:,}", "daily_progress": f"{earned}/{max_pts} pts"}
+
+    def fetch(self, profile: EdgeProfile) -> Optional[Dict[str, str]]:
+        session = self._session(profile)
+        if not session.cookies: self.misses += 1; return None
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{self.base_url}/api/getuserinfo", params={"type": 1}, timeout=self.timeout, allow_redirects=False)
+            if response.status_code in (301, 302, 303, 307, 401, 403):
+                logger.log(f"HTTP points fetch for {profile.name}: session expired (HTTP {response.status_code}).", "INFO")
+                self.forget(profile); self.misses += 1; return None
+            response.raise_for_status()
+            points_data = self.parse_user_info(response.json())
+        except (requests.RequestException, ValueError) as e:
+            logger.log(f"HTTP points fetch failed for {profile.name}: {e}", "WARN"); self.misses += 1; return None
+        if points_data is None:
+            logger.log(f"HTTP points fetch for {profile.name}: unexpected response shape.", "WARN"); self.misses += 1; return None
+        self.hits += 1
+        logger.log(f"Fetched points for {profile.name} over HTTP in {time.perf_counter() - start:.2f}s.", "DEBUG")
+        return points_data
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values()); self._sessions.clear()
+        for session in sessions: session.close()
@@ -0,0 +1,83 @@
+# BingRewardSearch/points_scraper.py
+
+import re
+from typing import Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options as EdgeOptions
+
+from logger import logger
+import config
+
+# Runs inside the page: polls the selector registry until both values are present (or the
+# deadline passes) and hands them back in a single callback, so a fetch costs one navigation
+# plus one script round trip instead of a WebDriver round trip per poll.
+SCRAPE_POINTS_SCRIPT = """
+const selectors = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const patterns = {available_points: /\\d[\\d,]*/, daily_progress: /(\\d+)\\s*\\/\\s*(\\d+)/};
+const started = performance.now();
+function read(field) {
+    for (const selector of selectors[field] || []) {
+        let element = null;
+        try { element = document.querySelector(selector); } catch (e) { continue; }
+        const text = element ? (element.innerText || element.textContent || "").trim() : "";
+        const match = text.match(patterns[field]);
+        if (match) return {value: match[0], selector: selector};
+    }
+    return null;
+}
+function poll() {
+    const result = {available_points: read("available_points"), daily_progress: read("daily_progress")};
+    const elapsed = performance.now() - started;
+    if ((result.available_points && result.daily_progress) || elapsed >= timeoutMs) {
+        result.elapsed_ms = Math.round(elapsed);
+        result.transfer_bytes = performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"))
+            .reduce(function (total, entry) { return total + (entry.transferSize || 0); }, 0);
+        done(result);
+    } else {
+        setTimeout(poll, 100);
+    }
+}
+poll();
+"""
+
+
+def scrape_points(driver: webdriver.Remote, url: str = config.REWARDS_POINTS_URL, selectors: Dict[str, List[str]] = config.POINTS_SELECTORS, timeout: float = config.POINTS_FETCH_TIMEOUT) -> Dict[str, Optional[str]]:
+    """
+    Loads the points page once and reads balance and daily progress in one in-page script.
+
+    Returns {"available_points", "daily_progress", "selectors", "elapsed_ms"}; a value is
+    None if none of its selectors matched before the timeout.
+    """
+    driver.set_script_timeout(timeout + 5) # The script always answers by its own deadline
+    driver.get(url)
+    result = driver.execute_async_script(SCRAPE_POINTS_SCRIPT, selectors, int(timeout * 1000)) or {}
+    balance = result.get("available_points"); progress = result.get("daily_progress")
+    daily_progress = None
+    if progress:
+        earned, max_pts = re.findall(r'\d+', progress["value"])
+        daily_progress = f"{earned}/{max_pts} pts"
+    return {
+        "available_points": balance["value"] if balance else None,
+        "daily_progress": daily_progress,
+        "selectors": {"available_points": balance and balance["selector"], "daily_progress": progress and progress["selector"]},
+        "elapsed_ms": result.get("elapsed_ms"),
+        "transfer_bytes": result.get("transfer_bytes"),
+    }
+
+
+# --- Lean page loads ---
+def apply_lean_options(edge_options: EdgeOptions):
+    """Eager page loads without images: the scraper only needs two text nodes."""
+    edge_options.page_load_strategy = "eager"
+    edge_options.add_argument("--blink-settings=imagesEnabled=false")
+    edge_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+
+def enable_request_blocking(driver: webdriver.Remote, patterns: List[str] = config.LEAN_BLOCKED_URL_PATTERNS, page_load_timeout: float = config.LEAN_PAGE_LOAD_TIMEOUT):
+    """Blocks images, media, fonts and analytics through the DevTools protocol and caps page loads."""
+    driver.set_page_load_timeout(page_load_timeout)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e: logger.log(f"DevTools request blocking unavailable: {e}", "WARN")
@@ -0,0 +1,87 @@
+# BingRewardSearch/process_registry.py
+
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from logger import logger
+import config
+
+
+class ProcessRegistry:
+    """
+    The Edge and msedgedriver processes this app started, so closing them never touches anyone else's
+    Edge (another batch's windows, a fetch in flight, the user's own browsing). The exception is a user
+    window that Edge hands to a browser process we started; see EdgeLauncher.
+
+    Entries keep their Popen handle, which pins the process on Windows: a recycled PID can't be
+    mistaken for ours. Termination works on process trees (taskkill /T covers the renderers and a
+    driver's headless browser). It is graceful first (WM_CLOSE, so Edge saves its session) and forced
+    for whatever is still running after PROCESS_GRACEFUL_TIMEOUT. Processes with no window to close
+    (msedgedriver) go straight to the forced kill.
+    """
+    WINDOWLESS_KINDS = {"msedgedriver"} # Nothing to send WM_CLOSE to: killed without the graceful wait
+
+    def __init__(self):
+        self._processes: Dict[int, Tuple[subprocess.Popen, str, str]] = {} # pid -> (process, kind, label)
+        self._lock = threading.Lock()
+
+    def register(self, process: Optional[subprocess.Popen], kind: str, label: str = ""):
+        if process is None: return
+        with self._lock:
+            self._prune()
+            self._processes[process.pid] = (process, kind, label)
+
+    def spawn(self, args: Sequence[str], kind: str, label: str = "") -> subprocess.Popen:
+        process = subprocess.Popen(list(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.register(process, kind, label)
+        return process
+
+    def _prune(self):
+        for pid in [pid for pid, (process, _, _) in self._processes.items() if process.poll() is not None]: del self._processes[pid]
+
+    def live(self, kind: Optional[str] = None) -> List[subprocess.Popen]:
+        with self._lock:
+            self._prune()
+            return [process for process, process_kind, _ in self._processes.values() if kind is None or process_kind == kind]
+
+    @staticmethod
+    def _signal(process: subprocess.Popen, force: bool):
+        """Asks the process tree to exit (force=False) or kills it."""
+        if sys.platform == "win32":
+            # The exit code is ignored: a graceful taskkill /T fails whenever some windowless child (a renderer)
+            # won't take WM_CLOSE, even though the root window is closing. Waiting on the root decides.
+            subprocess.run(["taskkill", "/T"] + (["/F"] if force else []) + ["/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elif force: process.kill()
+        else: process.terminate()
+
+    @staticmethod
+    def _wait_all(processes: List[subprocess.Popen], timeout: float) -> List[subprocess.Popen]:
+        """Waits until every process exits or timeout passes; returns those still running."""
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            try: process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired: pass
+        return [process for process in processes if process.poll() is None]
+
+    def terminate(self, kind: Optional[str] = None, processes: Optional[List[subprocess.Popen]] = None, graceful_timeout: float = config.PROCESS_GRACEFUL_TIMEOUT, kill_timeout: float = config.PROCESS_KILL_TIMEOUT) -> int:
+        """Ends the registered processes of this kind (or just these processes, or all of them). Returns how many were running."""
+        targets = processes if processes is not None else self.live(kind)
+        running = [process for process in targets if process is not None and process.poll() is None]
+        if not running: return 0
+        with self._lock: kinds = {pid: process_kind for pid, (_, process_kind, _) in self._processes.items()}
+        windowless = [process for process in running if kinds.get(process.pid) in self.WINDOWLESS_KINDS]
+        closing = [process for process in running if process not in windowless]
+        for process in closing: self._signal(process, force=False)
+        stubborn = self._wait_all(closing, graceful_timeout) + windowless
+        for process in stubborn: self._signal(process, force=True) # /T also takes the children left behind
+        survivors = self._wait_all(stubborn, kill_timeout)
+        with self._lock: self._prune()
+        logger.log(f"Stopped {len(running)} {kind or 'spawned'} process(es): {len(running) - len(stubborn)} closed, {len(stubborn) - len(survivors)} killed"
+                   + (f", {len(survivors)} still running ({', '.join(str(p.pid) for p in survivors)})." if survivors else "."), "WARN" if survivors else "DEBUG")
+        return len(running)
+
+
+process_registry = ProcessRegistry()
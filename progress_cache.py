@@ -0,0 +1,96 @@
+# BingRewardSearch/progress_cache.py
+
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Optional
+
+from edge_profile import EdgeProfile
+from history_store import HistoryRow
+from logger import logger
+import config
+
+
+class ProgressCache:
+    """
+    Today's progress per profile, shared by the search and fetch workers and the UI.
+
+    Hydrated once from the history store, then kept in memory: saves update it at once and are
+    written behind, a batch at a time, by a background flusher (every PROGRESS_FLUSH_INTERVAL seconds,
+    sooner once PROGRESS_FLUSH_BATCH profiles are waiting, and on close). Several saves of one profile
+    between flushes become a single history row: its latest snapshot. At midnight the cache starts
+    the new day empty; rows still waiting keep the date they were saved on.
+    """
+    def __init__(self, store, flush_interval: float = config.PROGRESS_FLUSH_INTERVAL, flush_batch: int = config.PROGRESS_FLUSH_BATCH):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.flushes = 0; self.rows_written = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock() # Keeps rows in save order when a timed and an explicit flush overlap
+        self._day: Optional[str] = None
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._dirty: Dict[str, HistoryRow] = {}
+        self._wake = threading.Event(); self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def hydrate(self) -> "ProgressCache":
+        entries = self.store.todays_progress()
+        with self._lock: self._day = date.today().isoformat(); self._entries = entries
+        return self
+
+    def start(self) -> "ProgressCache":
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="ProgressFlush", daemon=True); self._flusher.start()
+        return self
+
+    def _roll_over(self):
+        today = date.today().isoformat()
+        if self._day != today: self._day = today; self._entries = {}
+
+    def todays_progress(self) -> Dict[str, Dict[str, str]]:
+        """A snapshot of today's progress by email; callers may add to it freely."""
+        with self._lock:
+            self._roll_over()
+            return dict(self._entries)
+
+    def update(self, profile: EdgeProfile, points_data: Dict[str, str]):
+        available_points = points_data.get("available_points", "N/A"); daily_progress = points_data.get("daily_progress", "N/A")
+        with self._lock:
+            self._roll_over()
+            self._entries[profile.email] = {"available_points": available_points, "daily_progress": daily_progress}
+            self._dirty.pop(profile.email, None) # Re-insert so rows flush in the order they were last saved
+            self._dirty[profile.email] = (self._day, profile.name, profile.email, available_points, daily_progress)
+            if len(self._dirty) >= self.flush_batch: self._wake.set()
+
+    def flush(self) -> int:
+        with self._flush_lock: return self._flush_unlocked()
+
+    def _flush_unlocked(self) -> int:
+        with self._lock: rows = list(self._dirty.values()); self._dirty = {}
+        if not rows: return 0
+        self.store.append(rows); self.flushes += 1; self.rows_written += len(rows)
+        logger.log(f"Progress cache: wrote {len(rows)} history row(s).", "DEBUG")
+        return len(rows)
+
+    @contextmanager
+    def held(self):
+        """Flushes, then keeps further flushes waiting (saves still land in memory) while the store is rewritten."""
+        with self._flush_lock:
+            self._flush_unlocked()
+            yield
+
+    def clear(self):
+        """Forgets today's progress and anything not yet written (the history itself is being cleared)."""
+        with self._lock: self._entries = {}; self._dirty = {}
+
+    def _flush_loop(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval); self._wake.clear()
+            try: self.flush()
+            except Exception as e: logger.log(f"Progress cache flush failed: {e}", "ERROR")
+
+    def close(self):
+        self._closed.set(); self._wake.set()
+        if self._flusher is not None: self._flusher.join(timeout=5.0); self._flusher = None
+        self.flush()
@@ -0,0 +1,136 @@
+# BingRewardSearch/query_dedup.py
+
+import hashlib
+import math
+import os
+import re
+import struct
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable
+
+from logger import logger
+import config
+
+FILE_MAGIC = b"BRSBLOOM1"
+HEADER_STRUCT = struct.Struct("<QII")  # bits per day, hash count, number of days
+
+
+class SeenQueryFilter:
+    """
+    A rotating Bloom filter of (profile, query) pairs, one bit array per day.
+
+    Bing does not credit a query the same account already searched, so terms are
+    checked against the last QUERY_DEDUP_WINDOW_DAYS days before being typed.
+    Membership tests and inserts are O(k) bit probes; false positives only cost
+    a redraw, never a repeated search. Persisted beside the progress history.
+    """
+    def __init__(self, path: str = config.QUERY_DEDUP_PATH, capacity: int = config.QUERY_DEDUP_CAPACITY,
+                 fp_rate: float = config.QUERY_DEDUP_FP_RATE, window_days: int = config.QUERY_DEDUP_WINDOW_DAYS):
+        self.path = path
+        self.window_days = max(1, window_days)
+        self.num_bits = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_bits += -self.num_bits % 8
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._days: Dict[str, bytearray] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        # Stats
+        self.checks = 0
+        self.rejections = 0
+        self.rejections_by_profile: Counter = Counter()
+        self.load()
+
+    # --- Bloom filter internals ---
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return re.sub(r"\s+", " ", term.strip().casefold())
+
+    def _positions(self, profile_key: str, term: str) -> Iterable[int]:
+        digest = hashlib.blake2b(f"{profile_key}\x1f{self._normalize(term)}".encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest); h2 |= 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _test(bits: bytearray, positions: Iterable[int]) -> bool:
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def _today_bits(self) -> bytearray:
+        today = date.today().isoformat()
+        bits = self._days.get(today)
+        if bits is None:
+            bits = self._days[today] = bytearray(self.num_bits // 8)
+            self._rotate(); self._dirty = True
+        return bits
+
+    def _rotate(self):
+        oldest = (date.today() - timedelta(days=self.window_days - 1)).isoformat()
+        for day in [d for d in self._days if d < oldest]: del self._days[day]
+
+    # --- Public API ---
+    def seen(self, profile_key: str, term: str) -> bool:
+        positions = self._positions(profile_key, term)
+        with self._lock: return any(self._test(bits, positions) for bits in self._days.values())
+
+    def check_and_add(self, profile_keys: Iterable[str], term: str) -> bool:
+        """Returns True and records the term if none of the profiles has searched it in the window."""
+        probes = [(key, self._positions(key, term)) for key in profile_keys]
+        with self._lock:
+            self.checks += 1
+            today_bits = self._today_bits()
+            duplicates = [key for key, positions in probes if any(self._test(bits, positions) for bits in self._days.values())]
+            if duplicates:
+                self.rejections += 1; self.rejections_by_profile.update(duplicates)
+                return False
+            for _, positions in probes:
+                for p in positions: today_bits[p >> 3] |= 1 << (p & 7)
+            self._dirty = True
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            per_profile = self.rejections_by_profile
+            return {
+                "checks": self.checks,
+                "rejections": self.rejections,
+                "rejection_rate": (self.rejections / self.checks) if self.checks else 0.0,
+                "profiles_saved": len(per_profile),
+                "avg_saved_per_profile": (sum(per_profile.values()) / len(per_profile)) if per_profile else 0.0,
+            }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.log(f"Query de-dup: {s['checks']} terms checked, {s['rejections']} duplicates redrawn ({s['rejection_rate']:.1%}), "
+                   f"avg {s['avg_saved_per_profile']:.1f} wasted searches saved across {s['profiles_saved']} profiles.", "DEBUG")
+
+    # --- Persistence ---
+    def load(self):
+        if not os.path.isfile(self.path): return
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(FILE_MAGIC)) != FILE_MAGIC: raise ValueError("bad header")
+                num_bits, num_hashes, num_days = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+                if (num_bits, num_hashes) != (self.num_bits, self.num_hashes):
+                    logger.log("Query de-dup filter size changed; starting a fresh filter.", "INFO"); return
+                days = {}
+                for _ in range(num_days):
+                    day = f.read(10).decode("ascii"); bits = bytearray(f.read(num_bits // 8))
+                    if len(bits) != num_bits // 8: raise ValueError("truncated file")
+                    days[day] = bits
+            with self._lock: self._days = days; self._rotate()
+        except (OSError, ValueError, struct.error) as e:
+            logger.log(f"Ignoring unreadable query de-dup file: {e}", "WARN")
+
+    def save(self):
+        with self._lock:
+            if not self._dirty: return
+            self._rotate()
+            payload = [FILE_MAGIC, HEADER_STRUCT.pack(self.num_bits, self.num_hashes, len(self._days))]
+            for day, bits in sorted(self._days.items()): payload += [day.encode("ascii"), bytes(bits)]
+            self._dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f: f.write(b"".join(payload))
+            os.replace(tmp_path, self.path)
+        except OSError as e: logger.log(f"Failed to save query de-dup filter: {e}", "ERROR")
@@ -0,0 +1,167 @@
+# BingRewardSearch/query_generator.py
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from wiki_corpus import WikiTitleCorpus
+from word_index import WordIndex
+from query_dedup import SeenQueryFilter
+from logger import logger
+import config
+
+# --- Human-like Search Query Generator ---
+class SearchQueryGenerator:
+    SEARCH_TYPES = ['phrase', 'simple_word', 'wikipedia_topic']
+    SEARCH_WEIGHTS = [0.5, 0.3, 0.2]
+    PHRASE_PARTS_OF_SPEECH = ("nouns", "adjectives")
+
+    def __init__(self):
+        self.word_index = WordIndex().load()
+        self.seen_filter = SeenQueryFilter()
+        self.wiki_corpus = WikiTitleCorpus(); self.wiki_corpus.open()
+        if config.WIKI_CORPUS_AUTO_REFRESH and (len(self.wiki_corpus) == 0 or self.wiki_corpus.is_stale()): self.wiki_corpus.refresh_in_background()
+        self.common_phrases = ["what is", "how to", "why is", "where is", "when did", "best way to", "recipe for", "news about", "weather in", "top 10", "reviews for", "compare", "deals for", "meaning of", "history of", "facts about"]
+        logger.log("SearchQueryGenerator initialized.", "SYSTEM")
+    def _get_simple_word(self) -> str: return self.word_index.random_word()
+    def _get_search_phrase(self) -> str: prefix = random.choice(self.common_phrases); suffix = self.word_index.random_word(self.PHRASE_PARTS_OF_SPEECH); return f"{prefix} {suffix}"
+    def _get_wikipedia_topic(self) -> str:
+        # Titles come from the offline corpus (already filtered); no network on this path.
+        title = self.wiki_corpus.sample()
+        return title if title else self._get_simple_word()
+    def _draw_search_term(self) -> str:
+        search_type = random.choices(self.SEARCH_TYPES, weights=self.SEARCH_WEIGHTS, k=1)[0]
+        if search_type == 'phrase': return self._get_search_phrase()
+        elif search_type == 'wikipedia_topic': return self._get_wikipedia_topic()
+        else: return self._get_simple_word()
+    def get_search_term(self, profile_keys: Optional[Iterable[str]] = None) -> str:
+        """Draws a term; with profile_keys, redraws until none of those profiles has searched it recently."""
+        term = self._draw_search_term()
+        if profile_keys is None: return term
+        profile_keys = list(profile_keys)
+        for _ in range(config.QUERY_DEDUP_MAX_REDRAWS):
+            if self.claim_term(term, profile_keys): return term
+            term = self._draw_search_term()
+        return term
+    def claim_term(self, term: str, profile_keys: Iterable[str]) -> bool:
+        """Records term as searched by profile_keys; False if any of them already used it."""
+        return self.seen_filter.check_and_add(profile_keys, term)
+    def get_search_terms(self, n: int) -> List[str]:
+        """Generates n terms, drawing branch choices, prefixes and words in bulk."""
+        if n <= 0: return []
+        search_types = random.choices(self.SEARCH_TYPES, weights=self.SEARCH_WEIGHTS, k=n)
+        n_phrases = search_types.count('phrase'); n_words = search_types.count('simple_word')
+        prefixes = iter(random.choices(self.common_phrases, k=n_phrases))
+        suffixes = iter(self.word_index.sample(n_phrases, self.PHRASE_PARTS_OF_SPEECH))
+        words = iter(self.word_index.sample(n_words))
+        terms = []
+        for search_type in search_types:
+            if search_type == 'phrase': terms.append(f"{next(prefixes)} {next(suffixes)}")
+            elif search_type == 'wikipedia_topic': terms.append(self._get_wikipedia_topic())
+            else: terms.append(next(words))
+        return terms
+    def get_offline_term(self) -> str:
+        """Returns a term without touching the network (used when the pool runs dry)."""
+        return self._get_search_phrase() if random.random() < 0.5 else self._get_simple_word()
+
+
+# --- Background Prefetching Term Pool ---
+class QueryPool:
+    """
+    A bounded, thread-safe pool of search terms.
+
+    A background producer keeps the pool topped up from the generator, so the
+    search loop only ever pops a ready term and network latency (Wikipedia
+    lookups) stays off the per-search critical path.
+    """
+    def __init__(self, generator: SearchQueryGenerator, capacity: int = config.QUERY_POOL_SIZE, low_watermark: int = config.QUERY_POOL_LOW_WATERMARK):
+        self.generator = generator
+        self.capacity = max(1, capacity)
+        self.low_watermark = max(0, min(low_watermark, self.capacity - 1))
+        self._terms = deque()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Stats
+        self.pops = 0
+        self.underruns = 0
+        self.refills = 0
+        self.terms_produced = 0
+        self.produce_errors = 0
+        self.total_refill_latency = 0.0
+        self.max_refill_latency = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._producer_loop, name="QueryPoolProducer", daemon=True)
+        self._thread.start()
+        logger.log(f"Query pool started (capacity={self.capacity}, low watermark={self.low_watermark}).", "SYSTEM")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        with self._cond: self._cond.notify_all()
+        if self._thread: self._thread.join(timeout)
+        self._thread = None
+
+    def get_term(self, profile_keys: Optional[Iterable[str]] = None) -> str:
+        """
+        Pops a ready term. Never blocks; on underrun falls back to an offline term.
+        With profile_keys, terms those profiles already searched are discarded and redrawn.
+        """
+        profile_keys = list(profile_keys) if profile_keys is not None else None
+        term = None
+        for _ in range(config.QUERY_DEDUP_MAX_REDRAWS if profile_keys else 1):
+            term = self._pop()
+            if profile_keys is None or self.generator.claim_term(term, profile_keys): break
+        return term
+
+    def _pop(self) -> str:
+        with self._cond:
+            self.pops += 1
+            term = self._terms.popleft() if self._terms else None
+            if len(self._terms) <= self.low_watermark: self._cond.notify()
+            if term is None: self.underruns += 1
+        return term if term is not None else self.generator.get_offline_term()
+
+    def depth(self) -> int:
+        with self._cond: return len(self._terms)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "depth": len(self._terms),
+                "capacity": self.capacity,
+                "pops": self.pops,
+                "underruns": self.underruns,
+                "underrun_rate": (self.underruns / self.pops) if self.pops else 0.0,
+                "refills": self.refills,
+                "terms_produced": self.terms_produced,
+                "produce_errors": self.produce_errors,
+                "avg_refill_latency_ms": (self.total_refill_latency / self.refills * 1000) if self.refills else 0.0,
+                "max_refill_latency_ms": self.max_refill_latency * 1000,
+            }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.log(f"Query pool: depth {s['depth']}/{s['capacity']}, {s['pops']} pops, {s['underruns']} underruns ({s['underrun_rate']:.1%}), "
+                   f"refill latency avg {s['avg_refill_latency_ms']:.1f} ms / max {s['max_refill_latency_ms']:.1f} ms.", "DEBUG")
+
+    def _producer_loop(self):
+        while not self._stop_event.is_set():
+            with self._cond:
+                while len(self._terms) > self.low_watermark and not self._stop_event.is_set():
+                    self._cond.wait()
+                if self._stop_event.is_set(): return
+                missing = self.capacity - len(self._terms)
+            start = time.perf_counter()
+            try: terms = self.generator.get_search_terms(missing)
+            except Exception as e:
+                self.produce_errors += 1; logger.log(f"Query pool producer error: {e}", "WARN")
+                self._stop_event.wait(1.0); continue
+            latency = time.perf_counter() - start
+            with self._cond:
+                self._terms.extend(terms); self.terms_produced += len(terms); self.refills += 1
+                self.total_refill_latency += latency; self.max_refill_latency = max(self.max_refill_latency, latency)
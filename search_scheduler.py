@@ -0,0 +1,42 @@
+# BingRewardSearch/search_scheduler.py
+
+import heapq
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+from edge_profile import EdgeProfile
+
+
+class SearchScheduler:
+    """
+    Decides which window the single foreground input serves next.
+
+    Each profile has a next-eligible time in a min-heap. After a search, the profile waits out its
+    own spacing (its reading time, at least a minimum gap between that profile's searches) while the
+    input moves on to whichever profile is eligible soonest. Only when every remaining profile is
+    still inside its spacing does the caller have to wait. A profile leaves the heap once its quota
+    is met. Ties go to the profile that has waited longest, which gives round-robin order when all
+    are eligible.
+    """
+    def __init__(self, quotas: Dict[EdgeProfile, int], spacing: Callable[[EdgeProfile], float], now: float = 0.0):
+        self.quotas = dict(quotas)
+        self.done: Dict[EdgeProfile, int] = {profile: 0 for profile in quotas}
+        self.spacing = spacing
+        self._order = itertools.count()
+        self._heap: List[Tuple[float, int, EdgeProfile]] = [(now, next(self._order), profile) for profile, quota in quotas.items() if quota > 0]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def next(self) -> Optional[Tuple[EdgeProfile, float]]:
+        """Pops the profile to search next and the time it becomes eligible (may be in the past)."""
+        if not self._heap: return None
+        ready_at, _, profile = heapq.heappop(self._heap)
+        return profile, ready_at
+
+    def searched(self, profile: EdgeProfile, now: float):
+        """Records a search for profile at time now and re-queues it unless its quota is met."""
+        self.done[profile] += 1
+        if self.done[profile] < self.quotas[profile]:
+            heapq.heappush(self._heap, (now + self.spacing(profile), next(self._order), profile))
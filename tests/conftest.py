@@ -0,0 +1,12 @@
+# BingRewardSearch/tests/conftest.py
+# The app is a flat set of modules at the repo root; the tests import them directly.
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+config.LOG_FILE_PATH = os.path.join(tempfile.mkdtemp(prefix="bing-reward-tests-"), "log.txt") # Before logger's singleton is built: keep log.txt out of test runs
@@ -0,0 +1,59 @@
+# BingRewardSearch/tests/test_credit_model.py
+
+import csv
+from datetime import date, timedelta
+
+import pytest
+
+import config
+from credit_model import CreditModel
+
+
+def write_log(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f); writer.writerow(CreditModel.HEADER); writer.writerows(rows)
+
+
+def test_prior_rate_without_history(tmp_path):
+    model = CreditModel(str(tmp_path / "credit.csv")).load()
+    assert model.rate("new@example.com") == 3.0
+    assert model.searches_needed("new@example.com", 90) == 30
+    assert model.searches_needed("new@example.com", 0) == 0
+
+
+def test_low_credit_profile_gets_more_searches_and_a_margin(tmp_path):
+    path = tmp_path / "credit.csv"; today = date.today().isoformat()
+    write_log(path, [[today, "slow@example.com", 60, 60, 60, 90], [today, "slow@example.com", 60, 60, 60, 90]])
+    model = CreditModel(str(path), prior_searches=30).load()
+    assert model.rate("slow@example.com") == pytest.approx((30 * 3 + 120) / 150)
+    assert model.searches_needed("slow@example.com", 90) == -(-90 // model.rate("slow@example.com")) + config.CREDIT_MODEL_MARGIN_SEARCHES
+
+
+def test_capped_passes_only_raise_the_estimate(tmp_path):
+    path = tmp_path / "credit.csv"; today = date.today().isoformat()
+    write_log(path, [[today, "capped@example.com", 100, 90, 90, 90], [today, "fast@example.com", 20, 90, 90, 90]])
+    model = CreditModel(str(path)).load()
+    assert model.rate("capped@example.com") == 3.0 # 0.9 pts/search at the cap proves nothing about the rate
+    assert model.rate("fast@example.com") == config.CREDIT_MODEL_MAX_RATE # 4.5/search lower bound, clamped
+
+
+def test_old_passes_weigh_less(tmp_path):
+    path = tmp_path / "credit.csv"; long_ago = (date.today() - timedelta(days=140)).isoformat(); today = date.today().isoformat()
+    write_log(path, [[long_ago, "a@example.com", 30, 30, 30, 90], [today, "b@example.com", 30, 30, 30, 90]])
+    model = CreditModel(str(path), half_life_days=14).load()
+    assert model.rate("b@example.com") < model.rate("a@example.com") < 3.0
+
+
+def test_record_appends_and_updates_the_rate(tmp_path):
+    path = tmp_path / "credit.csv"
+    model = CreditModel(str(path)).load(); assert model.rate("a@example.com") == 3.0
+    model.record([("a@example.com", 30, 30, 30, 90), ("b@example.com", 0, 0, 0, 90)])
+    assert model.rate("a@example.com") == pytest.approx(2.0)
+    assert CreditModel(str(path)).load().rate("a@example.com") == pytest.approx(2.0) # Persisted
+    assert CreditModel(str(path)).load().rate("b@example.com") == 3.0 # A pass without searches teaches nothing
+
+
+def test_unparsable_rows_are_skipped(tmp_path):
+    path = tmp_path / "credit.csv"; today = date.today().isoformat()
+    write_log(path, [[today, "a@example.com", "x", 30, 30, 90], ["not a date", "a@example.com", 30, 30, 30, 90]])
+    assert CreditModel(str(path)).load().rate("a@example.com") == 3.0
@@ -0,0 +1,59 @@
+# BingRewardSearch/tests/test_driver_pool.py
+
+import threading
+import time
+from collections import Counter
+
+from driver_pool import WebDriverPool
+from edge_profile import EdgeProfile
+
+A, B = (EdgeProfile(i, f"Profile {i}", f"p{i}@example.com", f"--profile-directory=Profile {i}") for i in range(2))
+
+
+class FakeDriver:
+    def __init__(self, key): self.key = key; self.quits = 0
+    @property
+    def window_handles(self): return ["main"]
+    def quit(self): self.quits += 1
+
+
+class CountingFactory:
+    def __init__(self, delay=0.0): self.delay = delay; self.launches = Counter(); self.drivers = []
+    def __call__(self, profile, headless):
+        time.sleep(self.delay); self.launches[profile.email] += 1
+        driver = FakeDriver(profile.email); self.drivers.append(driver); return driver
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline: time.sleep(0.01)
+    return condition()
+
+
+def test_idle_session_is_quit_without_another_pool_call():
+    factory = CountingFactory(); pool = WebDriverPool(factory, max_live=2, idle_timeout=0.1)
+    driver = pool.acquire(A, True); pool.release(A, True, driver)
+    assert wait_for(lambda: driver.quits == 1) and pool.stats()["live"] == 0
+    assert wait_for(lambda: pool._sweeper is None) # Nothing idle: the sweeper exits
+
+
+def test_reuse_within_the_timeout():
+    factory = CountingFactory(); pool = WebDriverPool(factory, max_live=2, idle_timeout=5)
+    driver = pool.acquire(A, True); pool.release(A, True, driver)
+    assert pool.acquire(A, True) is driver and factory.launches[A.email] == 1 and pool.reuses == 1
+    pool.release(A, True, driver); pool.close_all()
+
+
+def test_callers_waiting_on_capacity_for_one_key_launch_it_once():
+    factory = CountingFactory(delay=0.05); pool = WebDriverPool(factory, max_live=1, idle_timeout=5)
+    holder = pool.acquire(A, True) # Fills the pool: both B callers wait on capacity
+    got = []
+    def use_b():
+        driver = pool.acquire(B, True); got.append(driver); time.sleep(0.02); pool.release(B, True, driver)
+    threads = [threading.Thread(target=use_b) for _ in range(2)]
+    for thread in threads: thread.start()
+    time.sleep(0.1); pool.release(A, True, holder)
+    for thread in threads: thread.join(5)
+    assert len(got) == 2 and got[0] is got[1] and factory.launches[B.email] == 1
+    assert holder.quits == 1 # Evicted to make room
+    pool.close_all()
@@ -0,0 +1,21 @@
+# BingRewardSearch/tests/test_harness.py
+# The end-to-end harness from benchmark.py (simulated input, fixture server, virtual clock) as a regression test.
+
+import pytest
+
+import config
+from benchmark import _run_harness
+
+
+@pytest.fixture(autouse=True)
+def restore_config(monkeypatch):
+    for name in [name for name in vars(config) if name.isupper()]: monkeypatch.setattr(config, name, getattr(config, name)) # The harness repoints paths and flags
+
+
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_failed_isolated_copy_is_refetched_not_counted_as_collected(pipelined):
+    config.PIPELINE_BATCHES = pipelined
+    r = _run_harness(16, "default", batch_size=8, pc_points=90, fetch_latency=8.0, locked=6)
+    assert r["stats"].pipelined == pipelined
+    assert r["locked"] == 6 and r["locked_verified"] == 6 # Each first fetch failed: all six had to be fetched again
+    assert r["copy_attempts"] >= 12 and r["complete"] == 16
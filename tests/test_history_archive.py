@@ -0,0 +1,70 @@
+# BingRewardSearch/tests/test_history_archive.py
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from history_archive import HistoryArchive, HistoryFrame, compact_history, export_history, query_history
+from history_store import CsvHistoryStore, SqliteHistoryStore, latest_per_day
+from test_history_store import sample_rows, write_csv
+
+
+@pytest.fixture
+def history(tmp_path):
+    """A SQLite store imported from ~4 months of CSV history with a duplicate snapshot per profile per day."""
+    rows = sample_rows(days=120, profiles=3)
+    rows += [[day, name, email, "1", "0/90 pts"] for day, name, email, _, _ in rows[:: 4]] # Earlier snapshots, superseded below...
+    rows.sort(key=lambda row: row[0]) # ...once sorted, the later copy of each (day, email) must win
+    csv_path = tmp_path / "history.csv"; write_csv(csv_path, rows)
+    store = SqliteHistoryStore(str(tmp_path / "history.db"), csv_path=str(csv_path))
+    yield store, HistoryArchive(str(tmp_path / "archive")), csv_path
+    store.close()
+
+
+def test_compaction_round_trip_loses_nothing(history):
+    store, archive, csv_path = history; original_csv = csv_path.read_bytes()
+    before = store.records(); expected = sorted(latest_per_day(before))
+    duplicates, archived = compact_history(store, archive, keep_months=1)
+    assert duplicates == len(before) - len(expected) == 90
+    assert archived == len(expected) - len(store.records()) > 0 and len(archive.months()) >= 3
+    assert all(record[0] >= date.today().replace(day=1).isoformat() for record in store.records())
+    assert sorted(query_history(store, archive).records()) == expected
+    assert csv_path.read_bytes() == original_csv
+    assert compact_history(store, archive, keep_months=1) == (0, 0) # Idempotent
+
+
+def test_export_covers_archive_and_store(history, tmp_path):
+    store, archive, _ = history
+    expected = sorted(latest_per_day(store.records()))
+    compact_history(store, archive, keep_months=1)
+    exported = export_history(store, archive, str(tmp_path / "export.csv"))
+    assert sorted(CsvHistoryStore(exported).records()) == expected
+
+
+def test_interrupted_compaction_counts_overlap_once(history):
+    store, archive, _ = history
+    expected = sorted(latest_per_day(store.records()))
+    month = expected[0][0][:7]
+    archive.write_month(month, [record for record in expected if record[0][:7] == month]) # Archive written, store not yet rewritten
+    assert sorted(query_history(store, archive).records()) == expected
+
+
+def test_query_filters_by_date_and_email(history):
+    store, archive, _ = history; compact_history(store, archive, keep_months=1)
+    since = (date.today() - timedelta(days=40)).isoformat(); until = (date.today() - timedelta(days=10)).isoformat()
+    frame = query_history(store, archive, since=since, until=until, emails=["p1@example.com"])
+    assert len(frame) == 30 and set(frame.email.tolist()) == {"p1@example.com"}
+    assert str(frame.day.min()) == since and np.all(np.diff(frame.day.astype(np.int64)) >= 0)
+
+
+def test_csv_backend_is_never_rewritten(tmp_path):
+    csv_path = tmp_path / "history.csv"; write_csv(csv_path, sample_rows(days=90)); original = csv_path.read_bytes()
+    archive = HistoryArchive(str(tmp_path / "archive"))
+    assert compact_history(CsvHistoryStore(str(csv_path)), archive, keep_months=1) == (0, 0)
+    assert csv_path.read_bytes() == original and archive.months() == []
+
+
+def test_frame_round_trips_missing_values():
+    records = [("2025-07-01", "A", "a@example.com", None, None, None), ("2025-07-02", "A", "a@example.com", 5969, 45, 90)]
+    assert HistoryFrame.from_records(records).records() == records
@@ -0,0 +1,73 @@
+# BingRewardSearch/tests/test_history_store.py
+
+import csv
+from datetime import date, timedelta
+
+import pytest
+
+from edge_profile import EdgeProfile
+from history_store import CSV_HEADER, CsvHistoryStore, SqliteHistoryStore, latest_per_day, to_record, to_row
+
+
+def write_csv(path, rows, newline="\n", bom=False, trailing_newline=True):
+    lines = [",".join(f'"{field}"' if "," in field else field for field in row) for row in [CSV_HEADER] + rows]
+    text = newline.join(lines) + (newline if trailing_newline else "")
+    path.write_bytes((b"\xef\xbb\xbf" if bom else b"") + text.encode("utf-8"))
+
+
+def sample_rows(days=5, profiles=3):
+    first = date.today() - timedelta(days=days - 1)
+    return [[(first + timedelta(days=d)).isoformat(), f"Profile {p} ü", f"p{p}@example.com", f"{5000 + d * 90 + p:,}", f"{(d * 7 + p) % 91}/90 pts"]
+            for d in range(days) for p in range(profiles)]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 64 * 1024])
+@pytest.mark.parametrize("newline,bom,trailing_newline", [("\n", False, True), ("\r\n", False, True), ("\r\n", True, False)])
+def test_rows_from_end_is_the_file_reversed(tmp_path, block_size, newline, bom, trailing_newline):
+    path = tmp_path / "history.csv"; rows = sample_rows()
+    write_csv(path, rows, newline, bom, trailing_newline)
+    with open(path, newline="", encoding="utf-8-sig") as f: forward = list(csv.reader(f))
+    assert list(CsvHistoryStore(str(path)).rows_from_end(block_size=block_size)) == forward[::-1]
+    assert forward[0] == CSV_HEADER and forward[1][3].count(",") == 1 # Quoted "5,000" kept whole
+
+
+def test_csv_todays_progress_last_snapshot_wins(tmp_path):
+    path = tmp_path / "history.csv"; rows = sample_rows()
+    today = date.today().isoformat(); rows.append([today, "Profile 0 ü", "p0@example.com", "9,999", "90/90 pts"])
+    write_csv(path, rows)
+    progress = CsvHistoryStore(str(path)).todays_progress()
+    assert set(progress) == {"p0@example.com", "p1@example.com", "p2@example.com"}
+    assert progress["p0@example.com"] == {"available_points": "9,999", "daily_progress": "90/90 pts"}
+
+
+def test_sqlite_store_imports_csv_once_and_never_writes_it(tmp_path):
+    csv_path = tmp_path / "history.csv"; write_csv(csv_path, sample_rows()); original = csv_path.read_bytes()
+    store = SqliteHistoryStore(str(tmp_path / "history.db"), csv_path=str(csv_path))
+    assert len(store.records()) == 15
+    store.save(EdgeProfile(0, "Profile 0 ü", "p0@example.com", ""), {"available_points": "1,234", "daily_progress": "30/90 pts"})
+    assert store.todays_progress()["p0@example.com"] == {"available_points": "1,234", "daily_progress": "30/90 pts"}
+    store.clear(); store.close()
+    assert csv_path.read_bytes() == original
+    reopened = SqliteHistoryStore(str(tmp_path / "history.db"), csv_path=str(csv_path))
+    assert reopened.records() == [] # Not imported a second time
+    reopened.close()
+
+
+def test_todays_progress_reads_only_today(tmp_path):
+    csv_path = tmp_path / "history.csv"; write_csv(csv_path, sample_rows())
+    store = SqliteHistoryStore(str(tmp_path / "history.db"), csv_path=str(csv_path))
+    progress = store.todays_progress(); store.close()
+    assert set(progress) == {"p0@example.com", "p1@example.com", "p2@example.com"}
+    assert progress["p2@example.com"] == {"available_points": "5,362", "daily_progress": "30/90 pts"}
+
+
+def test_records_round_trip_through_rows():
+    row = ("2025-07-01", "Name", "a@example.com", "5,969", "45/90 pts")
+    assert to_record(row) == ("2025-07-01", "Name", "a@example.com", 5969, 45, 90)
+    assert to_row(to_record(row)) == row
+    assert to_record(("2025-07-01", "Name", "a@example.com", "Error", "N/A"))[3:] == (None, None, None)
+
+
+def test_latest_per_day_keeps_each_profiles_last_snapshot():
+    records = [("2025-07-01", "A", "a", 1, 0, 90), ("2025-07-01", "B", "b", 5, 0, 90), ("2025-07-01", "A", "a", 2, 30, 90), ("2025-07-02", "A", "a", 3, 0, 90)]
+    assert latest_per_day(records) == [records[1], records[2], records[3]]
@@ -0,0 +1,18 @@
+# BingRewardSearch/tests/test_input_backend.py
+
+import pytest
+
+from input_backend import BrowserLauncher, InputBackend, SimulatedBackend, SimulatedLauncher
+
+
+def test_a_backend_missing_a_method_fails_when_created():
+    class Partial(InputBackend):
+        def sleep(self, seconds): pass
+    with pytest.raises(TypeError, match="abstract"): Partial()
+    with pytest.raises(TypeError, match="abstract"): type("NoClose", (BrowserLauncher,), {"launch": lambda self, profile, track=True: None})()
+
+
+def test_simulated_implementations_cover_the_interfaces():
+    backend = SimulatedBackend(seed=1)
+    SimulatedLauncher(backend)
+    assert not InputBackend.__abstractmethods__ - set(vars(SimulatedBackend))
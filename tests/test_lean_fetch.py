@@ -0,0 +1,128 @@
+# BingRewardSearch/tests/test_lean_fetch.py
+# What separates a lean fetch from a full one, checked without a browser: the options it sets,
+# the DevTools calls it makes, that the fixture page's heavy assets are exactly what gets blocked,
+# and that both read the same points.
+
+import fnmatch
+import re
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.edge.options import Options as EdgeOptions
+
+import automation_service
+import config
+from automation_service import AutomationService
+from edge_profile import EdgeProfile
+from fake_rewards_server import HEAVY_ASSET_BYTES, FakeRewardsServer
+from points_scraper import apply_lean_options, enable_request_blocking, scrape_points
+
+
+def blocked(url: str) -> bool:
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in config.LEAN_BLOCKED_URL_PATTERNS) # Same '*' wildcards as Network.setBlockedURLs
+
+
+class RecordingDriver:
+    def __init__(self, cdp_error=None):
+        self.calls = []; self.cdp_error = cdp_error
+
+    def set_page_load_timeout(self, timeout): self.calls.append(("set_page_load_timeout", timeout))
+
+    def execute_cdp_cmd(self, command, params):
+        if self.cdp_error: raise self.cdp_error
+        self.calls.append((command, params))
+
+
+class FixturePageDriver:
+    """
+    Loads the fixture page as Edge would with these options: the HTML, then every asset unless DevTools
+    blocks it or images are off. The in-page script is answered with what the page's own script writes
+    into the two targets, matched with the script's patterns.
+    """
+    def __init__(self, options: EdgeOptions):
+        self.options = options; self.cdp_commands = []; self.blocked_patterns = []; self.transferred = 0; self.html = ""
+
+    def set_page_load_timeout(self, timeout): self.page_load_timeout = timeout
+    def set_script_timeout(self, timeout): pass
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        if command == "Network.setBlockedURLs": self.blocked_patterns = params["urls"]
+
+    def get(self, url):
+        self.html = urllib.request.urlopen(url).read().decode("utf-8"); self.transferred = len(self.html)
+        images_off = "--blink-settings=imagesEnabled=false" in self.options.arguments
+        for path in re.findall(r'(?:src="|url\(")(/[^"]+)"', self.html):
+            asset = url.split("/pointsbreakdown")[0] + path
+            if any(fnmatch.fnmatchcase(asset, pattern) for pattern in self.blocked_patterns): continue
+            if images_off and asset.endswith((".png", ".jpg", ".svg")): continue
+            self.transferred += len(urllib.request.urlopen(asset).read())
+
+    def execute_async_script(self, script, selectors, timeout_ms):
+        points = re.search(r'pointsValue span"\)\.textContent = "(\d[\d,]*)"', self.html)
+        progress = re.search(r'c-caption-1"\)\.textContent = "PC search: (\d+\s*/\s*\d+) pts"', self.html)
+        def found(match, field): return {"value": match.group(1), "selector": selectors[field][0]} if match else None
+        return {"available_points": found(points, "available_points"), "daily_progress": found(progress, "daily_progress"), "elapsed_ms": 600, "transfer_bytes": self.transferred}
+
+
+@pytest.fixture
+def heavy_server():
+    server = FakeRewardsServer(heavy_assets=True, asset_latency=0).start()
+    yield server
+    server.stop()
+
+
+def test_lean_options_load_eagerly_without_images():
+    full, lean = EdgeOptions(), EdgeOptions(); apply_lean_options(lean)
+    assert full.page_load_strategy == "normal" and lean.page_load_strategy == "eager"
+    assert "--blink-settings=imagesEnabled=false" in lean.arguments and not full.arguments
+    assert lean.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+
+def test_request_blocking_caps_loads_and_blocks_the_patterns():
+    driver = RecordingDriver(); enable_request_blocking(driver)
+    assert driver.calls == [("set_page_load_timeout", config.LEAN_PAGE_LOAD_TIMEOUT), ("Network.enable", {}),
+                            ("Network.setBlockedURLs", {"urls": config.LEAN_BLOCKED_URL_PATTERNS})]
+
+
+def test_request_blocking_without_devtools_still_caps_loads():
+    driver = RecordingDriver(cdp_error=RuntimeError("no CDP")); enable_request_blocking(driver)
+    assert driver.calls == [("set_page_load_timeout", config.LEAN_PAGE_LOAD_TIMEOUT)]
+
+
+def test_fixture_heavy_assets_are_all_blocked_and_the_page_is_not(heavy_server):
+    page_url = heavy_server.base_url + "/pointsbreakdown"
+    html = urllib.request.urlopen(page_url).read().decode("utf-8")
+    assets = [heavy_server.base_url + path for path in re.findall(r'(?:src="|url\(")(/[^"]+)"', html)]
+    assert len(assets) == 8 and not blocked(page_url)
+    assert [url for url in assets if not blocked(url)] == []
+    full_bytes = len(html) + sum(len(urllib.request.urlopen(url).read()) for url in assets)
+    assert full_bytes >= 8 * HEAVY_ASSET_BYTES > 100 * len(html) # What the full fetch pays for and the lean one skips
+
+
+def test_fixture_scrape_targets_match_the_first_selectors(heavy_server):
+    html = urllib.request.urlopen(heavy_server.base_url + "/").read().decode("utf-8")
+    assert "<mee-rewards-user-status-banner-balance><p class=\"pointsValue\"><span>" in html # mee-rewards-user-status-banner-balance p.pointsValue span
+    assert "<div id=\"bingSearchDailyPoints\"><p class=\"c-caption-1\">" in html             # div#bingSearchDailyPoints p.c-caption-1
+    assert config.POINTS_SELECTORS["available_points"][0] == "mee-rewards-user-status-banner-balance p.pointsValue span"
+    assert config.POINTS_SELECTORS["daily_progress"][0] == "div#bingSearchDailyPoints p.c-caption-1"
+
+
+def test_lean_and_full_fetches_read_the_same_points(heavy_server, monkeypatch):
+    state = heavy_server.profile("default"); state.points = 12345; state.earned = 45
+    monkeypatch.setattr(automation_service, "EdgeService", lambda executable_path: SimpleNamespace(process=None))
+    monkeypatch.setattr(automation_service.webdriver, "Edge", lambda service, options: FixturePageDriver(options))
+    service = object.__new__(AutomationService) # _setup_driver uses no service state
+    profile = EdgeProfile(1, "Profile 1", "p1@example.com", "--profile-directory=Profile 1")
+    drivers, results = {}, {}
+    for lean in (False, True):
+        drivers[lean] = service._setup_driver(profile, headless=True, lean=lean)
+        results[lean] = scrape_points(drivers[lean], heavy_server.base_url + "/pointsbreakdown", timeout=5)
+    assert drivers[False].cdp_commands == [] and drivers[False].options.page_load_strategy == "normal"
+    assert drivers[True].cdp_commands == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": config.LEAN_BLOCKED_URL_PATTERNS})]
+    assert drivers[True].options.page_load_strategy == "eager" and drivers[True].page_load_timeout == config.LEAN_PAGE_LOAD_TIMEOUT
+    for lean in (False, True):
+        assert (results[lean]["available_points"], results[lean]["daily_progress"]) == ("12,345", "45/90 pts")
+        assert results[lean]["selectors"] == results[False]["selectors"]
+    assert results[True]["transfer_bytes"] * 100 < results[False]["transfer_bytes"]
@@ -0,0 +1,50 @@
+# BingRewardSearch/tests/test_points_client.py
+# The HTTP points client against the local fixture server: no browser involved.
+
+import pytest
+
+from edge_profile import EdgeProfile
+from fake_rewards_server import FakeRewardsServer
+from points_client import PointsClient
+
+PROFILE = EdgeProfile(1, "Profile 1", "p1@example.com", "--profile-directory=Profile 1")
+
+
+@pytest.fixture
+def server():
+    server = FakeRewardsServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    client = PointsClient(base_url=server.base_url, cookie_dir=str(tmp_path), persist=False)
+    yield client
+    client.close()
+
+
+def test_fetch_reads_balance_and_progress(server, client):
+    state = server.profile("p1"); state.points = 12345; state.earned = 45
+    client.save_cookies(PROFILE, [{"name": "fake_profile", "value": "p1", "domain": "127.0.0.1", "path": "/"}])
+    assert client.fetch(PROFILE) == {"available_points": "12,345", "daily_progress": "45/90 pts"}
+    assert (client.hits, client.misses) == (1, 0)
+
+
+def test_without_cookies_there_is_no_request(server, client):
+    assert client.fetch(PROFILE) is None and client.misses == 1 and "/api/getuserinfo" not in server.requests
+
+
+def test_expired_session_is_forgotten(server, client):
+    client.save_cookies(PROFILE, [{"name": "other", "value": "x", "domain": "127.0.0.1", "path": "/"}]) # The server redirects to login
+    assert client.fetch(PROFILE) is None and not client.has_cookies(PROFILE)
+
+
+def test_nothing_written_to_disk_when_not_persisting(client, tmp_path):
+    client.save_cookies(PROFILE, [{"name": "fake_profile", "value": "p1", "domain": "127.0.0.1", "path": "/"}])
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("data", [{}, {"userStatus": {"availablePoints": "x"}}, {"dashboard": {"userStatus": {"availablePoints": 1, "counters": {"pcSearch": []}}}}])
+def test_unexpected_shapes_parse_to_none(data):
+    assert PointsClient.parse_user_info(data) is None
@@ -0,0 +1,67 @@
+# BingRewardSearch/tests/test_points_scraper.py
+# scrape_points's handling of what its in-page script returns, and the script itself against the
+# fixture page in a real headless Edge (skipped where there's no Edge/msedgedriver).
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options as EdgeOptions
+
+import config
+from fake_rewards_server import FakeRewardsServer
+from points_scraper import SCRAPE_POINTS_SCRIPT, scrape_points
+
+
+class ScriptResultDriver:
+    """Answers the scrape script with a canned result and records what scrape_points asked for."""
+    def __init__(self, result):
+        self.result = result; self.calls = []
+
+    def set_script_timeout(self, timeout): self.calls.append(("set_script_timeout", timeout))
+    def get(self, url): self.calls.append(("get", url))
+    def execute_async_script(self, script, *args): self.calls.append(("execute_async_script", script, args)); return self.result
+
+
+def test_values_and_matching_selectors_are_returned():
+    driver = ScriptResultDriver({"available_points": {"value": "5,969", "selector": "a"}, "daily_progress": {"value": "45 / 90", "selector": "b"},
+                                 "elapsed_ms": 620, "transfer_bytes": 2048})
+    result = scrape_points(driver, "http://127.0.0.1/pointsbreakdown", timeout=5)
+    assert result == {"available_points": "5,969", "daily_progress": "45/90 pts", "selectors": {"available_points": "a", "daily_progress": "b"},
+                      "elapsed_ms": 620, "transfer_bytes": 2048}
+    assert driver.calls[0] == ("set_script_timeout", 10) and driver.calls[1] == ("get", "http://127.0.0.1/pointsbreakdown")
+    assert driver.calls[2] == ("execute_async_script", SCRAPE_POINTS_SCRIPT, (config.POINTS_SELECTORS, 5000)) # One round trip
+
+
+def test_missing_values_are_none():
+    result = scrape_points(ScriptResultDriver({"available_points": None, "daily_progress": None, "elapsed_ms": 5000}), "http://127.0.0.1/", timeout=5)
+    assert result["available_points"] is None and result["daily_progress"] is None
+    assert result["selectors"] == {"available_points": None, "daily_progress": None}
+    assert scrape_points(ScriptResultDriver(None), "http://127.0.0.1/", timeout=5)["available_points"] is None # Script returned nothing
+
+
+@pytest.fixture
+def headless_edge():
+    options = EdgeOptions(); options.add_argument("--headless=new"); options.add_argument("--no-sandbox")
+    try: driver = webdriver.Edge(options=options)
+    except Exception as e: pytest.skip(f"no headless Edge here ({type(e).__name__})")
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def fixture_server():
+    server = FakeRewardsServer(balance_delay_ms=300, progress_delay_ms=600).start()
+    yield server
+    server.stop()
+
+
+def test_scrape_script_reads_the_fixture_page(headless_edge, fixture_server):
+    state = fixture_server.profile("default"); state.points = 12345; state.earned = 45
+    result = scrape_points(headless_edge, fixture_server.base_url + "/pointsbreakdown", timeout=5)
+    assert result["available_points"] == "12,345" and result["daily_progress"] == "45/90 pts"
+    assert result["selectors"] == {field: selectors[0] for field, selectors in config.POINTS_SELECTORS.items()}
+    assert 600 <= result["elapsed_ms"] < 5000 # Waited for the late-filled progress, not the timeout
+
+
+def test_scrape_script_gives_up_at_its_deadline(headless_edge, fixture_server):
+    result = scrape_points(headless_edge, fixture_server.base_url + "/pointsbreakdown", selectors={"available_points": ["#nothing"], "daily_progress": ["#nothing"]}, timeout=1)
+    assert result["available_points"] is None and result["daily_progress"] is None and result["elapsed_ms"] >= 1000
@@ -0,0 +1,71 @@
+# BingRewardSearch/tests/test_query_dedup.py
+
+from datetime import date
+
+import pytest
+
+import query_dedup
+from query_dedup import SeenQueryFilter
+
+
+class _Clock(date):
+    current = date(2025, 7, 1)
+
+    @classmethod
+    def today(cls): return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(query_dedup, "date", _Clock); _Clock.current = date(2025, 7, 1)
+    return _Clock
+
+
+def make_filter(tmp_path, window_days=2) -> SeenQueryFilter:
+    return SeenQueryFilter(path=str(tmp_path / "seen.bloom"), capacity=1000, fp_rate=0.001, window_days=window_days)
+
+
+def test_repeat_rejected_for_same_profile_only(tmp_path, clock):
+    seen = make_filter(tmp_path)
+    assert seen.check_and_add(["a@example.com"], "Weather Tomorrow")
+    assert not seen.check_and_add(["a@example.com"], "  weather   tomorrow ") # Normalised: case and whitespace
+    assert seen.check_and_add(["b@example.com"], "weather tomorrow")
+    assert seen.stats()["rejections"] == 1 and seen.rejections_by_profile["a@example.com"] == 1
+
+
+def test_batch_check_rejects_if_any_profile_has_seen_it(tmp_path, clock):
+    seen = make_filter(tmp_path)
+    seen.check_and_add(["a@example.com"], "rust borrow checker")
+    assert not seen.check_and_add(["a@example.com", "b@example.com"], "rust borrow checker")
+    assert not seen.seen("b@example.com", "rust borrow checker") # Nothing recorded for a rejected draw
+
+
+def test_terms_expire_after_the_window(tmp_path, clock):
+    seen = make_filter(tmp_path, window_days=2)
+    seen.check_and_add(["a@example.com"], "old term")
+    clock.current = date(2025, 7, 2)
+    assert not seen.check_and_add(["a@example.com"], "old term") # Yesterday is still in the window
+    seen.check_and_add(["a@example.com"], "new term")
+    clock.current = date(2025, 7, 3)
+    assert seen.check_and_add(["a@example.com"], "old term") # 1 July rotated out
+    assert seen.seen("a@example.com", "new term")
+    assert sorted(seen._days) == ["2025-07-02", "2025-07-03"]
+
+
+def test_save_and_load_round_trip_rotates_stale_days(tmp_path, clock):
+    seen = make_filter(tmp_path)
+    seen.check_and_add(["a@example.com"], "first day")
+    clock.current = date(2025, 7, 2); seen.check_and_add(["a@example.com"], "second day"); seen.save()
+
+    reloaded = make_filter(tmp_path)
+    assert reloaded.seen("a@example.com", "first day") and reloaded.seen("a@example.com", "second day")
+    clock.current = date(2025, 7, 3)
+    assert not make_filter(tmp_path).seen("a@example.com", "first day")
+
+
+def test_unreadable_or_resized_file_starts_fresh(tmp_path, clock):
+    seen = make_filter(tmp_path); seen.check_and_add(["a@example.com"], "term"); seen.save()
+    resized = SeenQueryFilter(path=seen.path, capacity=5000, fp_rate=0.001, window_days=2)
+    assert not resized.seen("a@example.com", "term")
+    (tmp_path / "seen.bloom").write_bytes(b"garbage")
+    assert not make_filter(tmp_path).seen("a@example.com", "term")
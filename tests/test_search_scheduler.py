@@ -0,0 +1,43 @@
+# BingRewardSearch/tests/test_search_scheduler.py
+
+from edge_profile import EdgeProfile
+from search_scheduler import SearchScheduler
+
+A, B, C = (EdgeProfile(i, f"Profile {i}", f"p{i}@example.com", f"--profile-directory=Profile {i}") for i in range(3))
+
+
+def drain(scheduler, search_seconds=1.0):
+    """Runs the scheduler like run_search_session does: wait until the next profile is eligible, search, repeat."""
+    now, order = 0.0, []
+    while True:
+        entry = scheduler.next()
+        if entry is None: return order, now
+        profile, ready_at = entry
+        now = max(now, ready_at) + search_seconds; order.append(profile.index); scheduler.searched(profile, now)
+
+
+def test_round_robin_when_everyone_is_eligible():
+    order, _ = drain(SearchScheduler({A: 3, B: 3, C: 3}, spacing=lambda profile: 0.0))
+    assert order == [0, 1, 2] * 3
+
+
+def test_quota_met_profiles_leave_and_zero_quotas_never_enter():
+    scheduler = SearchScheduler({A: 1, B: 3, C: 0}, spacing=lambda profile: 0.0)
+    assert len(scheduler) == 2
+    order, _ = drain(scheduler)
+    assert order == [0, 1, 1, 1] and scheduler.done == {A: 1, B: 3, C: 0}
+
+
+def test_spacing_is_filled_with_other_profiles_searches():
+    order, elapsed = drain(SearchScheduler({A: 3, B: 3, C: 3}, spacing=lambda profile: 2.0))
+    assert order == [0, 1, 2] * 3 and elapsed == 9.0 # Each profile's 2s gap is covered by the other two searches: no idle time
+
+
+def test_caller_waits_only_when_every_profile_is_spacing():
+    order, elapsed = drain(SearchScheduler({A: 3}, spacing=lambda profile: 5.0))
+    assert order == [0, 0, 0] and elapsed == 1 + 5 + 1 + 5 + 1
+
+
+def test_per_profile_spacing_lets_a_fast_profile_go_again():
+    order, _ = drain(SearchScheduler({A: 4, B: 2}, spacing=lambda profile: 0.5 if profile is A else 10.0))
+    assert order[:4] == [0, 1, 0, 0] and sorted(order) == [0, 0, 0, 0, 1, 1]
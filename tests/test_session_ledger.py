@@ -0,0 +1,31 @@
+# BingRewardSearch/tests/test_session_ledger.py
+
+import csv
+from datetime import datetime
+
+from timing import PhaseTimer, SessionLedger
+
+
+def read(path):
+    with open(path, newline="", encoding="utf-8") as f: return list(csv.DictReader(f))
+
+
+def test_phases_and_other_add_up_to_the_duration(tmp_path):
+    timer = PhaseTimer(); timer.add("typing", 30.0); timer.add("fetch", 12.5)
+    ledger = SessionLedger(str(tmp_path / "ledger.csv"))
+    ledger.append("search", datetime(2026, 1, 2, 8, 0), 60.0, 3, 30, 90, timer)
+    row = read(ledger.path)[0]
+    assert row["otherSec"] == "17.5"
+    assert sum(float(row[f"{phase}Sec"]) for phase in SessionLedger.PHASES) + float(row["otherSec"]) == float(row["DurationSec"])
+    timer.add("verify", 40.0) # Overlapping background spans can exceed the duration
+    ledger.append("search", datetime(2026, 1, 2, 9, 0), 60.0, 3, 30, 90, timer)
+    assert read(ledger.path)[1]["otherSec"] == "0.0"
+
+
+def test_a_ledger_with_the_old_header_is_upgraded(tmp_path):
+    path = tmp_path / "ledger.csv"; old_header = SessionLedger.HEADER[:-1]
+    with open(path, "w", newline="", encoding="utf-8") as f: csv.writer(f).writerows([old_header, ["2026-01-01T08:00:00", "search", "50.0"] + ["0"] * (len(old_header) - 3)])
+    SessionLedger(str(path)).append("fetch", datetime(2026, 1, 2, 8, 0), 5.0, 1, 0, None, PhaseTimer())
+    with open(path, newline="", encoding="utf-8") as f: rows = list(csv.reader(f))
+    assert rows[0] == SessionLedger.HEADER and all(len(row) == len(SessionLedger.HEADER) for row in rows)
+    assert rows[1][-1] == "" and rows[2][-1] == "5.0"
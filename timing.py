@@ -0,0 +1,131 @@
+# BingRewardSearch/timing.py
+
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from logger import logger
+import config
+
+
+class PhaseTimer:
+    """
+    Span timers for the phases of a run (launch wait, action delays, typing, reading results,
+    scrolling, batch delay, points fetches...), totalled overall, per batch and per profile.
+
+    The clock is injectable so simulated runs report their virtual time. A span costs two
+    clock reads and a dict update.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.batch: Optional[int] = None
+        self.totals: Dict[str, List[float]] = {}                 # phase -> [count, seconds]
+        self.by_batch: Dict[int, Dict[str, float]] = {}
+        self.by_profile: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock() # Fetch spans come from worker threads
+
+    def reset(self):
+        with self._lock:
+            self.batch = None; self.totals = {}; self.by_batch = {}; self.by_profile = {}
+
+    def add(self, phase: str, seconds: float, profile_key: Optional[str] = None, batch: Optional[int] = None):
+        """batch defaults to self.batch, which only the input thread sets; background work passes its own."""
+        with self._lock:
+            entry = self.totals.get(phase)
+            if entry is None: entry = self.totals[phase] = [0, 0.0]
+            entry[0] += 1; entry[1] += seconds
+            batch = self.batch if batch is None else batch
+            if batch is not None:
+                batch_phases = self.by_batch.setdefault(batch, {}); batch_phases[phase] = batch_phases.get(phase, 0.0) + seconds
+            if profile_key is not None:
+                profile_phases = self.by_profile.setdefault(profile_key, {}); profile_phases[phase] = profile_phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def span(self, phase: str, profile_key: Optional[str] = None, batch: Optional[int] = None):
+        start = self.clock()
+        try: yield
+        finally: self.add(phase, self.clock() - start, profile_key, batch)
+
+    def seconds(self, phase: str) -> float:
+        entry = self.totals.get(phase)
+        return entry[1] if entry else 0.0
+
+    def log_breakdown(self, title: str = "Run"):
+        with self._lock: totals = sorted(self.totals.items(), key=lambda item: -item[1][1]); by_batch = dict(self.by_batch); profiles = len(self.by_profile)
+        total = sum(seconds for _, (_, seconds) in totals)
+        if total <= 0: return
+        logger.log(f"{title} time by phase: " + ", ".join(f"{phase} {seconds:.1f}s ({seconds / total:.0%}, {count}x)" for phase, (count, seconds) in totals) + ".", "INFO")
+        for batch, phases in sorted(by_batch.items()):
+            logger.log(f"  Batch {batch}: {sum(phases.values()):.1f}s — " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in sorted(phases.items(), key=lambda item: -item[1])), "DEBUG")
+        if profiles: logger.log(f"  Per-profile totals recorded for {profiles} profiles.", "DEBUG")
+
+
+class LatencyStats:
+    """Collects latency samples and reports percentiles (e.g. Edge launch-to-window times)."""
+    def __init__(self, label: str):
+        self.label = label
+        self.samples: List[float] = []
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock: self.samples = []; self.timeouts = 0
+
+    def record(self, seconds: float):
+        with self._lock: self.samples.append(seconds)
+
+    def record_timeout(self):
+        with self._lock: self.timeouts += 1
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        with self._lock: samples = sorted(self.samples)
+        if not samples: return [0.0 for _ in quantiles]
+        return [samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles]
+
+    def log_stats(self):
+        if not self.samples and not self.timeouts: return
+        p50, p90, p99 = self.percentiles(0.5, 0.9, 0.99)
+        logger.log(f"{self.label}: {len(self.samples)} samples, p50 {p50:.2f}s / p90 {p90:.2f}s / p99 {p99:.2f}s / max {max(self.samples, default=0.0):.2f}s, {self.timeouts} deadline misses.", "INFO")
+
+
+class SessionLedger:
+    """
+    Appends one summary row per run to a CSV, for throughput trends across days and weeks.
+
+    otherSec is the run time no phase covers (idle waits for a background verification, stalls,
+    bookkeeping), so the phase columns plus otherSec add up to DurationSec. Pipelined runs fetch and
+    verify while the next batch searches; when those overlapping spans push the phases past the
+    duration, otherSec is 0.
+    """
+    PHASES = ["launch", "focus", "action", "typing", "post_search", "scroll", "mouse", "batch_delay", "close", "fetch", "verify"]
+    HEADER = ["Started", "Kind", "DurationSec", "Profiles", "SearchesIssued", "PointsGained", "PointsPerMinute", "Stopped"] + [f"{phase}Sec" for phase in PHASES] + ["otherSec"]
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SESSION_LEDGER_PATH
+
+    def _upgrade(self):
+        """Rewrites a ledger started under an older header (fewer columns), padding its rows, so every row lines up with HEADER."""
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            if next(reader, self.HEADER) == self.HEADER: return
+            f.seek(0); rows = list(csv.reader(f))
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([self.HEADER] + [row + [""] * (len(self.HEADER) - len(row)) for row in rows[1:]])
+
+    def append(self, kind: str, started: datetime, duration: float, profiles: int, searches: int, points_gained: Optional[int], timer: PhaseTimer, stopped: bool = False):
+        points_per_minute = f"{points_gained / (duration / 60):.2f}" if points_gained is not None and duration > 0 else ""
+        row = [started.isoformat(timespec="seconds"), kind, f"{duration:.1f}", profiles, searches, "" if points_gained is None else points_gained, points_per_minute, int(stopped)]
+        phase_seconds = [timer.seconds(phase) for phase in self.PHASES]
+        row += [f"{seconds:.1f}" for seconds in phase_seconds] + [f"{max(0.0, duration - sum(phase_seconds)):.1f}"]
+        file_exists = os.path.isfile(self.path)
+        try:
+            if file_exists: self._upgrade()
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if not file_exists: writer.writerow(self.HEADER)
+                writer.writerow(row)
+        except Exception as e: logger.log(f"Failed to write to session ledger: {e}", "ERROR")
@@ -0,0 +1,146 @@
+# BingRewardSearch/wiki_corpus.py
+
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional
+
+import requests
+
+from logger import logger
+import config
+
+WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKI_USER_AGENT = "BingRewardSearchBot (merci-k@example.com)"
+OFFSET_STRUCT = struct.Struct("<Q")
+
+
+def is_usable_title(title: str) -> bool:
+    """Same rules the online generator always applied: 9-74 chars and no namespace prefix."""
+    return 8 < len(title) < 75 and ":" not in title and "\n" not in title
+
+
+class WikiTitleCorpus:
+    """
+    An offline, memory-mapped corpus of pre-filtered Wikipedia titles.
+
+    Titles live in a newline-delimited UTF-8 file; a sidecar index holds
+    N+1 little-endian uint64 offsets so any title can be sliced out in O(1).
+    The online API is only used to (re)build the files in bulk.
+    """
+    def __init__(self, titles_path: str = config.WIKI_TITLES_PATH, index_path: str = config.WIKI_TITLES_INDEX_PATH):
+        self.titles_path = titles_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._titles_file = None; self._index_file = None
+        self._titles_map: Optional[mmap.mmap] = None; self._index_map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    # --- Reading ---
+    def open(self) -> bool:
+        with self._lock:
+            self._close_maps()
+            if not (os.path.isfile(self.titles_path) and os.path.isfile(self.index_path)): return False
+            try:
+                if os.path.getsize(self.index_path) < 2 * OFFSET_STRUCT.size or os.path.getsize(self.titles_path) == 0: return False
+                self._titles_file = open(self.titles_path, "rb"); self._index_file = open(self.index_path, "rb")
+                self._titles_map = mmap.mmap(self._titles_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._count = len(self._index_map) // OFFSET_STRUCT.size - 1
+            except (OSError, ValueError) as e:
+                logger.log(f"Failed to open Wikipedia title corpus: {e}", "WARN"); self._close_maps(); return False
+        logger.log(f"Loaded offline Wikipedia title corpus ({self._count} titles).", "SYSTEM")
+        return True
+
+    def close(self):
+        with self._lock: self._close_maps()
+
+    def _close_maps(self):
+        for handle in (self._titles_map, self._index_map, self._titles_file, self._index_file):
+            if handle:
+                try: handle.close()
+                except Exception: pass
+        self._titles_file = self._index_file = self._titles_map = self._index_map = None
+        self._count = 0
+
+    def __len__(self) -> int: return self._count
+
+    def sample(self, rng: random.Random = random) -> Optional[str]:
+        """Returns a random title in O(1), or None if the corpus is not loaded."""
+        with self._lock:
+            if self._count <= 0: return None
+            i = rng.randrange(self._count)
+            start, end = struct.unpack_from("<QQ", self._index_map, i * OFFSET_STRUCT.size)
+            return self._titles_map[start:end - 1].decode("utf-8")
+
+    def is_stale(self, max_age_days: float = config.WIKI_CORPUS_REFRESH_DAYS) -> bool:
+        try: return (time.time() - os.path.getmtime(self.index_path)) > max_age_days * 86400
+        except OSError: return True
+
+    # --- Building ---
+    def write(self, titles: Iterable[str]) -> int:
+        """Atomically replaces the corpus files with the given (filtered, de-duplicated) titles."""
+        offsets: List[int] = [0]; seen = set()
+        tmp_titles, tmp_index = self.titles_path + ".tmp", self.index_path + ".tmp"
+        with open(tmp_titles, "wb") as f:
+            for title in titles:
+                if title in seen or not is_usable_title(title): continue
+                seen.add(title); data = title.encode("utf-8") + b"\n"
+                f.write(data); offsets.append(offsets[-1] + len(data))
+        with open(tmp_index, "wb") as f: f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        with self._lock:
+            self._close_maps() # Windows refuses to replace a file that is still mapped
+            os.replace(tmp_titles, self.titles_path); os.replace(tmp_index, self.index_path)
+        self.open()
+        return len(offsets) - 1
+
+    def iter_titles(self):
+        with self._lock: count = self._count
+        for i in range(count):
+            with self._lock:
+                if i >= self._count: return
+                start, end = struct.unpack_from("<QQ", self._index_map, i * OFFSET_STRUCT.size)
+                yield self._titles_map[start:end - 1].decode("utf-8")
+
+    def import_titles(self, target_count: int = config.WIKI_CORPUS_TARGET_SIZE, keep_existing: bool = False) -> int:
+        """
+        Bulk-fetches random article titles (500 per request) until target_count usable titles exist.
+        The new titles replace the corpus only once target_count of them arrived; a short import is merged in.
+        """
+        titles = dict.fromkeys(self.iter_titles()) if keep_existing else {}
+        fresh = 0; max_requests = max(1, target_count // 250)
+        session = requests.Session(); session.headers["User-Agent"] = WIKI_USER_AGENT
+        params = {"action": "query", "format": "json", "list": "random", "rnnamespace": 0, "rnlimit": 500}
+        try:
+            for _ in range(max_requests):
+                if fresh >= target_count: break
+                response = session.get(WIKI_API_URL, params=params, timeout=15); response.raise_for_status()
+                for page in response.json().get("query", {}).get("random", []):
+                    title = page.get("title", "")
+                    if is_usable_title(title) and title not in titles: titles[title] = None; fresh += 1
+        except (requests.RequestException, ValueError) as e:
+            logger.log(f"Wikipedia title import stopped early: {e}", "WARN")
+        finally: session.close()
+        if not fresh: return len(self)
+        if fresh < target_count and not keep_existing: # Stopped short: merge, so a network error never shrinks a full corpus to a few titles
+            titles = {**dict.fromkeys(self.iter_titles()), **titles}
+        count = self.write(titles)
+        logger.log(f"Wikipedia title corpus rebuilt: {fresh} new titles, {count} total.", "SYSTEM")
+        return count
+
+    def refresh_in_background(self, target_count: int = config.WIKI_CORPUS_TARGET_SIZE):
+        if self._refresh_thread and self._refresh_thread.is_alive(): return
+        self._refresh_thread = threading.Thread(target=self.import_titles, args=(target_count,), name="WikiCorpusRefresh", daemon=True)
+        self._refresh_thread.start()
+
+
+if __name__ == "__main__":
+    # One-time (or periodic) import: python wiki_corpus.py [target_count]
+    corpus = WikiTitleCorpus(); corpus.open()
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else config.WIKI_CORPUS_TARGET_SIZE
+    print(f"Corpus now holds {corpus.import_titles(target)} titles.")
@@ -0,0 +1,79 @@
+# BingRewardSearch/word_index.py
+
+import json
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import wonderwords
+from wonderwords import RandomWord
+
+from logger import logger
+import config
+
+
+class WordIndex:
+    """
+    Part-of-speech word lists precomputed once into a single flat array.
+
+    Words are stored contiguously (nouns, then adjectives, then verbs, each word
+    kept only in its first group), so any union of adjacent groups is a plain
+    slice and sampling is an O(1) index instead of re-filtering the lists.
+    The flattened lists are cached to disk for fast startup.
+    """
+    PARTS_OF_SPEECH = ("nouns", "adjectives", "verbs")
+
+    def __init__(self, cache_path: str = config.WORD_INDEX_CACHE_PATH):
+        self.cache_path = cache_path
+        self.words: Tuple[str, ...] = ()
+        self.bounds: Dict[str, Tuple[int, int]] = {}
+        self._views: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def load(self, random_word_gen: Optional[RandomWord] = None) -> "WordIndex":
+        groups = self._load_cache()
+        if groups is None:
+            groups = self._build(random_word_gen or RandomWord())
+            self._save_cache(groups)
+        words: List[str] = []; seen = set()
+        for pos in self.PARTS_OF_SPEECH:
+            start = len(words)
+            for word in groups.get(pos, []):
+                if word not in seen: seen.add(word); words.append(word)
+            self.bounds[pos] = (start, len(words))
+        self.words = tuple(words); self._views = {}
+        logger.log(f"Word index ready: {', '.join(f'{p} {e - s}' for p, (s, e) in self.bounds.items())}.", "SYSTEM")
+        return self
+
+    def _build(self, random_word_gen: RandomWord) -> Dict[str, List[str]]:
+        return {pos: random_word_gen.filter(include_parts_of_speech=[pos]) for pos in self.PARTS_OF_SPEECH}
+
+    def _load_cache(self) -> Optional[Dict[str, List[str]]]:
+        if not os.path.isfile(self.cache_path): return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("wonderwords_version") != wonderwords.__version__: return None
+            return data["parts_of_speech"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.log(f"Ignoring unreadable word index cache: {e}", "WARN"); return None
+
+    def _save_cache(self, groups: Dict[str, List[str]]):
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"wonderwords_version": wonderwords.__version__, "parts_of_speech": groups}, f)
+        except OSError as e: logger.log(f"Could not write word index cache: {e}", "WARN")
+
+    def _view(self, parts_of_speech: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        key = tuple(parts_of_speech) if parts_of_speech else self.PARTS_OF_SPEECH
+        view = self._views.get(key)
+        if view is None:
+            view = tuple(w for pos in key for w in self.words[slice(*self.bounds[pos])])
+            self._views[key] = view
+        return view
+
+    def random_word(self, parts_of_speech: Optional[Sequence[str]] = None) -> str:
+        view = self._view(parts_of_speech)
+        return view[random.randrange(len(view))]
+
+    def sample(self, k: int, parts_of_speech: Optional[Sequence[str]] = None) -> List[str]:
+        """Draws k words (with replacement) in a single call."""
+        return random.choices(self._view(parts_of_speech), k=k) if k > 0 else []